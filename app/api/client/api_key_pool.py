@@ -0,0 +1,219 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pytz
+from structlog import get_logger
+
+from app.core.config import settings
+from app.utils import config_utils
+
+logger = get_logger()
+
+# The youtube API quota is reset at midnight, pacific time
+QUOTA_RESET_TIMEZONE = pytz.timezone("America/Los_Angeles")
+
+# Youtube API error reasons
+QUOTA_EXHAUSTED_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+RATE_LIMITED_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+INVALID_KEY_REASONS = {"keyInvalid", "keyExpired", "accessNotConfigured"}
+
+
+class ApiKeyState:
+    """
+    Usage bookkeeping of a single API key
+    """
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.used_units = 0
+        self.cooldown_until = 0.0
+        self.cooldown_reason = None
+
+
+class ApiKeyPool:
+    """
+    Pool of the youtube API keys.
+
+    Caches the keys file & re-reads it only when it is modified, estimates
+    the quota units used per key & puts the exhausted/invalid keys into
+    cooldown until the quota is reset, so that no calls are wasted on them.
+    """
+
+    def __init__(self, keys_file_path: str, daily_quota_units: int):
+        self.keys_file_path = keys_file_path
+        self.daily_quota_units = daily_quota_units
+        self._keys: Dict[str, ApiKeyState] = {}
+        self._keys_file_mtime = None
+        self._quota_reset_at = _get_next_quota_reset()
+
+    def acquire(self, cost: int) -> Optional[str]:
+        """
+        Method to get the healthy key with the most remaining quota,
+        reserving the units of the call on it
+        Args:
+            cost: the quota units the call costs
+        Returns:
+            the API key, None if no key can afford the call
+        """
+        healthy_keys = self.get_healthy_keys(cost)
+        if not healthy_keys:
+            return None
+        key_state = min(healthy_keys, key=lambda state: state.used_units)
+        key_state.used_units += cost
+        return key_state.api_key
+
+    def get_healthy_keys(self, cost: int = 0) -> List[ApiKeyState]:
+        """
+        Method to get the keys which are not in cooldown & can afford the call
+        Args:
+            cost: the quota units the call costs
+        Returns:
+            the healthy keys' states
+        """
+        self._reload_if_modified()
+        self._reset_quota_if_due()
+        now = time.time()
+        return [
+            key_state
+            for key_state in self._keys.values()
+            if key_state.cooldown_until <= now
+            and key_state.used_units + cost <= self.daily_quota_units
+        ]
+
+    def report_failure(self, api_key: str, status_code: int, reason: str = None):
+        """
+        Method to record a failed call, putting the key into cooldown if the
+        failure was caused by the key itself
+        Args:
+            api_key: the key used for the call
+            status_code: the http status of the response
+            reason: the youtube API error reason, if any
+        Returns:
+            returns True if the key was put into cooldown (the call can be
+            retried with another key) else False
+        """
+        key_state = self._keys.get(api_key)
+        if not key_state:
+            return False
+
+        if reason in RATE_LIMITED_REASONS:
+            cooldown_until = time.time() + settings.api_key_cooldown
+        elif (
+            reason in QUOTA_EXHAUSTED_REASONS
+            or reason in INVALID_KEY_REASONS
+            or (reason is None and status_code == 403)
+        ):
+            cooldown_until = self._quota_reset_at.timestamp()
+        else:
+            return False
+
+        key_state.cooldown_until = cooldown_until
+        key_state.cooldown_reason = reason or str(status_code)
+        logger.warning(
+            "API key put into cooldown.",
+            api_key=_mask(api_key),
+            reason=key_state.cooldown_reason,
+            cooldown_until=cooldown_until,
+        )
+        return True
+
+    def get_used_units(self) -> int:
+        """
+        Method to get the quota units used by all the keys since the last reset
+        """
+        self._reset_quota_if_due()
+        return sum(key_state.used_units for key_state in self._keys.values())
+
+    def get_remaining_units(self) -> int:
+        """
+        Method to get the quota units the keys can still use until the reset,
+        the keys in cooldown until the reset are left out
+        """
+        self._reload_if_modified()
+        self._reset_quota_if_due()
+        quota_reset_at = self._quota_reset_at.timestamp()
+        return sum(
+            max(self.daily_quota_units - key_state.used_units, 0)
+            for key_state in self._keys.values()
+            if key_state.cooldown_until < quota_reset_at
+        )
+
+    def get_seconds_to_quota_reset(self) -> float:
+        """
+        Method to get the seconds left until the daily quota is reset
+        """
+        return max(self._quota_reset_at.timestamp() - time.time(), 0.0)
+
+    def snapshot(self) -> List[dict]:
+        """
+        Method to get the current usage of the keys, with the keys masked
+        """
+        return [
+            {
+                "api_key": _mask(key_state.api_key),
+                "used_units": key_state.used_units,
+                "cooldown_until": key_state.cooldown_until,
+                "cooldown_reason": key_state.cooldown_reason,
+            }
+            for key_state in self._keys.values()
+        ]
+
+    def _reload_if_modified(self):
+        """
+        Method to re-read the keys file when its modification time changes.
+        The usage of the keys which are still present is kept.
+        """
+        try:
+            mtime = os.stat(self.keys_file_path).st_mtime
+        except OSError:
+            logger.error(f"API keys file not found at {self.keys_file_path}")
+            return
+        if mtime == self._keys_file_mtime:
+            return
+
+        logger.info("Reading API Keys from the file.")
+        api_keys = [
+            data.strip() for data in config_utils.read_file(self.keys_file_path)
+        ]
+        self._keys = {
+            api_key: self._keys.get(api_key) or ApiKeyState(api_key)
+            for api_key in api_keys
+            if api_key
+        }
+        self._keys_file_mtime = mtime
+
+    def _reset_quota_if_due(self):
+        """
+        Method to clear the usage & the cooldowns once the daily quota is reset
+        """
+        if datetime.now(pytz.utc) < self._quota_reset_at:
+            return
+        for key_state in self._keys.values():
+            key_state.used_units = 0
+            key_state.cooldown_until = 0.0
+            key_state.cooldown_reason = None
+        self._quota_reset_at = _get_next_quota_reset()
+        logger.info("Reset the API keys quota usage.")
+
+
+def _get_next_quota_reset():
+    """
+    Returns the next midnight, pacific time
+    """
+    now = datetime.now(QUOTA_RESET_TIMEZONE)
+    next_day = (now + timedelta(days=1)).date()
+    return QUOTA_RESET_TIMEZONE.localize(
+        datetime(next_day.year, next_day.month, next_day.day)
+    )
+
+
+def _mask(api_key: str):
+    """
+    Returns the API key with all but the last 4 characters masked
+    """
+    return f"****{api_key[-4:]}"
+
+
+api_key_pool = ApiKeyPool(settings.keys_file_path, settings.api_key_daily_quota)
@@ -10,3 +10,10 @@ class Apis(Enum):
     search_api = "/youtube/v3/search"
     # Youtube video details API
     video_details = "/youtube/v3/videos"
+
+
+class ApiQuotaCosts:
+    # Youtube search API, quota units per call
+    search_api = 100
+    # Youtube video details API, quota units per call
+    video_details = 1
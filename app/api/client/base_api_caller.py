@@ -1,57 +1,206 @@
-import requests
-from starlette.status import HTTP_200_OK
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_429_TOO_MANY_REQUESTS,
+)
 from structlog import get_logger
 
+from app.api.client import http_client
+from app.api.client.circuit_breaker import youtube_circuit_breaker
+from app.core.config import settings
 from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.utils import json_utils
 
 logger = get_logger()
 
 
 class BaseApiCaller:
     """
-    The api client
+    The api client.
+    Retries the calls failing with a 5xx/429 status or a transport error,
+    with an exponential, jittered backoff honouring 'Retry-After', and stops
+    calling the API while its circuit is open. A call counts once in the
+    circuit breaker, whatever its number of attempts.
     """
 
     INTERNAL_SERVER_ERROR_KEY = "Internal server error."
+    SERVICE_UNAVAILABLE_KEY = "Service unavailable, the circuit is open."
 
     base_url = None
     path = None
     params = None
+    headers = None
+    status_code = None
+    error_reason = None
+    circuit_breaker = youtube_circuit_breaker
 
-    def __init__(self, base_url, path, params=None):
+    def __init__(self, base_url, path, params=None, headers=None):
         self.base_url = base_url
         self.path = path
         self.params = params
+        self.headers = headers
 
-    def get(self):
+    async def get(self):
         url = f"{self.base_url}{self.path}"
+        if not self.circuit_breaker.allow_request():
+            logger.warning("Skipped the call, the circuit is open.", path=self.path)
+            raise VideoRegistryException(503, self.SERVICE_UNAVAILABLE_KEY)
+        attempt = 0
+        while True:
+            resp, error = await self._get_once(url)
+            if attempt >= settings.http_max_retries or not _is_retryable(resp):
+                break
+            reason = type(error).__name__ if error else f"status {resp.status_code}"
+            await self._backoff(attempt, resp, reason=reason)
+            attempt += 1
+        return self._handle_response(url, resp, error)
+
+    async def _get_once(self, url):
+        """
+        Method to make a single attempt of the call
+        Args:
+            url: the url to call
+        Returns:
+            the response & None, or None & the transport error
+        """
         try:
-            resp = requests.get(url=url, params=self.params)
-            if resp.status_code == HTTP_200_OK:
-                response = resp.json()
-                return response
-            elif 400 <= resp.status_code < 500:
-                logger.exception(
-                    "Get operation failed.",
-                    status_code=resp.status_code,
-                    path=self.path,
-                    response=None,
-                )
-                return None
-            else:
-                logger.exception(
-                    message="Get operation failed.",
-                    url=url,
-                    params=self.params,
-                    status_code=resp.status_code,
-                    content=resp.text,
-                )
-                raise VideoRegistryException(resp.status_code, resp.text)
-        except requests.exceptions.ConnectTimeout as e:
-            logger.exception(
-                message="Connection timed out",
+            resp = await http_client.get_client().get(
+                url, params=self.params, headers=self.headers
+            )
+            return resp, None
+        except httpx.TransportError as e:
+            return None, e
+
+    def _handle_response(self, url, resp, error):
+        """
+        Method to handle the outcome of the last attempt of the call,
+        recording it in the circuit breaker
+        Args:
+            url: the called url
+            resp: the response of the last attempt, None on a transport error
+            error: the transport error of the last attempt, if any
+        Returns:
+            the response data, None if unchanged or on a client error
+        Raises:
+            VideoRegistryException: on a transport error or a server error
+        """
+        if resp is None:
+            self.circuit_breaker.record_failure()
+            logger.error(
+                "Get operation failed, transport error",
                 url=url,
-                params=self.params,
-                exception=str(e),
+                exception=str(error),
+            )
+            status_code = 408 if isinstance(error, httpx.TimeoutException) else 503
+            raise VideoRegistryException(status_code, self.INTERNAL_SERVER_ERROR_KEY)
+
+        self.status_code = resp.status_code
+        if resp.status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            # The API is up, even when throttling or rejecting the call
+            self.circuit_breaker.record_success()
+
+        if resp.status_code == HTTP_200_OK:
+            return json_utils.loads(resp.content)
+        if resp.status_code == HTTP_304_NOT_MODIFIED:
+            # Unchanged since the ETag sent with 'If-None-Match'
+            return None
+        if 400 <= resp.status_code < 500:
+            self.error_reason = _get_error_reason(resp)
+            logger.error(
+                "Get operation failed.",
+                status_code=resp.status_code,
+                path=self.path,
+                reason=self.error_reason,
             )
-            raise VideoRegistryException(408, self.INTERNAL_SERVER_ERROR_KEY)
+            return None
+
+        logger.error(
+            "Get operation failed.",
+            url=url,
+            status_code=resp.status_code,
+            content=resp.text,
+        )
+        raise VideoRegistryException(resp.status_code, resp.text)
+
+    async def _backoff(self, attempt, resp, reason):
+        """
+        Method to wait before retrying a call: the 'Retry-After' of the
+        response if given, else an exponential backoff with full jitter
+        Args:
+            attempt: the number of the failed attempt, starting with 0
+            resp: the failed response, None on a transport error
+            reason: the failure reason, for logging
+        """
+        delay = _get_retry_after(resp) if resp is not None else None
+        if delay is None:
+            delay = random.uniform(0, settings.http_retry_backoff * 2**attempt)
+        delay = min(delay, settings.http_retry_max_backoff)
+        logger.warning(
+            "Retrying the call.",
+            path=self.path,
+            reason=reason,
+            attempt=attempt + 1,
+            delay=round(delay, 3),
+        )
+        await asyncio.sleep(delay)
+
+
+def _is_retryable(resp):
+    """
+    Returns True if a call failing with the given response can be retried,
+    None being a transport error
+    """
+    return resp is None or _is_retryable_status(resp.status_code)
+
+
+def _is_retryable_status(status_code):
+    """
+    Returns True if a call failing with the given status can be retried
+    """
+    return status_code == HTTP_429_TOO_MANY_REQUESTS or status_code >= 500
+
+
+def _get_retry_after(resp):
+    """
+    Method to get the seconds to wait from the 'Retry-After' header,
+    given either as seconds or as an http date
+    Args:
+        resp: the http response
+    Returns:
+        the seconds to wait, None if not available
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_error_reason(resp):
+    """
+    Method to get the error reason from a google API error response
+    i.e., {"error": {"errors": [{"reason": "quotaExceeded", ...}], ...}}
+    Args:
+        resp: the http response
+    Returns:
+        the reason of the first error, None if not available
+    """
+    try:
+        errors = resp.json()["error"]["errors"]
+        return errors[0]["reason"] if errors else None
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
@@ -0,0 +1,96 @@
+import time
+
+from structlog import get_logger
+
+from app.core.config import settings
+
+logger = get_logger()
+
+# Circuit states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of an external API.
+
+    After 'failure_threshold' consecutive failed calls the circuit opens &
+    the calls are rejected without reaching the API. Once 'reset_timeout'
+    seconds have passed, a single trial call is let through: the circuit
+    closes if it succeeds, otherwise it opens again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self._failure_count = 0
+        self._opened_at = 0.0
+        self._is_trial_in_flight = False
+        self._trial_started_at = 0.0
+
+    def allow_request(self) -> bool:
+        """
+        Method to check if a call can be made
+        Returns:
+            returns True if the call can be made else False
+        """
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = CIRCUIT_HALF_OPEN
+            logger.info("Circuit half-open, trying a call.", circuit=self.name)
+        # Half-open, letting a single trial call through. A trial call which
+        # never reported back (i.e., cancelled) is replaced after the timeout
+        now = time.monotonic()
+        if (
+            self._is_trial_in_flight
+            and now - self._trial_started_at < self.reset_timeout
+        ):
+            return False
+        self._is_trial_in_flight = True
+        self._trial_started_at = now
+        return True
+
+    def record_success(self):
+        """
+        Method to record a successful call, closing the circuit
+        """
+        if self.state != CIRCUIT_CLOSED:
+            logger.info("Circuit closed.", circuit=self.name)
+        self.state = CIRCUIT_CLOSED
+        self._failure_count = 0
+        self._is_trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Method to record a failed call, opening the circuit on a failed trial
+        call or once the consecutive failures reach the threshold
+        """
+        self._failure_count += 1
+        self._is_trial_in_flight = False
+        if (
+            self.state == CIRCUIT_HALF_OPEN
+            or self._failure_count >= self.failure_threshold
+        ):
+            if self.state != CIRCUIT_OPEN:
+                logger.warning(
+                    "Circuit opened.",
+                    circuit=self.name,
+                    failure_count=self._failure_count,
+                    reset_timeout=self.reset_timeout,
+                )
+            self.state = CIRCUIT_OPEN
+            self._opened_at = time.monotonic()
+
+
+youtube_circuit_breaker = CircuitBreaker(
+    "youtube",
+    settings.circuit_breaker_failure_threshold,
+    settings.circuit_breaker_reset_timeout,
+)
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+from typing import Optional
+
+
+class EtagCache:
+    """
+    Bounded cache of the ETags of the youtube API resources.
+
+    Entries are evicted least recently used first, once the entries cap
+    is reached. Only used from the event loop, no locking needed.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key) -> Optional[str]:
+        """
+        Method to get the ETag of a resource
+        Args:
+            key: the resource key
+        Returns:
+            the ETag, None if not cached
+        """
+        etag = self._entries.get(key)
+        if etag is not None:
+            self._entries.move_to_end(key)
+        return etag
+
+    def set(self, key, etag: str):
+        """
+        Method to cache the ETag of a resource
+        Args:
+            key: the resource key
+            etag: the ETag
+        """
+        self._entries[key] = etag
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
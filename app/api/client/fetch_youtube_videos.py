@@ -1,15 +1,30 @@
+import asyncio
 from typing import List, Union
 
+from starlette.status import HTTP_304_NOT_MODIFIED
 from structlog import get_logger
 
-from app.api.client.apis_helper import Apis
+from app.api.client.api_key_pool import api_key_pool
+from app.api.client.apis_helper import ApiQuotaCosts, Apis
 from app.api.client.base_api_caller import BaseApiCaller
+from app.api.client.etag_cache import EtagCache
 from app.core.config import settings
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
 
 logger = get_logger()
 
+# Maximum video ids per video details API call
+VIDEO_DETAILS_BATCH_SIZE = 50
 
-def search_newly_added_videos(
+# Returned for a search page unchanged since it was last processed
+NOT_MODIFIED = object()
+
+# ETags of the fully processed first search pages
+search_etags = EtagCache(settings.etag_cache_max_entries)
+
+
+async def search_newly_added_videos(
+    query: str,
     published_after: str,
     next_page_token: str,
     content_type: str = "video",
@@ -18,110 +33,153 @@ def search_newly_added_videos(
     """
     Fetches the newly added videos
     Args:
+        query: the search query (topic)
         published_after:
         next_page_token:
         content_type:
         order_by:
     Returns:
+        the search results page, NOT_MODIFIED if the first page did not change
+        since the search was last processed, None on failure
+    """
+    logger.info(f"Searching for newly published youtube videos.", query=query)
+    params = _get_search_params(query, published_after, content_type, order_by)
+    headers = None
+    if next_page_token:
+        params["pageToken"] = next_page_token
+    else:
+        # An unchanged first page means no new videos, the ETag of the
+        # search is only kept once all of its pages were processed
+        etag = search_etags.get(_get_etag_key(Apis.search_api, params))
+        if etag:
+            headers = {"If-None-Match": etag}
+    return await _call_with_api_key(
+        Apis.search_api, params, ApiQuotaCosts.search_api, headers
+    )
+
 
+def remember_search(
+    query: str,
+    published_after: str,
+    etag: str,
+    content_type: str = "video",
+    order_by: str = "date",
+):
+    """
+    Method to record the ETag of the first page of a fully processed search,
+    so that the search is skipped while its results do not change
+    Args:
+        query: the search query (topic)
+        published_after:
+        etag: the ETag of the first page
+        content_type:
+        order_by:
     """
-    result = None
-    logger.info(f"Searching for newly published youtube videos.")
+    params = _get_search_params(query, published_after, content_type, order_by)
+    search_etags.set(_get_etag_key(Apis.search_api, params), _quote_etag(etag))
 
-    # Checking if api key is already assigned & is a valid API key
-    if settings.google_api_key:
-        resp = _youtube_search_videos_caller(
-            content_type=content_type,
-            order_by=order_by,
-            published_after=published_after,
-            api_key=settings.google_api_key,
-            next_page_token=next_page_token,
-        )
-        if resp:
-            return resp
 
-    # If the API key has become invalid, finding a valid key from the list
-    for api_key in settings.api_keys:
-        resp = _youtube_search_videos_caller(
-            content_type=content_type,
-            order_by=order_by,
-            published_after=published_after,
-            api_key=api_key,
-            next_page_token=next_page_token,
+async def get_video_details(video_ids: Union[str, List[str]]):
+    """
+    Method to get details for given video(s)
+    """
+    if isinstance(video_ids, list):
+        video_ids = ",".join(video_ids)
+
+    params = {
+        "id": video_ids,
+        "part": "snippet",
+    }
+    return await _call_with_api_key(
+        Apis.video_details, params, ApiQuotaCosts.video_details
+    )
+
+
+async def get_video_details_many(video_ids: List[str]):
+    """
+    Method to get details for any number of videos, in batches of 50
+    spread in parallel across the healthy API keys
+    Returns:
+        the details responses of the batches, None for the failed batches
+    """
+    semaphore = asyncio.Semaphore(settings.api_key_fanout_concurrency)
+
+    async def _get_batch_details(batch):
+        async with semaphore:
+            try:
+                return await get_video_details(batch)
+            except VideoRegistryException as e:
+                logger.error(
+                    "Failed to get the details of a batch of videos.",
+                    video_count=len(batch),
+                    error=str(e),
+                )
+                return None
+
+    batches = [
+        video_ids[i : i + VIDEO_DETAILS_BATCH_SIZE]
+        for i in range(0, len(video_ids), VIDEO_DETAILS_BATCH_SIZE)
+    ]
+    return await asyncio.gather(*(_get_batch_details(b) for b in batches))
+
+
+async def _call_with_api_key(path, params, cost, headers=None):
+    """
+    API caller method, using the healthy key with the most remaining quota.
+    If the key turns out to be exhausted/invalid, the call is retried
+    with the next healthy key.
+    Returns:
+        the response, NOT_MODIFIED if the resource did not change since
+        the ETag sent in the headers, None on failure
+    """
+    while True:
+        api_key = api_key_pool.acquire(cost)
+        if not api_key:
+            logger.error(f"Please add a new valid API key at {settings.keys_file_path}")
+            logger.error(f"Retrying after {settings.sleep_interval} seconds..")
+            return None
+
+        _base_api_caller = BaseApiCaller(
+            base_url=settings.youtube_base_url,
+            path=path,
+            params={**params, "key": api_key},
+            headers=headers,
         )
+        resp = await _base_api_caller.get()
         if resp:
-            settings.google_api_key = api_key
-            result = resp
-            break
-    if not result:
-        logger.error(f"Please add a new valid API key at {settings.keys_file_path}")
-        logger.error(f"Retrying after {settings.sleep_interval} seconds..")
-    return result
+            return resp
+        if _base_api_caller.status_code == HTTP_304_NOT_MODIFIED:
+            return NOT_MODIFIED
+        if not api_key_pool.report_failure(
+            api_key, _base_api_caller.status_code, _base_api_caller.error_reason
+        ):
+            # The request itself was rejected, another key won't help
+            return None
 
 
-def _youtube_search_videos_caller(
-    content_type, order_by, published_after, api_key, next_page_token
-):
+def _get_search_params(query, published_after, content_type, order_by):
     """
-    API builder & caller method for youtube search API
+    Method to build the params of the newly published videos search
     """
-    params = {
+    return {
         "type": content_type,
         "order": order_by,
         "publishedAfter": published_after,
         "maxResults": 50,
-        "key": api_key,
-        "q": settings.video_query_string,
+        "q": query,
     }
-    if next_page_token:
-        params["pageToken"] = next_page_token
-    youtube_search_uri = Apis.search_api
-    _base_api_caller = BaseApiCaller(
-        base_url=settings.youtube_base_url, path=youtube_search_uri, params=params
-    )
-    return _base_api_caller.get()
 
 
-def get_video_details(video_ids: Union[str, List[str]]):
+def _get_etag_key(path, params):
     """
-    Method to get details for given video(s)
+    Method to get the ETag cache key of a request, the API key left out
     """
-    result = None
-
-    if isinstance(video_ids, list):
-        video_ids = ",".join(video_ids)
-
-    # Checking if api key is already assigned & is a valid API key
-    if settings.google_api_key:
-        resp = _video_details_caller(video_ids, settings.google_api_key)
-        if resp:
-            return resp
-
-    # If the API key has become invalid, finding a valid key from the list
-    for api_key in settings.api_keys:
-        resp = _video_details_caller(video_ids, api_key)
-        if resp:
-            result = resp
-            break
-    if not result:
-        logger.error(f"Please add a new valid API key at {settings.keys_file_path}")
-        logger.error(f"Retrying after {settings.sleep_interval} seconds..")
-    return result
+    return (path,) + tuple(sorted(params.items()))
 
 
-def _video_details_caller(video_ids, api_key):
+def _quote_etag(etag):
     """
-    API builder & caller method for youtube video details API
+    Returns the ETag as an 'If-None-Match' entity tag, the API responses
+    carry it unquoted in their body
     """
-    params = {
-        "key": api_key,
-        "id": video_ids,
-        "part": "snippet",
-    }
-    youtube_video_details_uri = Apis.video_details
-    _base_api_caller = BaseApiCaller(
-        base_url=settings.youtube_base_url,
-        path=youtube_video_details_uri,
-        params=params,
-    )
-    return _base_api_caller.get()
+    return etag if etag.startswith(('"', "W/")) else f'"{etag}"'
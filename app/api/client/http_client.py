@@ -0,0 +1,58 @@
+"""Shared, pooled async http client used by all the external api callers"""
+import httpx
+from structlog import get_logger
+
+from app.core.config import settings
+
+logger = get_logger()
+
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async http client, creating it on first use.
+    The client keeps the connections alive & reuses them across calls,
+    bounds the connect/read time of the calls, and negotiates HTTP/2
+    when the 'h2' package is installed.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        http2 = _is_http2_available()
+        _client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.http_read_timeout, connect=settings.http_connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
+        logger.info("Created the shared http client.", http2=http2)
+    return _client
+
+
+async def close_client():
+    """
+    Closes the shared async http client & its connection pool
+    """
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Closed the shared http client.")
+    _client = None
+
+
+def _is_http2_available():
+    """
+    Method to check if HTTP/2 support is installed
+    Returns:
+        returns True if the 'h2' package is available else False
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -1,11 +1,17 @@
-from typing import Union
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Query, status
 from structlog import get_logger
 
 from app.core.video_management import video_manager
 from app.models.generic.empty_response import EmptyResponse
+from app.models.generic.total_count_mode import TotalCountMode
+from app.models.video_registry.video_aggregations import (
+    HistogramInterval,
+    VideosAggregations,
+)
 from app.models.video_registry.video_details import VideosDetails
+from app.models.video_registry.video_suggestions import VideosSuggestions
 
 app = APIRouter()
 
@@ -23,9 +29,10 @@ logger = get_logger(__name__)
         status.HTTP_200_OK: {"model": Union[VideosDetails, EmptyResponse]},
         status.HTTP_404_NOT_FOUND: {"model": EmptyResponse},
         status.HTTP_403_FORBIDDEN: {"model": EmptyResponse},
+        status.HTTP_410_GONE: {"model": EmptyResponse},
     },
 )
-def get_video_details(
+async def get_video_details(
     limit: int = Query(
         default=50,
         ge=1,
@@ -40,8 +47,35 @@ def get_video_details(
         title="Pagination offset",
         description="Starting index for the video_registry search.",
     ),
+    cursor: Optional[str] = Query(
+        default=None,
+        title="Pagination cursor",
+        description="The 'next_cursor' of the previous page. When given, the offset "
+        "is ignored & the pagination is not limited to the first 10000 entries.",
+    ),
+    point_in_time: bool = Query(
+        default=False,
+        title="Point in time",
+        description="Paginate over a consistent snapshot of the registry, "
+        "for the cursor based pagination.",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        title="Fields",
+        description="Comma separated fields to return, i.e., "
+        "id,title,thumbnail_url,published_at. All the fields if not given.",
+    ),
+    count: Optional[TotalCountMode] = Query(
+        default=None,
+        title="Total counting",
+        description="How to count the total entries: 'exact', 'capped' (a lower "
+        "bound beyond the cap) or 'off' (rely on the 'next_cursor' only). "
+        "The server default if not given.",
+    ),
 ):
-    result = video_manager.get_youtube_videos(limit, offset)
+    result = await video_manager.get_youtube_videos(
+        limit, offset, cursor, point_in_time, fields, count
+    )
     if not result:
         logger.info("Did not find any video entries.")
         return EmptyResponse()
@@ -59,6 +93,7 @@ def get_video_details(
         status.HTTP_200_OK: {"model": Union[VideosDetails, EmptyResponse]},
         status.HTTP_404_NOT_FOUND: {"model": EmptyResponse},
         status.HTTP_403_FORBIDDEN: {"model": EmptyResponse},
+        status.HTTP_410_GONE: {"model": EmptyResponse},
     },
 )
 async def search_videos(
@@ -76,10 +111,115 @@ async def search_videos(
         title="Pagination offset",
         description="Starting index for the video_registry search.",
     ),
+    cursor: Optional[str] = Query(
+        default=None,
+        title="Pagination cursor",
+        description="The 'next_cursor' of the previous page. When given, the offset "
+        "is ignored & the pagination is not limited to the first 10000 entries.",
+    ),
+    point_in_time: bool = Query(
+        default=False,
+        title="Point in time",
+        description="Paginate over a consistent snapshot of the registry, "
+        "for the cursor based pagination.",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        title="Fields",
+        description="Comma separated fields to return, i.e., "
+        "id,title,thumbnail_url,published_at. All the fields if not given.",
+    ),
+    count: Optional[TotalCountMode] = Query(
+        default=None,
+        title="Total counting",
+        description="How to count the total entries: 'exact', 'capped' (a lower "
+        "bound beyond the cap) or 'off' (rely on the 'next_cursor' only). "
+        "The server default if not given.",
+    ),
     query: str = Query(..., title="Video search query", description="String to"),
 ):
-    result = video_manager.search_youtube_videos(limit, offset, query)
+    result = await video_manager.search_youtube_videos(
+        limit, offset, query, cursor, point_in_time, fields, count
+    )
     if not result:
         logger.info("No video entries found with the given query.")
         return EmptyResponse()
     return result
+
+
+@app.get(
+    "/collections/suggest",
+    response_model=VideosSuggestions,
+    status_code=status.HTTP_200_OK,
+    summary="Suggest videos by title",
+    tags=["videos"],
+    description="Suggest the videos whose title matches the typed prefix, "
+    "for the search-as-you-type",
+    responses={
+        status.HTTP_200_OK: {"model": VideosSuggestions},
+    },
+)
+async def suggest_videos(
+    prefix: str = Query(
+        ...,
+        min_length=1,
+        max_length=100,
+        title="Title prefix",
+        description="The typed prefix of a video title, i.e., 'champions lea'",
+    ),
+    limit: int = Query(
+        default=10,
+        ge=1,
+        le=50,
+        title="Suggestions limit",
+        description="Maximum number of suggested videos.",
+    ),
+):
+    return await video_manager.suggest_youtube_videos(prefix, limit)
+
+
+@app.get(
+    "/collections/aggregations",
+    response_model=Union[VideosAggregations, EmptyResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Get the videos facets",
+    tags=["videos"],
+    description="Get the top channels, the publish time histogram & the counts "
+    "of the videos matching the given search queries",
+    responses={
+        status.HTTP_200_OK: {"model": Union[VideosAggregations, EmptyResponse]},
+    },
+)
+async def aggregate_videos(
+    query: Optional[str] = Query(
+        default=None,
+        title="Video search query",
+        description="Restricts the facets to the videos matching the query.",
+    ),
+    queries: Optional[List[str]] = Query(
+        default=None,
+        max_items=10,
+        title="Counted search queries",
+        description="Search queries to count the matching videos of, "
+        "i.e., queries=messi&queries=ronaldo",
+    ),
+    interval: HistogramInterval = Query(
+        default=HistogramInterval.day,
+        title="Histogram interval",
+        description="The bucket interval of the publish time histogram.",
+    ),
+    channels_size: int = Query(
+        default=10,
+        ge=1,
+        le=100,
+        title="Top channels size",
+        description="Number of top channels by videos count.",
+    ),
+):
+    result = await video_manager.aggregate_youtube_videos(
+        query, queries, interval, channels_size
+    )
+    if not result:
+        logger.info("Did not find any video entries.")
+        return EmptyResponse()
+    return result
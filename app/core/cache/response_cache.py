@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from structlog import get_logger
+
+from app.core.config import settings
+
+logger = get_logger()
+
+
+class ResponseCache:
+    """
+    In-process cache of the already serialized API response bodies.
+
+    Entries are evicted least recently used first, once the entries or the
+    bytes cap is reached, and expire after the TTL. Writes of new videos
+    invalidate the whole cache by bumping its generation, the responses
+    computed against an older generation are never stored.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, **params) -> tuple:
+        """
+        Method to build the cache key of a request
+        Args:
+            endpoint: the endpoint name
+            params: the normalized request params
+        Returns:
+            the cache key
+        """
+        return (endpoint,) + tuple(sorted(params.items()))
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """
+        Method to get a cached response body
+        Args:
+            key: the cache key
+        Returns:
+            the response body, None if not cached or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, body = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: tuple, body: bytes, generation: int):
+        """
+        Method to cache a response body
+        Args:
+            key: the cache key
+            body: the serialized response body
+            generation: the cache generation read before computing the response
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                # New videos were written meanwhile, the response may be stale
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self):
+        """
+        Method to drop all the cached responses, i.e., after new videos are written
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._size = 0
+        logger.debug("Invalidated the response cache.", generation=self.generation)
+
+    def _remove(self, key: tuple):
+        _, body = self._entries.pop(key)
+        self._size -= len(body)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_bytes,
+    ttl=settings.response_cache_ttl,
+)
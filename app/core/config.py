@@ -1,4 +1,5 @@
 import logging
+import os
 import sys
 
 from pydantic.error_wrappers import ValidationError
@@ -33,8 +34,6 @@ class Settings:
 
     DB_INIT_SUCCESS: bool = True
 
-    google_api_key = None
-
     @property
     def elasticsearch_url(self):
         try:
@@ -46,6 +45,75 @@ class Settings:
         except Exception as ex:
             raise ValueError(f"Exception while getting the ES Url : {str(ex)}")
 
+    @property
+    def elasticsearch_hosts(self):
+        """
+        The elasticsearch nodes, comma separated urls
+        """
+        return config_utils.get_list_env(
+            "ELASTICSEARCH_HOSTS", [self.elasticsearch_url]
+        )
+
+    @property
+    def es_connections_per_node(self):
+        """
+        Connections kept per elasticsearch node, matched to the default
+        thread pool size running the blocking DAL calls
+        """
+        return int(
+            os.getenv("ES_CONNECTIONS_PER_NODE", min(32, (os.cpu_count() or 1) + 4))
+        )
+
+    @property
+    def es_sniff_enabled(self):
+        """
+        Discovers the cluster nodes on start, on a node failure & periodically
+        """
+        return config_utils.get_bool_env("ES_SNIFF_ENABLED", False)
+
+    @property
+    def es_sniffer_timeout(self):
+        """
+        Seconds between two periodic discoveries of the cluster nodes
+        """
+        return 60
+
+    @property
+    def es_max_retries(self):
+        """
+        Retries of a failed request, on the other nodes
+        """
+        return 3
+
+    @property
+    def es_dead_timeout(self):
+        """
+        Seconds a failed node is left out, doubled on each consecutive failure
+        """
+        return 30
+
+    @property
+    def es_dead_timeout_cutoff(self):
+        """
+        Consecutive failures after which the left out time stops doubling
+        """
+        return 5
+
+    @property
+    def es_read_timeout(self):
+        return int(os.getenv("ES_READ_TIMEOUT", "10"))
+
+    @property
+    def es_write_timeout(self):
+        return int(os.getenv("ES_WRITE_TIMEOUT", "30"))
+
+    @property
+    def es_reindex_timeout(self):
+        """
+        Seconds to wait for the reindexing of an index by the migration
+        """
+        return int(os.getenv("ES_REINDEX_TIMEOUT", "3600"))
+
     @property
     def elasticsearch_user(self):
         return ""
@@ -58,33 +126,303 @@ class Settings:
     def elasticsearch_init_complete(self):
         return self.DB_INIT_SUCCESS
 
+    @property
+    def es_bulk_chunk_size(self):
+        return 500
+
+    @property
+    def es_bulk_max_chunk_bytes(self):
+        return 10 * 1024 * 1024
+
+    @property
+    def es_bulk_max_retries(self):
+        return 3
+
+    @property
+    def es_bulk_retry_backoff(self):
+        return 1
+
+    @property
+    def storage_backend(self):
+        """
+        The videos storage: 'elasticsearch', or 'sqlite' for the embedded
+        single node storage
+        """
+        return os.getenv("STORAGE_BACKEND", "elasticsearch")
+
+    @property
+    def sqlite_db_path(self):
+        return os.getenv("SQLITE_DB_PATH", "/var/lib/video-registry/videos.db")
+
+    @property
+    def sqlite_reader_pool_size(self):
+        """
+        Read connections kept open, matched to the default thread pool size
+        running the blocking DAL calls
+        """
+        return int(
+            os.getenv("SQLITE_READER_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4))
+        )
+
+    @property
+    def sqlite_batch_size(self):
+        """
+        Videos written per transaction
+        """
+        return 500
+
+    @property
+    def sqlite_busy_timeout(self):
+        """
+        Seconds a connection waits for a lock held by another connection
+        """
+        return 5
+
+    @property
+    def sqlite_cache_size_kib(self):
+        """
+        Page cache of each connection
+        """
+        return int(os.getenv("SQLITE_CACHE_SIZE_KIB", "16384"))
+
+    @property
+    def sqlite_mmap_size(self):
+        """
+        Bytes of the database file memory-mapped, shared by the connections
+        """
+        return int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+    @property
+    def total_count_mode(self):
+        """
+        Default counting of the matching videos: exact, capped or off
+        """
+        return os.getenv("TOTAL_COUNT_MODE", "capped")
+
+    @property
+    def total_count_cap(self):
+        """
+        Matches counted in the capped counting mode
+        """
+        return 10000
+
+    @property
+    def response_cache_enabled(self):
+        return config_utils.get_bool_env("RESPONSE_CACHE_ENABLED", True)
+
+    @property
+    def response_cache_max_entries(self):
+        return 1000
+
+    @property
+    def response_cache_max_bytes(self):
+        return 64 * 1024 * 1024
+
+    @property
+    def response_cache_ttl(self):
+        """
+        Seconds a cached response is served, bounds the staleness when the
+        ingestion runs in a separate worker process
+        """
+        return 10
+
+    @property
+    def response_cache_invalidation_delay(self):
+        """
+        Seconds after a write when the new videos become searchable,
+        matches the index refresh interval
+        """
+        return 5
+
+    @property
+    def youtube_strict_parsing(self):
+        """
+        Validates the youtube API responses against the full pydantic models,
+        instead of the lean projection of the stored fields (debugging)
+        """
+        return config_utils.get_bool_env("YOUTUBE_STRICT_PARSING", False)
+
+    @property
+    def fast_json_enabled(self):
+        """
+        Opt-in orjson serialization of the collection & search responses
+        """
+        return config_utils.get_bool_env("FAST_JSON_ENABLED", False)
+
     @property
     def youtube_base_url(self):
-        return "https://www.googleapis.com"
+        """
+        The youtube data API host, i.e., a local stand-in for the benchmarks
+        """
+        return os.getenv("YOUTUBE_BASE_URL", "https://www.googleapis.com")
+
+    @property
+    def http_max_connections(self):
+        return 20
+
+    @property
+    def http_max_keepalive_connections(self):
+        return 10
+
+    @property
+    def http_keepalive_expiry(self):
+        return 30
+
+    @property
+    def http_connect_timeout(self):
+        return 5
+
+    @property
+    def http_read_timeout(self):
+        return 10
+
+    @property
+    def http_max_retries(self):
+        """
+        Retries of a call failing with a 5xx/429 status or a transport error
+        """
+        return 3
+
+    @property
+    def http_retry_backoff(self):
+        """
+        Seconds of the first retry's backoff, doubled on each retry & jittered
+        """
+        return 0.5
+
+    @property
+    def http_retry_max_backoff(self):
+        """
+        Maximum seconds waited before a retry, 'Retry-After' included
+        """
+        return 30
+
+    @property
+    def etag_cache_max_entries(self):
+        """
+        Maximum ETags kept of the first pages of the youtube searches
+        """
+        return 10000
+
+    @property
+    def circuit_breaker_failure_threshold(self):
+        """
+        Consecutive failed calls opening the circuit of an external API
+        """
+        return 5
+
+    @property
+    def circuit_breaker_reset_timeout(self):
+        """
+        Seconds an open circuit rejects the calls before a trial call
+        """
+        return 30
 
     @property
     def sleep_interval(self):
+        """
+        Minimum seconds between two polls of the ingestion
+        """
         return 10
 
     @property
-    def video_query_string(self):
-        return "football"
+    def poll_max_interval(self):
+        """
+        Maximum seconds between two polls, when backing off on empty polls
+        """
+        return 900
+
+    @property
+    def poll_high_yield_count(self):
+        """
+        Indexed videos from which a poll shortens the polling interval
+        """
+        return 25
+
+    @property
+    def poll_backoff_factor(self):
+        """
+        Factor the polling interval is scaled by, up on empty polls
+        & down on high yield polls
+        """
+        return 2
+
+    @property
+    def api_daily_unit_budget(self):
+        """
+        Daily quota units the ingestion plans its polls with, across all
+        the API keys. All the keys' quota if not set.
+        """
+        budget = os.getenv("API_DAILY_UNIT_BUDGET")
+        return int(budget) if budget else None
+
+    @property
+    def in_api_ingestion_enabled(self):
+        """
+        Whether the API process runs the background ingestion itself.
+        Disable it when the ingestion runs as a separate worker (poetry run ingest).
+        """
+        return config_utils.get_bool_env("IN_API_INGESTION_ENABLED", True)
+
+    @property
+    def ingestion_status_host(self):
+        return os.getenv("INGESTION_STATUS_HOST", "0.0.0.0")
+
+    @property
+    def ingestion_status_port(self):
+        return int(os.getenv("INGESTION_STATUS_PORT", "5001"))
+
+    @property
+    def ingestion_state_file_path(self):
+        return os.getenv(
+            "INGESTION_STATE_FILE_PATH", "/var/lib/video-registry/ingestion_state.json"
+        )
+
+    @property
+    def ingestion_watermark_overlap(self):
+        """
+        Seconds re-checked before the watermark, for the late-arriving videos
+        """
+        return 300
+
+    @property
+    def ingestion_topics(self):
+        """
+        The search queries followed by the ingestion, comma separated
+        """
+        return config_utils.get_list_env("INGESTION_TOPICS", ["football"])
+
+    @property
+    def ingestion_topic_concurrency(self):
+        """
+        Maximum topics searched in parallel
+        """
+        return 4
 
     @property
     def keys_file_path(self):
         return "/var/keys.txt"
 
     @property
-    def api_keys(self):
+    def api_key_daily_quota(self):
+        """
+        The daily quota units of each youtube API key
+        """
+        return 10000
+
+    @property
+    def api_key_cooldown(self):
+        """
+        Seconds a rate limited API key is left unused
+        """
+        return 60
+
+    @property
+    def api_key_fanout_concurrency(self):
         """
-        Reads the api_keys from the file
-        Args:
-        Returns:
-            the json content
+        Maximum parallel youtube API calls spread across the healthy keys
         """
-        logger.info("Reading API Keys from the file.")
-        expected_data = config_utils.read_file(self.keys_file_path)
-        return [data.strip() for data in expected_data]
+        return 4
 
 
 try:
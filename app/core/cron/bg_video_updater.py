@@ -1,99 +1,538 @@
 import asyncio
+from typing import List
 
+from starlette.concurrency import run_in_threadpool
 from structlog import get_logger
 
 from app.api.client import fetch_youtube_videos
+from app.api.client.api_key_pool import api_key_pool
+from app.core.cache.response_cache import response_cache
 from app.core.config import settings
+from app.core.cron.ingestion_checkpoint import IngestionCheckpoint
+from app.core.cron.poll_scheduler import PollScheduler
+from app.core.cron.seen_video_filter import SeenVideoFilter
 from app.core.exception_handler.video_registry_exception import VideoRegistryException
-from app.data_access_layer.elasticsearch.elasticsearch_dal import ElasticsearchDAL
-from app.models.youtube.youtube_search_results import YoutubePublishedVideos
-from app.utils.common_utils import get_published_after
+from app.data_access_layer import dal_factory
+from app.data_access_layer.generic.video_registry_db_interface import (
+    VideoRegistryDBInterface,
+)
+from app.models.ingestion.ingestion_status import IngestionStatus
+from app.models.youtube import youtube_records
+from app.models.youtube.youtube_records import VideoRecord
+from app.utils.common_utils import (
+    get_epoch_millis,
+    get_published_after,
+    rfc_3339_to_epoch,
+)
+from app.utils.shared_constants import TITLE_SUGGEST_KEY, TITLE_SUGGEST_MAX_INPUTS
 
 logger = get_logger()
 
+# Ingestion states
+INGESTION_STATE_IDLE = "idle"
+INGESTION_STATE_POLLING = "polling"
+INGESTION_STATE_SLEEPING = "sleeping"
+INGESTION_STATE_STOPPED = "stopped"
 
-def insert_new_videos(
-    published_after: str, content_type: str = "video", order_by: str = "date"
+ingestion_status = IngestionStatus()
+seen_videos = SeenVideoFilter()
+
+
+class _TopicPaging:
+    """
+    The paging of the newly published videos search of a topic, within a poll
+    """
+
+    def __init__(
+        self,
+        topic,
+        published_after,
+        page_token=None,
+        newest_published_at=None,
+        oldest_failed_published_at=None,
+    ):
+        self.topic = topic
+        self.published_after = published_after
+        self.page_token = page_token
+        self.newest_published_at = newest_published_at
+        # The watermark stays below the videos that failed to index
+        self.oldest_failed_published_at = oldest_failed_published_at
+        # A paging resumed from the checkpoint, its page token may have expired
+        self.is_resumed = page_token is not None
+        # Remembered once the paging completes, to skip the unchanged searches
+        self.first_page_etag = None
+
+
+async def insert_new_videos(
+    checkpoint: IngestionCheckpoint,
+    topics: List[str] = None,
+    content_type: str = "video",
+    order_by: str = "date",
+    dal: VideoRegistryDBInterface = None,
 ):
     """
-    Method to get the youtube published videos based on the filters provided
+    Method to get the youtube videos newly published on the given topics
+    & index them. The topics are searched concurrently, a page each per round;
+    the videos found by all the topics in a round are de-duplicated together,
+    so each video is fetched & indexed once.
+    Args:
+        checkpoint: the per-topic watermarks & paging positions
+        topics: the search queries, the configured topics if not given
+        content_type:
+        order_by:
+        dal: the DAL to write the videos with, the configured one if not given
+    Returns:
+        the count of indexed videos
     """
+    topics = settings.ingestion_topics if topics is None else topics
+    pagings = [_get_topic_paging(checkpoint, topic) for topic in topics]
+    semaphore = asyncio.Semaphore(settings.ingestion_topic_concurrency)
+    indexed_count = 0
     try:
-        next_page_token = None
-        while True:
-            video_ids = []
-
-            youtube_published_videos = fetch_youtube_videos.search_newly_added_videos(
-                published_after=published_after,
-                content_type=content_type,
-                order_by=order_by,
-                next_page_token=next_page_token,
+        dal = dal or dal_factory.get_dal()
+        while pagings:
+            round_result = await _ingest_round(
+                checkpoint, pagings, semaphore, dal, content_type, order_by
             )
-            if not youtube_published_videos:
+            if round_result is None:
+                # None of the topics moves past the videos that failed
                 break
-            youtube_published_videos_instance = YoutubePublishedVideos(
-                **youtube_published_videos
+            pagings, round_indexed_count = round_result
+            indexed_count += round_indexed_count
+            checkpoint.save()
+    except VideoRegistryException as e:
+        logger.error(
+            "Error occurred while fetching newly published videos", error=str(e)
+        )
+        ingestion_status.last_error = str(e.detail or e.error_code)
+    checkpoint.save()
+    return indexed_count
+
+
+async def _ingest_round(checkpoint, pagings, semaphore, dal, content_type, order_by):
+    """
+    Method to search the next page of each topic & index the unseen videos
+    found by all of them
+    Args:
+        checkpoint: the per-topic watermarks & paging positions
+        pagings: the pagings of the topics to search
+        semaphore: bounds the concurrent searches
+        dal: the DAL to write the videos with
+        content_type:
+        order_by:
+    Returns:
+        the pagings continuing with their next page & the count of indexed
+        videos, None if the details of the videos could not be fetched
+    """
+    pages = await asyncio.gather(
+        *(
+            _search_topic_page(paging, semaphore, content_type, order_by)
+            for paging in pagings
+        )
+    )
+    searched = _get_searched_pages(checkpoint, pagings, pages)
+
+    # Skipping the details fetch & re-indexing of the already indexed videos
+    unseen_video_ids = _get_unseen_video_ids(searched)
+    indexed_count, published_at_by_id, failed_published_at_by_id = 0, {}, {}
+    if unseen_video_ids:
+        index_result = await _index_video_details(dal, unseen_video_ids)
+        if index_result is None:
+            return None
+        indexed_count, published_at_by_id, failed_published_at_by_id = index_result
+
+    next_pagings = [
+        paging
+        for paging, page_video_ids, next_page_token in searched
+        if _advance_paging(
+            checkpoint,
+            paging,
+            page_video_ids,
+            next_page_token,
+            published_at_by_id,
+            failed_published_at_by_id,
+            content_type,
+            order_by,
+        )
+    ]
+    return next_pagings, indexed_count
+
+
+def _get_searched_pages(checkpoint, pagings, pages):
+    """
+    Method to pick the search pages to process in a round, completing the
+    pagings of the topics with no new videos
+    Args:
+        checkpoint: the per-topic watermarks & paging positions
+        pagings: the pagings searched in the round
+        pages: the search page of each paging, NOT_MODIFIED or None
+    Returns:
+        the paging, the video ids & the next page token of each searched page
+    """
+    searched = []
+    for paging, page in zip(pagings, pages):
+        if page is fetch_youtube_videos.NOT_MODIFIED:
+            # Same results as the last completed search, nothing new
+            logger.info(
+                f"No new videos published since {paging.published_after}",
+                topic=paging.topic,
             )
+            checkpoint.complete(paging.topic, None)
+        elif page is not None:
+            if paging.page_token is None:
+                paging.first_page_etag = page.etag
+            searched.append((paging, page.video_ids, page.next_page_token))
+        elif paging.is_resumed:
+            # Restarting from the watermark on the next poll,
+            # the already indexed videos are skipped then
+            checkpoint.complete(paging.topic, None)
+        # Otherwise the topic resumes from its last page on the next poll
+    return searched
+
+
+def _get_unseen_video_ids(searched):
+    """
+    Method to merge the videos found by all the topics in a round, in their
+    search order, leaving out the already indexed videos
+    Args:
+        searched: the paging, the video ids & the next page token of each page
+    Returns:
+        the ids of the videos to index
+    """
+    video_ids = list(
+        dict.fromkeys(
+            video_id for _, page_video_ids, _ in searched for video_id in page_video_ids
+        )
+    )
+    unseen_video_ids = seen_videos.filter_unseen(video_ids)
+    logger.debug(
+        "Filtered the already indexed videos.",
+        topic_count=len(searched),
+        video_count=len(video_ids),
+        unseen_count=len(unseen_video_ids),
+    )
+    return unseen_video_ids
+
+
+def _advance_paging(
+    checkpoint,
+    paging,
+    page_video_ids,
+    next_page_token,
+    published_at_by_id,
+    failed_published_at_by_id,
+    content_type,
+    order_by,
+):
+    """
+    Method to move the paging of a topic past its indexed page, saving its
+    position in the checkpoint, or to complete it after its last page
+    Args:
+        checkpoint: the per-topic watermarks & paging positions
+        paging: the paging of the topic
+        page_video_ids: the video ids of the indexed page
+        next_page_token: the token of the next page, if any
+        published_at_by_id: the publish time of the indexed videos by their id
+        failed_published_at_by_id: the publish time of the videos that failed
+            to index by their id
+        content_type:
+        order_by:
+    Returns:
+        True if the paging continues with the next page
+    """
+    paging.newest_published_at = _get_page_published_at(
+        max, paging.newest_published_at, page_video_ids, published_at_by_id
+    )
+    paging.oldest_failed_published_at = _get_page_published_at(
+        min,
+        paging.oldest_failed_published_at,
+        page_video_ids,
+        failed_published_at_by_id,
+    )
+    if page_video_ids and next_page_token:
+        paging.page_token = next_page_token
+        paging.is_resumed = False
+        checkpoint.set_page_state(
+            paging.topic,
+            paging.published_after,
+            paging.page_token,
+            paging.newest_published_at,
+            paging.oldest_failed_published_at,
+        )
+        return True
+
+    if not page_video_ids:
+        logger.info(
+            f"No new videos published since {paging.published_after}",
+            topic=paging.topic,
+        )
+    checkpoint.complete(paging.topic, _get_paging_watermark(paging))
+    if paging.first_page_etag:
+        fetch_youtube_videos.remember_search(
+            paging.topic,
+            paging.published_after,
+            paging.first_page_etag,
+            content_type,
+            order_by,
+        )
+    return False
 
-            # Adding all the videos' id to a list to get their details as part of Single API call
-            for published_video in youtube_published_videos_instance.items:
-                if published_video.id.videoId:
-                    video_ids.append(published_video.id.videoId)
 
-            if settings.google_api_key and not video_ids:
-                # If API key was valid but no new videos were published.
-                logger.info(f"No new videos published since {published_after}")
-                return None
+def _get_page_published_at(pick, published_at, page_video_ids, published_at_by_id):
+    """
+    Method to pick the newest/oldest publish time among the videos of a page
+    & the one picked from the previous pages
+    Args:
+        pick: max for the newest, min for the oldest
+        published_at: the publish time picked from the previous pages, if any
+        page_video_ids: the video ids of the page
+        published_at_by_id: the publish time of the videos by their id
+    Returns:
+        the picked publish time, None if there is none
+    """
+    return pick(
+        filter(
+            None,
+            (published_at, *(published_at_by_id.get(v) for v in page_video_ids)),
+        ),
+        default=None,
+    )
 
-            if not video_ids:
-                return None
 
-            # Getting details of 50 videos at a time
-            video_details = fetch_youtube_videos.get_video_details(video_ids)
+def _get_paging_watermark(paging):
+    """
+    Method to get the watermark of a completed paging, its newest indexed
+    publish time, held below the videos that failed to index so they are
+    searched again on the next poll
+    """
+    if paging.oldest_failed_published_at is None or not paging.newest_published_at:
+        return paging.newest_published_at
+    return min(paging.newest_published_at, paging.oldest_failed_published_at - 1)
+
+
+def _get_topic_paging(checkpoint, topic):
+    """
+    Method to get the paging of a topic, resuming its unfinished paging if
+    any, otherwise starting from its watermark
+    """
+    page_state = checkpoint.get_page_state(topic)
+    if page_state:
+        return _TopicPaging(
+            topic,
+            page_state["published_after"],
+            page_state["page_token"],
+            page_state["newest_published_at"],
+            page_state.get("oldest_failed_published_at"),
+        )
+    # Re-checking a small overlap before the watermark for late arrivals
+    watermark = checkpoint.get_watermark(topic)
+    return _TopicPaging(
+        topic,
+        get_published_after(
+            watermark - settings.ingestion_watermark_overlap if watermark else None
+        ),
+    )
 
-            if not video_details:
-                return None
 
-            # Writing each video-details as an individual document in the DB
-            elasticsearch_dal = ElasticsearchDAL()
-            for data_to_insert in video_details.get("items"):
-                elasticsearch_dal.add_records(
-                    _get_only_relevant_data(data_to_insert), {}
+async def _search_topic_page(paging, semaphore, content_type, order_by):
+    """
+    Method to search the next page of the newly published videos of a topic
+    Returns:
+        the search results, NOT_MODIFIED if unchanged since the last completed
+        search, None if the search failed
+    """
+    async with semaphore:
+        try:
+            youtube_published_videos = (
+                await fetch_youtube_videos.search_newly_added_videos(
+                    query=paging.topic,
+                    published_after=paging.published_after,
+                    content_type=content_type,
+                    order_by=order_by,
+                    next_page_token=paging.page_token,
                 )
+            )
+        except VideoRegistryException as e:
+            logger.error(
+                "Error occurred while searching newly published videos",
+                topic=paging.topic,
+                error=str(e),
+            )
+            ingestion_status.last_error = str(e.detail or e.error_code)
+            return None
+    if youtube_published_videos is fetch_youtube_videos.NOT_MODIFIED:
+        return youtube_published_videos
+    if not youtube_published_videos:
+        return None
+    return youtube_records.parse_search_page(
+        youtube_published_videos, strict=settings.youtube_strict_parsing
+    )
 
-            if not youtube_published_videos_instance.nextPageToken:
-                break
-            else:
-                next_page_token = youtube_published_videos_instance.nextPageToken
-    except VideoRegistryException as e:
+
+async def _index_video_details(dal, video_ids):
+    """
+    Method to fetch the details of the given videos & index them in bulk
+    Args:
+        dal: the DAL to write the videos with
+        video_ids: the video ids
+    Returns:
+        the count of indexed videos, the publish time (epoch seconds) of each
+        indexed video by its id & the same of each video that failed to index,
+        None if the details could not be fetched
+    """
+    video_details = await fetch_youtube_videos.get_video_details_many(video_ids)
+    if not all(video_details):
+        return None
+
+    videos = [
+        video
+        for details in video_details
+        for video in youtube_records.parse_videos(
+            details, strict=settings.youtube_strict_parsing
+        )
+    ]
+    indexed_count, errors = await _write_videos(dal, videos)
+
+    failed_ids = {error["id"] for error in errors}
+    published_at_by_id, failed_published_at_by_id = {}, {}
+    for video in videos:
+        by_id = (
+            failed_published_at_by_id if video.id in failed_ids else published_at_by_id
+        )
+        by_id[video.id] = rfc_3339_to_epoch(video.published_at)
+    seen_videos.add_many(published_at_by_id)
+    return indexed_count, published_at_by_id, failed_published_at_by_id
+
+
+async def _write_videos(dal, videos):
+    """
+    Method to index the videos in bulk, off the event loop
+    Args:
+        dal: the DAL to write the videos with
+        videos: the video records
+    Returns:
+        the count of indexed videos & the errors of the failed ones
+    """
+    if not videos:
+        return 0, []
+    documents = [_get_only_relevant_data(video) for video in videos]
+    # The DAL writes are blocking, keeping them off the event loop
+    indexed_count, errors = await run_in_threadpool(dal.add_records_bulk, documents, {})
+    if errors:
         logger.error(
-            "Error occurred while fetching newly published videos", error=str(e)
+            "Failed to index some of the newly published videos.",
+            failed_count=len(errors),
+            errors=errors,
         )
+    return indexed_count, errors
 
 
-def _get_only_relevant_data(video_data):
+def _get_only_relevant_data(video: VideoRecord):
     """
     Method to build ES document with only the relevant information
     """
     return {
-        "kind": video_data["kind"],
-        "id": video_data["id"],
-        "published_at": video_data["snippet"]["publishedAt"],
-        "title": video_data["snippet"]["title"],
-        "description": video_data["snippet"]["description"],
-        "thumbnail_url": video_data["snippet"]["thumbnails"]["default"]["url"],
-        "channel_title": video_data["snippet"]["channelTitle"],
+        "kind": video.kind,
+        "id": video.id,
+        "published_at": video.published_at,
+        "title": video.title,
+        "description": video.description,
+        "thumbnail_url": video.thumbnail_url,
+        "channel_title": video.channel_title,
+        TITLE_SUGGEST_KEY: _get_title_suggest(video.title, video.published_at),
+    }
+
+
+def _get_title_suggest(title, published_at):
+    """
+    Method to build the title suggestion inputs of a video. The title is
+    matched by the prefix of any of its first words, the newer videos
+    are suggested first.
+    """
+    words = title.split()
+    return {
+        "input": [
+            " ".join(words[i:])
+            for i in range(min(len(words), TITLE_SUGGEST_MAX_INPUTS))
+        ],
+        # Publish time in hours, ranking the newer videos higher
+        "weight": rfc_3339_to_epoch(published_at) // 3600,
     }
 
 
-async def insert_newly_published_videos():
+def _invalidate_response_cache():
+    """
+    Drops the cached API responses once new videos are written, and again
+    once they become searchable after the index refresh
+    """
+    response_cache.invalidate()
+    asyncio.get_event_loop().call_later(
+        settings.response_cache_invalidation_delay, response_cache.invalidate
+    )
+
+
+async def _warm_seen_videos(dal: VideoRegistryDBInterface):
+    """
+    Loads the already indexed video ids into the seen videos filter.
+    On failure the filter stays cold & the warm up is retried on the next poll.
+    """
+    try:
+        # The ids are scrolled lazily, within the thread pool
+        await run_in_threadpool(seen_videos.warm, dal.get_all_record_ids({}))
+    except VideoRegistryException as e:
+        logger.error("Failed to warm the seen videos filter", error=str(e))
+
+
+async def insert_newly_published_videos(
+    stop_event: asyncio.Event = None, dal: VideoRegistryDBInterface = None
+):
     """
     A background task which keeps checking
-    for newly published youtube videos after a
-    given interval of time
-    """
-    while True:
-        published_after = get_published_after()
-        logger.debug("Checking for new video uploads.", published_after=published_after)
-        insert_new_videos(published_after)
-        await asyncio.sleep(settings.sleep_interval)
+    for newly published youtube videos after an
+    interval adapted to the polls' yield & the quota
+    budget, until the stop_event is set.
+    A running poll is always completed before stopping.
+    The videos are written with the given DAL, the configured one if not given.
+    """
+    stop_event = stop_event or asyncio.Event()
+    dal = dal or dal_factory.get_dal()
+    checkpoint = IngestionCheckpoint(settings.ingestion_state_file_path)
+    scheduler = PollScheduler(api_key_pool, len(settings.ingestion_topics))
+    ingestion_status.started_at = get_epoch_millis()
+    while not stop_event.is_set():
+        ingestion_status.state = INGESTION_STATE_POLLING
+        ingestion_status.last_poll_started_at = get_epoch_millis()
+        ingestion_status.last_error = None
+
+        if not seen_videos.is_warm:
+            await _warm_seen_videos(dal)
+
+        logger.debug("Checking for new video uploads.")
+        scheduler.start_poll()
+        try:
+            indexed_count = await insert_new_videos(checkpoint, dal=dal)
+        except Exception as e:
+            # Keeping the background task alive for the next poll
+            logger.exception("Unexpected error while polling for new videos")
+            ingestion_status.last_error = str(e)
+            indexed_count = 0
+
+        if indexed_count:
+            _invalidate_response_cache()
+
+        ingestion_status.polls += 1
+        ingestion_status.last_poll_completed_at = get_epoch_millis()
+        ingestion_status.last_indexed_count = indexed_count
+        ingestion_status.total_indexed_count += indexed_count
+
+        # Polling more often on a high yield, less often on no yield & quota
+        ingestion_status.next_poll = scheduler.plan_next_poll(indexed_count)
+        ingestion_status.state = INGESTION_STATE_SLEEPING
+        try:
+            await asyncio.wait_for(
+                stop_event.wait(), timeout=ingestion_status.next_poll.interval
+            )
+        except asyncio.TimeoutError:
+            pass
+    ingestion_status.state = INGESTION_STATE_STOPPED
+    logger.info("Stopped checking for new video uploads.")
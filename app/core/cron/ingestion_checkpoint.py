@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+from typing import Optional
+
+from structlog import get_logger
+
+logger = get_logger()
+
+WATERMARKS_KEY = "watermarks"
+PAGE_STATES_KEY = "page_states"
+
+
+class IngestionCheckpoint:
+    """
+    Persistent state of the background ingestion, per search query (topic).
+
+    Keeps the newest successfully indexed 'publishedAt' (as epoch seconds)
+    of each topic, along with the position of its unfinished paging, in a
+    local state file. The ingestion resumes from where it stopped, across
+    polls as well as restarts. The changes are written with save().
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._state = self._load()
+        self._is_dirty = False
+
+    def get_watermark(self, query: str) -> Optional[int]:
+        """
+        Method to get the high-water mark of a search query
+        Args:
+            query: the search query
+        Returns:
+            the newest indexed publish time in epoch seconds, None if unknown
+        """
+        return self._state[WATERMARKS_KEY].get(query)
+
+    def advance(self, query: str, published_at: int):
+        """
+        Method to move the high-water mark of a search query forward.
+        Older values are ignored, the mark never moves backwards.
+        Args:
+            query: the search query
+            published_at: the newest indexed publish time in epoch seconds
+        """
+        current = self.get_watermark(query)
+        if current is not None and published_at <= current:
+            return
+        self._state[WATERMARKS_KEY][query] = published_at
+        self._is_dirty = True
+        logger.debug(
+            "Advanced the ingestion watermark.", query=query, epoch=published_at
+        )
+
+    def get_page_state(self, query: str) -> Optional[dict]:
+        """
+        Method to get the position of the unfinished paging of a search query
+        Args:
+            query: the search query
+        Returns:
+            dict with the 'published_after' the paging started with, the
+            'page_token' of the next page & the 'newest_published_at' indexed
+            by the previous pages, along with the 'oldest_failed_published_at'
+            of the videos they failed to index if any, None if there is no
+            unfinished paging
+        """
+        return self._state[PAGE_STATES_KEY].get(query)
+
+    def set_page_state(
+        self,
+        query: str,
+        published_after: str,
+        page_token: str,
+        newest_published_at: Optional[int],
+        oldest_failed_published_at: Optional[int] = None,
+    ):
+        """
+        Method to record the paging position of a search query,
+        once the videos of the previous pages are indexed
+        Args:
+            query: the search query
+            published_after: the date the paging started with
+            page_token: the token of the next page
+            newest_published_at: the newest publish time indexed so far
+            oldest_failed_published_at: the oldest publish time of the videos
+                that failed to index so far, if any
+        """
+        page_state = {
+            "published_after": published_after,
+            "page_token": page_token,
+            "newest_published_at": newest_published_at,
+        }
+        if oldest_failed_published_at is not None:
+            page_state["oldest_failed_published_at"] = oldest_failed_published_at
+        self._state[PAGE_STATES_KEY][query] = page_state
+        self._is_dirty = True
+
+    def complete(self, query: str, newest_published_at: Optional[int]):
+        """
+        Method to finish the paging of a search query, moving its
+        high-water mark to the newest indexed publish time
+        Args:
+            query: the search query
+            newest_published_at: the newest publish time indexed by the paging
+        """
+        if self._state[PAGE_STATES_KEY].pop(query, None) is not None:
+            self._is_dirty = True
+        if newest_published_at:
+            self.advance(query, newest_published_at)
+
+    def save(self):
+        """
+        Method to atomically write the checkpoint state file, if changed
+        """
+        if not self._is_dirty:
+            return
+        directory = os.path.dirname(self.file_path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.file_path)
+            self._is_dirty = False
+        except OSError as ex:
+            # The state is kept in memory, only the restart resumption is lost
+            logger.exception(
+                "Failed to write the ingestion checkpoint.",
+                file_path=self.file_path,
+                exception=str(ex),
+            )
+
+    def _load(self) -> dict:
+        """
+        Method to read the checkpoint state file
+        Returns:
+            the stored state, an empty state if the file is missing/corrupt
+        """
+        state = {WATERMARKS_KEY: {}, PAGE_STATES_KEY: {}}
+        if not os.path.isfile(self.file_path):
+            logger.info("No ingestion checkpoint found.", file_path=self.file_path)
+            return state
+        try:
+            with open(self.file_path) as f:
+                state.update(json.load(f))
+        except (OSError, ValueError) as ex:
+            logger.exception(
+                "Failed to read the ingestion checkpoint, starting afresh.",
+                file_path=self.file_path,
+                exception=str(ex),
+            )
+        return state
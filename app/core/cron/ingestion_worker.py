@@ -0,0 +1,115 @@
+"""
+Standalone runtime for the background ingestion.
+
+Runs the newly published videos updater in its own process, so that it
+can be scaled independently of the API workers. Start it with:
+    poetry run ingest
+
+The worker exposes its status over plain HTTP:
+    GET /health - 200 while the ingestion loop is running, else 503
+    GET /status - the current ingestion status
+"""
+import asyncio
+import json
+import signal
+
+from structlog import get_logger
+
+from app.api.client import http_client
+from app.core.config import settings
+from app.core.cron import bg_video_updater
+from app.data_access_layer.sqlite import sqlite_connection
+
+logger = get_logger()
+
+HEALTH_PATH = "/health"
+STATUS_PATH = "/status"
+
+HTTP_REASONS = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}
+
+
+async def run_worker():
+    """
+    Runs the ingestion loop & the status server until SIGINT/SIGTERM is received
+    """
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, _request_shutdown, stop_event, sig)
+
+    status_server = await asyncio.start_server(
+        _handle_status_request,
+        host=settings.ingestion_status_host,
+        port=settings.ingestion_status_port,
+    )
+    logger.info(
+        "Started the ingestion worker.",
+        status_host=settings.ingestion_status_host,
+        status_port=settings.ingestion_status_port,
+    )
+    try:
+        await bg_video_updater.insert_newly_published_videos(stop_event)
+    finally:
+        status_server.close()
+        await status_server.wait_closed()
+        await http_client.close_client()
+        sqlite_connection.close_pool()
+        logger.info("Stopped the ingestion worker.")
+
+
+def _request_shutdown(stop_event, sig):
+    """
+    Signal handler, lets the running poll complete before stopping
+    """
+    logger.info("Received shutdown signal.", signal=signal.Signals(sig).name)
+    stop_event.set()
+
+
+async def _handle_status_request(reader, writer):
+    """
+    Minimal HTTP handler serving the health & status of the ingestion
+    """
+    try:
+        request_line = await reader.readline()
+        # Draining the request headers
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        path = parts[1] if len(parts) > 1 else ""
+        status = bg_video_updater.ingestion_status
+
+        if path == HEALTH_PATH:
+            healthy = status.state != bg_video_updater.INGESTION_STATE_STOPPED
+            status_code = 200 if healthy else 503
+            body = {"healthy": healthy}
+        elif path == STATUS_PATH:
+            status_code = 200
+            body = status.dict()
+        else:
+            status_code = 404
+            body = {"message": "Not found"}
+
+        content = json.dumps(body).encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status_code} {HTTP_REASONS[status_code]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + content
+        )
+        await writer.drain()
+    except ConnectionError:
+        logger.debug("Status request connection closed by the client.")
+    finally:
+        writer.close()
+
+
+def start():
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    start()
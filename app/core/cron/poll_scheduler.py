@@ -0,0 +1,123 @@
+from structlog import get_logger
+
+from app.api.client.api_key_pool import ApiKeyPool
+from app.api.client.apis_helper import ApiQuotaCosts
+from app.core.config import settings
+from app.models.ingestion.polling_decision import PollingDecision
+
+logger = get_logger()
+
+# Polling decision reasons
+POLL_REASON_HIGH_YIELD = "high_yield"
+POLL_REASON_STEADY = "steady"
+POLL_REASON_NO_YIELD_BACKOFF = "no_yield_backoff"
+POLL_REASON_QUOTA_BUDGET = "quota_budget"
+POLL_REASON_QUOTA_EXHAUSTED = "quota_exhausted"
+
+# Weight of the last poll in the estimated quota units per poll
+UNITS_PER_POLL_SMOOTHING = 0.3
+
+
+class PollScheduler:
+    """
+    Plans the interval until the next ingestion poll.
+
+    The interval shrinks while the polls index many new videos & backs off
+    exponentially while they find none. It is never shorter than what the
+    remaining daily quota units allow, spread over the time left until the
+    quota is reset, given the units a poll is estimated to use.
+    """
+
+    def __init__(self, key_pool: ApiKeyPool, topic_count: int):
+        self._key_pool = key_pool
+        self._yield_interval = settings.sleep_interval
+        self._units_per_poll = max(topic_count, 1) * ApiQuotaCosts.search_api
+        self._used_units_at_poll_start = None
+
+    def start_poll(self):
+        """
+        Method to record the quota usage at the start of a poll
+        """
+        self._used_units_at_poll_start = self._key_pool.get_used_units()
+
+    def plan_next_poll(self, indexed_count: int) -> PollingDecision:
+        """
+        Method to plan the interval until the next poll, after a poll
+        Args:
+            indexed_count: the count of videos indexed by the poll
+        Returns:
+            the polling decision
+        """
+        self._update_units_per_poll()
+
+        if indexed_count >= settings.poll_high_yield_count:
+            self._yield_interval = max(
+                self._yield_interval / settings.poll_backoff_factor,
+                settings.sleep_interval,
+            )
+            reason = POLL_REASON_HIGH_YIELD
+        elif indexed_count == 0:
+            self._yield_interval = min(
+                self._yield_interval * settings.poll_backoff_factor,
+                settings.poll_max_interval,
+            )
+            reason = POLL_REASON_NO_YIELD_BACKOFF
+        else:
+            reason = POLL_REASON_STEADY
+
+        remaining_units = self._get_remaining_units()
+        seconds_to_reset = self._key_pool.get_seconds_to_quota_reset()
+        interval = self._yield_interval
+        if remaining_units < self._units_per_poll:
+            # Not even a single poll is affordable. Waiting for the reset, while
+            # still checking now & then for the newly added keys (at no cost)
+            budget_interval = seconds_to_reset
+            interval = max(min(seconds_to_reset, settings.poll_max_interval), interval)
+            reason = POLL_REASON_QUOTA_EXHAUSTED
+        else:
+            budget_interval = seconds_to_reset * self._units_per_poll / remaining_units
+            if budget_interval > interval:
+                interval, reason = budget_interval, POLL_REASON_QUOTA_BUDGET
+
+        decision = PollingDecision(
+            interval=round(interval, 3),
+            reason=reason,
+            yield_interval=round(self._yield_interval, 3),
+            budget_interval=round(budget_interval, 3),
+            remaining_units=remaining_units,
+            estimated_units_per_poll=round(self._units_per_poll, 1),
+            seconds_to_quota_reset=round(seconds_to_reset, 3),
+        )
+        logger.debug("Planned the next poll.", **decision.dict())
+        return decision
+
+    def _update_units_per_poll(self):
+        """
+        Method to update the estimated quota units per poll with the units
+        used by the last poll
+        """
+        if self._used_units_at_poll_start is None:
+            return
+        used_units = self._key_pool.get_used_units() - self._used_units_at_poll_start
+        self._used_units_at_poll_start = None
+        # No units on a failed poll, or a negative count across the quota reset
+        if used_units <= 0:
+            return
+        self._units_per_poll += UNITS_PER_POLL_SMOOTHING * (
+            used_units - self._units_per_poll
+        )
+
+    def _get_remaining_units(self) -> int:
+        """
+        Method to get the quota units left for the polls until the reset,
+        within the configured daily budget
+        """
+        remaining_units = self._key_pool.get_remaining_units()
+        if settings.api_daily_unit_budget is not None:
+            remaining_units = min(
+                remaining_units,
+                max(
+                    settings.api_daily_unit_budget - self._key_pool.get_used_units(), 0
+                ),
+            )
+        return remaining_units
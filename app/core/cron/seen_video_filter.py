@@ -0,0 +1,62 @@
+import hashlib
+from typing import Iterable, List
+
+from structlog import get_logger
+
+logger = get_logger()
+
+
+class SeenVideoFilter:
+    """
+    Membership filter of the already indexed video ids.
+
+    Stores a 64-bit hash per video id instead of the id itself, which keeps
+    the set compact while the collision probability stays negligible
+    (unlike a bloom filter, a false positive here would drop a new video).
+    """
+
+    def __init__(self):
+        self._hashes = set()
+        self.is_warm = False
+
+    def __contains__(self, video_id: str):
+        return _hash_video_id(video_id) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def warm(self, video_ids: Iterable[str]):
+        """
+        Method to load the already indexed video ids
+        Args:
+            video_ids: the ids of all the indexed videos
+        """
+        self.add_many(video_ids)
+        self.is_warm = True
+        logger.info("Warmed the seen videos filter.", size=len(self._hashes))
+
+    def add_many(self, video_ids: Iterable[str]):
+        """
+        Method to mark the given videos as indexed
+        Args:
+            video_ids: the ids of the indexed videos
+        """
+        self._hashes.update(_hash_video_id(video_id) for video_id in video_ids)
+
+    def filter_unseen(self, video_ids: List[str]) -> List[str]:
+        """
+        Method to get the videos which are not indexed yet
+        Args:
+            video_ids: the video ids to check
+        Returns:
+            the unseen video ids, in the given order
+        """
+        return [video_id for video_id in video_ids if video_id not in self]
+
+
+def _hash_video_id(video_id: str) -> int:
+    """
+    Returns the 64-bit hash of a video id
+    """
+    digest = hashlib.blake2b(video_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
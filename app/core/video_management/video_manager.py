@@ -1,41 +1,89 @@
+from typing import List
+
 from fastapi.encoders import jsonable_encoder
 from starlette.responses import JSONResponse
 from structlog import get_logger
 
+from app.core.cache.response_cache import response_cache
+from app.core.config import settings
 from app.core.exception_handler.video_registry_exception import VideoRegistryException
-from app.data_access_layer.elasticsearch.elasticsearch_dal import ElasticsearchDAL
+from app.data_access_layer import dal_factory
 from app.models.generic.paginate import Paginate
-from app.utils import common_utils, shared_constants
+from app.models.generic.total_count_mode import TotalCountMode
+from app.models.video_registry.video_aggregations import (
+    ChannelCount,
+    DateCount,
+    HistogramInterval,
+    QueryCount,
+    VideosAggregations,
+)
+from app.utils import common_utils, cursor_utils, json_utils, shared_constants
 
 logger = get_logger()
 
 
-def get_youtube_videos(limit: int, offset: int):
+async def get_youtube_videos(
+    limit: int,
+    offset: int,
+    cursor: str = None,
+    point_in_time: bool = False,
+    fields: str = None,
+    count: TotalCountMode = None,
+):
     """
     Method to get the videos data stored in the DB
     :param limit: The maximum entries per page
     :param offset: The starting point for a page
+    :param cursor: The position after which the page starts, overrides the offset
+    :param point_in_time: Whether to paginate over a consistent snapshot
+    :param fields: Comma separated fields to return, all the fields if not given
+    :param count: How to count the total entries, the server default if not given
 
     :returns: Stored video' data
     """
+    try:
+        request_params = _get_request_params(cursor, point_in_time, fields, count)
+    except VideoRegistryException as vre:
+        return _bad_request_response(vre.detail)
+
+    cache_key = _get_cache_key(
+        "collections",
+        request_params,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    cached_response = _get_cached_response(cache_key)
+    if cached_response:
+        return cached_response
+    cache_generation = response_cache.generation
+
     try:
         logger.info(f"Getting the videos-data.")
 
         search_params = {"limit": limit, "offset": offset}
+        search_params.update(request_params)
 
-        elasticsearch_dal = ElasticsearchDAL()
-        result, count = elasticsearch_dal.get_all_records(search_params, {})
-        logger.debug("Done fetching the docs from the DB", count=count)
+        dal = dal_factory.get_dal()
+        result, total_count = await dal.get_all_records_async(search_params, {})
+        logger.debug("Done fetching the docs from the DB", total_count=total_count)
 
-        if not result:
+        if not result or not result["hits"]["hits"]:
             return None
 
-        return _build_response(
-            result=result,
-            count=count,
-            offset=offset,
+        return _cache_response(
+            cache_key,
+            cache_generation,
+            _build_response(
+                result=result,
+                count=total_count,
+                offset=offset,
+                limit=limit,
+            ),
         )
-    except VideoRegistryException:
+    except VideoRegistryException as vre:
+        if vre.error_code == 410:
+            return _gone_response(vre)
         logger.exception("Error while fetching the video collection")
         return JSONResponse(
             status_code=500,
@@ -48,39 +96,77 @@ def get_youtube_videos(limit: int, offset: int):
         )
 
 
-def search_youtube_videos(limit: int, offset: int, search_text: str):
+async def search_youtube_videos(
+    limit: int,
+    offset: int,
+    search_text: str,
+    cursor: str = None,
+    point_in_time: bool = False,
+    fields: str = None,
+    count: TotalCountMode = None,
+):
     """
     Method to search the videos using the given search query
     Args:
         limit:
         offset:
         search_text:
+        cursor: the position after which the page starts, overrides the offset
+        point_in_time: whether to paginate over a consistent snapshot
+        fields: comma separated fields to return, all the fields if not given
+        count: how to count the matching entries, the server default if not given
     Returns:
     : The filtered data
     """
     logger.info(
         f"Searching videos in the db having title/description as : {search_text}"
     )
+    try:
+        request_params = _get_request_params(cursor, point_in_time, fields, count)
+    except VideoRegistryException as vre:
+        return _bad_request_response(vre.detail)
+
+    cache_key = _get_cache_key(
+        "collections_search",
+        request_params,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        query=" ".join(search_text.lower().split()),
+    )
+    cached_response = _get_cached_response(cache_key)
+    if cached_response:
+        return cached_response
+    cache_generation = response_cache.generation
+
     try:
         search_params = {
             "limit": limit,
             "offset": offset,
             shared_constants.VIDEOS_SEARCH_QUERY_KEY: search_text,
         }
+        search_params.update(request_params)
 
-        elasticsearch_dal = ElasticsearchDAL()
-        result, count = elasticsearch_dal.search_all_records(search_params, {})
-        logger.debug("Done fetching the docs from the DB", count=count)
+        dal = dal_factory.get_dal()
+        result, total_count = await dal.search_all_records_async(search_params, {})
+        logger.debug("Done fetching the docs from the DB", total_count=total_count)
 
-        if not result:
+        if not result or not result["hits"]["hits"]:
             return None
 
-        return _build_response(
-            result=result,
-            count=count,
-            offset=offset,
+        return _cache_response(
+            cache_key,
+            cache_generation,
+            _build_response(
+                result=result,
+                count=total_count,
+                offset=offset,
+                limit=limit,
+            ),
         )
-    except VideoRegistryException:
+    except VideoRegistryException as vre:
+        if vre.error_code == 410:
+            return _gone_response(vre)
         logger.exception("Error while querying the video collection")
         return JSONResponse(
             status_code=500,
@@ -93,31 +179,365 @@ def search_youtube_videos(limit: int, offset: int, search_text: str):
         )
 
 
-def _build_response(result, count, offset):
+async def suggest_youtube_videos(prefix: str, limit: int):
+    """
+    Method to suggest the videos whose title matches the typed prefix
+    Args:
+        prefix: the typed title prefix
+        limit: the maximum suggestions
+    Returns:
+        the ids & titles of the suggested videos
+    """
+    prefix = " ".join(prefix.lower().split())
+    cache_key = None
+    if settings.response_cache_enabled:
+        cache_key = response_cache.make_key(
+            "collections_suggest", prefix=prefix, limit=limit
+        )
+    cached_response = _get_cached_response(cache_key)
+    if cached_response:
+        return cached_response
+    cache_generation = response_cache.generation
+
+    try:
+        dal = dal_factory.get_dal()
+        suggestions = await dal.suggest_records_async(
+            {shared_constants.PREFIX_KEY: prefix, shared_constants.LIMIT_KEY: limit},
+            {},
+        )
+        return _cache_response(
+            cache_key,
+            cache_generation,
+            {
+                "suggestions": [
+                    {
+                        shared_constants.VIDEO_ID_KEY: suggestion[
+                            shared_constants.ID_KEY
+                        ],
+                        shared_constants.TITLE_KEY: suggestion[
+                            shared_constants.TITLE_KEY
+                        ],
+                    }
+                    for suggestion in suggestions
+                ]
+            },
+        )
+    except VideoRegistryException:
+        logger.exception("Error while suggesting the videos")
+        return JSONResponse(
+            status_code=500,
+            content=jsonable_encoder(
+                {
+                    "message": "Internal server error",
+                    "detail": "Error while suggesting the videos",
+                }
+            ),
+        )
+
+
+async def aggregate_youtube_videos(
+    search_text: str = None,
+    queries: List[str] = None,
+    interval: HistogramInterval = HistogramInterval.day,
+    channels_size: int = 10,
+):
+    """
+    Method to get the facets of the videos: the top channels, the publish
+    time histogram & the counts of the matches of the given queries
+    Args:
+        search_text: restricts the facets to the matching videos, if given
+        queries: the search queries to count the matching videos of
+        interval: the bucket interval of the publish time histogram
+        channels_size: the number of top channels
+    Returns:
+        the facets, None if there are no videos yet
+    """
+    search_text = " ".join((search_text or "").lower().split())
+    queries = _normalize_queries(queries)
+    interval = HistogramInterval(interval)
+    cache_key = None
+    if settings.response_cache_enabled:
+        cache_key = response_cache.make_key(
+            "collections_aggregations",
+            query=search_text,
+            queries="|".join(queries),
+            interval=interval.value,
+            channels_size=channels_size,
+        )
+    cached_response = _get_cached_response(cache_key)
+    if cached_response:
+        return cached_response
+    cache_generation = response_cache.generation
+
+    try:
+        dal = dal_factory.get_dal()
+        facets = await dal.aggregate_records_async(
+            _get_aggregations_params(search_text, queries, interval, channels_size),
+            {},
+        )
+        if not facets:
+            return None
+
+        return _cache_response(
+            cache_key,
+            cache_generation,
+            _build_aggregations_response(facets, queries),
+        )
+    except VideoRegistryException:
+        logger.exception("Error while aggregating the video collection")
+        return JSONResponse(
+            status_code=500,
+            content=jsonable_encoder(
+                {
+                    "message": "Internal server error",
+                    "detail": "Error while aggregating the video collection",
+                }
+            ),
+        )
+
+
+def _normalize_queries(queries):
+    """
+    Method to normalize the facet queries, dropping the blank & duplicate ones
+    Args:
+        queries: the search queries to count the matching videos of
+    Returns:
+        the lowercased queries, in their given order, which is the order of the counts
+    """
+    return list(
+        dict.fromkeys(
+            " ".join(query.lower().split()) for query in queries or [] if query.strip()
+        )
+    )
+
+
+def _get_aggregations_params(search_text, queries, interval, channels_size):
+    """
+    Method to get the aggregation params of the DAL
+    Args:
+        search_text: restricts the facets to the matching videos, if given
+        queries: the normalized search queries to count the matching videos of
+        interval: the bucket interval of the publish time histogram
+        channels_size: the number of top channels
+    Returns:
+        dict with the aggregation params
+    """
+    return {
+        shared_constants.VIDEOS_SEARCH_QUERY_KEY: search_text,
+        shared_constants.QUERIES_KEY: queries,
+        shared_constants.INTERVAL_KEY: interval.value,
+        shared_constants.CHANNELS_SIZE_KEY: channels_size,
+    }
+
+
+def _build_aggregations_response(facets, queries):
+    """
+    Method to build the response from the facets returned by the DAL
+    Args:
+        facets: the total count, the channel & histogram buckets & the query counts
+        queries: the normalized search queries, a missing count is a zero count
+    Returns:
+        dict containing the facets
+    """
+    return VideosAggregations(
+        total_count=facets["total_count"],
+        channels=[
+            ChannelCount(channel_title=channel_title, count=channel_count)
+            for channel_title, channel_count in facets["channels"]
+        ],
+        published_at_histogram=[
+            DateCount(date=date, count=date_count)
+            for date, date_count in facets["published_at_histogram"]
+        ],
+        query_counts=[
+            QueryCount(query=query, count=facets["query_counts"].get(query, 0))
+            for query in queries
+        ],
+    ).dict()
+
+
+def _get_request_params(cursor, point_in_time, fields, count):
+    """
+    Method to get the search params for the cursor based pagination,
+    the fields projection & the total counting
+    Args:
+        cursor: the opaque cursor given by the client, if any
+        point_in_time: whether to paginate over a consistent snapshot
+        fields: comma separated fields to return, if any
+        count: the total counting mode, if any
+    Returns:
+        dict with the search_after, point in time, fields & counting params
+    Raises:
+        VideoRegistryException: 400 if the cursor is malformed or a field is unknown
+    """
+    params = {
+        shared_constants.POINT_IN_TIME_KEY: point_in_time,
+        shared_constants.TRACK_TOTAL_HITS_KEY: _get_track_total_hits(
+            TotalCountMode(count or settings.total_count_mode)
+        ),
+    }
+    if cursor:
+        position = cursor_utils.decode_cursor(cursor)
+        params[shared_constants.SEARCH_AFTER_KEY] = position[
+            shared_constants.SEARCH_AFTER_KEY
+        ]
+        if shared_constants.PIT_ID_KEY in position:
+            params[shared_constants.PIT_ID_KEY] = position[shared_constants.PIT_ID_KEY]
+    requested_fields = sorted(
+        {field.strip() for field in (fields or "").split(",") if field.strip()}
+    )
+    if requested_fields:
+        unknown_fields = set(requested_fields) - shared_constants.VIDEO_FIELDS
+        if unknown_fields:
+            raise VideoRegistryException(
+                400, f"Unknown fields: {', '.join(sorted(unknown_fields))}"
+            )
+        params[shared_constants.FIELDS_KEY] = requested_fields
+    return params
+
+
+def _get_track_total_hits(count):
+    """
+    Method to get the DB total counting param of the given counting mode
+    """
+    if count == TotalCountMode.exact:
+        return True
+    if count == TotalCountMode.capped:
+        return settings.total_count_cap
+    return False
+
+
+def _get_cache_key(endpoint, request_params, **params):
+    """
+    Method to get the response cache key of a request
+    Args:
+        endpoint: the endpoint name
+        request_params: the cursor based pagination, fields & counting params
+        params: the request params
+    Returns:
+        the cache key, None if the response must not be cached
+    """
+    if not settings.response_cache_enabled:
+        return None
+    # The point in time pages are bound to a snapshot, never shared
+    if request_params.get(shared_constants.POINT_IN_TIME_KEY) or request_params.get(
+        shared_constants.PIT_ID_KEY
+    ):
+        return None
+    if params.get("cursor"):
+        params["offset"] = shared_constants.DEFAULT_OFFSET
+    params["fields"] = ",".join(request_params.get(shared_constants.FIELDS_KEY, []))
+    params["count"] = request_params[shared_constants.TRACK_TOTAL_HITS_KEY]
+    return response_cache.make_key(endpoint, **params)
+
+
+def _get_cached_response(cache_key):
+    """
+    Method to get the cached response of a request
+    Args:
+        cache_key: the cache key
+    Returns:
+        the response, None if not cached
+    """
+    if cache_key is None:
+        return None
+    body = response_cache.get(cache_key)
+    if body is None:
+        return None
+    logger.debug("Serving the response from the cache.")
+    return json_utils.RawJSONResponse(content=body)
+
+
+def _cache_response(cache_key, cache_generation, content):
+    """
+    Method to serialize the response content & cache it
+    Args:
+        cache_key: the cache key, None if the response must not be cached
+        cache_generation: the cache generation read before querying the DB
+        content: the response content
+    Returns:
+        the response
+    """
+    body = json_utils.dumps(content)
+    if cache_key is not None:
+        response_cache.set(cache_key, body, cache_generation)
+    return json_utils.RawJSONResponse(content=body)
+
+
+def _bad_request_response(error):
+    """
+    Method to build the response for invalid request params
+    """
+    logger.info("Received invalid request params", error=str(error))
+    return JSONResponse(
+        status_code=400,
+        content=jsonable_encoder(
+            {
+                "message": "Bad request",
+                "detail": str(error),
+            }
+        ),
+    )
+
+
+def _gone_response(error):
+    """
+    Method to build the response for an expired cursor, the client has to
+    restart the pagination from the first page
+    """
+    logger.info("Received an expired cursor", error=error.detail)
+    return JSONResponse(
+        status_code=410,
+        content=jsonable_encoder(
+            {
+                "message": "Gone",
+                "detail": error.detail,
+            }
+        ),
+    )
+
+
+def _build_response(result, count, offset, limit):
     """
     Method to build the response from the query output
     Args:
-        result: the result of the ES query
-        count: the total number of hist
+        result: the raw result of the ES query
+        count: the total number of hits, None if not counted
         offset: starting point for the records
+        limit: the maximum entries per page
     Returns:
         dict containing the fetched video-info
     """
-    videos = []  # type:ignore
-
-    if result:
-        for video_details in result:
-            entry = {
-                shared_constants.INDEX_KEY: video_details.meta.index,
-                shared_constants.VIDEO_ID_KEY: video_details.meta.id,
-            }
-            video_info = video_details.to_dict()
+    # Building the entries straight from the hits' source, the ES data is trusted.
+    # The indices created before the index template also store the suggest inputs
+    hits = result["hits"]["hits"]
+    videos = [
+        {
+            shared_constants.INDEX_KEY: hit["_index"],
+            shared_constants.VIDEO_ID_KEY: hit["_id"],
+            **{
+                key: value
+                for key, value in hit["_source"].items()
+                if key in shared_constants.VIDEO_FIELDS
+            },
+        }
+        for hit in hits
+    ]
 
-            for field, value in video_info.items():
-                entry[field] = value
-            videos.append(entry)
+    # A full page may have more entries after it
+    next_cursor = None
+    if len(videos) == limit:
+        next_cursor = cursor_utils.encode_cursor(
+            hits[-1]["sort"], result.get(shared_constants.PIT_ID_KEY)
+        )
 
-    pagination = Paginate(offset=offset, count_per_page=len(videos), total_count=count)
+    pagination = Paginate(
+        offset=offset,
+        count_per_page=len(videos),
+        total_count=count,
+        total_count_relation=result["hits"].get("total", {}).get("relation"),
+        next_cursor=next_cursor,
+    )
     return common_utils.multiple_args_to_single_dict(
         details=videos,
         pagination=pagination.dict(),
@@ -1,18 +1,70 @@
 import logging
 
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 from elasticsearch_dsl.connections import connections
 from structlog import get_logger
 
 from app.core.config import settings
+from app.data_access_layer.elasticsearch.elasticsearch_connection import (
+    get_client_options,
+)
 
 # Setting up logger
 logger = get_logger()
 
-es_conn = connections.create_connection(hosts=settings.elasticsearch_url, timeout=20)
-logger.info(
-    "Created elasticsearch connection.",
-    endpoint_url=settings.elasticsearch_url,
-)
-logger.info("Elasticsearch init.", status=True)
 es_logger = logging.getLogger("elasticsearch")
 es_logger.setLevel(logging.ERROR)
+
+_es_conn = None
+_async_es_conn = None
+
+
+def get_es_conn() -> Elasticsearch:
+    """
+    Returns the sync client of the write path & the admin tasks, creating it
+    on first use, so that it is only created (& sniffs the cluster) with the
+    elasticsearch storage backend
+    """
+    global _es_conn
+    if _es_conn is None:
+        _es_conn = connections.create_connection(**get_client_options())
+        logger.info(
+            "Created elasticsearch connection.",
+            endpoint_urls=settings.elasticsearch_hosts,
+        )
+        logger.info("Elasticsearch init.", status=True)
+    return _es_conn
+
+
+def __getattr__(name):
+    # Keeps `from app.data_access_layer import es_conn` working, lazily
+    if name == "es_conn":
+        return get_es_conn()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_async_es_conn() -> AsyncElasticsearch:
+    """
+    Returns the async client of the read path, creating it on first use, so
+    that it is only created with the elasticsearch storage backend. Its
+    connection pool is shared by all the requests.
+    """
+    global _async_es_conn
+    if _async_es_conn is None:
+        _async_es_conn = AsyncElasticsearch(**get_client_options())
+        logger.info(
+            "Created async elasticsearch connection.",
+            endpoint_urls=settings.elasticsearch_hosts,
+        )
+    return _async_es_conn
+
+
+async def close_async_es_conn():
+    """
+    Closes the async elasticsearch client & its connection pool, if created
+    """
+    global _async_es_conn
+    if _async_es_conn is not None:
+        await _async_es_conn.close()
+        logger.info("Closed the async elasticsearch connection.")
+    _async_es_conn = None
@@ -0,0 +1,27 @@
+"""Selects the DAL of the configured storage backend"""
+from app.core.config import settings
+from app.data_access_layer.generic.video_registry_db_interface import (
+    VideoRegistryDBInterface,
+)
+from app.data_access_layer.sqlite.sqlite_dal import SqliteDAL
+
+STORAGE_BACKEND_ELASTICSEARCH = "elasticsearch"
+STORAGE_BACKEND_SQLITE = "sqlite"
+
+
+def get_dal() -> VideoRegistryDBInterface:
+    """
+    Returns the DAL of the configured storage backend
+    Raises:
+        ValueError: if the storage backend is unknown
+    """
+    if settings.storage_backend == STORAGE_BACKEND_ELASTICSEARCH:
+        # Imported on use, the elasticsearch modules create its client
+        from app.data_access_layer.elasticsearch.elasticsearch_dal import (
+            ElasticsearchDAL,
+        )
+
+        return ElasticsearchDAL()
+    if settings.storage_backend == STORAGE_BACKEND_SQLITE:
+        return SqliteDAL()
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
@@ -0,0 +1,46 @@
+from app.core.config import settings
+
+
+def get_client_options() -> dict:
+    """
+    Method to get the options of the elasticsearch clients, shared by the
+    sync & the async client.
+
+    The requests are spread over all the given nodes, a timed out request is
+    retried on the next node & a failing node is left out with an exponential
+    backoff. The default request timeout is the read timeout, the write
+    operations pass get_write_options().
+    Returns:
+        the client keyword arguments
+    """
+    options = dict(
+        hosts=settings.elasticsearch_hosts,
+        timeout=settings.es_read_timeout,
+        maxsize=settings.es_connections_per_node,
+        retry_on_timeout=True,
+        max_retries=settings.es_max_retries,
+        # Connection pool options, the backoff of the failing nodes
+        dead_timeout=settings.es_dead_timeout,
+        timeout_cutoff=settings.es_dead_timeout_cutoff,
+    )
+    if settings.es_sniff_enabled:
+        options.update(
+            sniff_on_start=True,
+            sniff_on_connection_fail=True,
+            sniffer_timeout=settings.es_sniffer_timeout,
+        )
+    if settings.elasticsearch_user:
+        options["http_auth"] = (
+            settings.elasticsearch_user,
+            settings.elasticsearch_password,
+        )
+    return options
+
+
+def get_write_options() -> dict:
+    """
+    Method to get the per-request options of the write operations
+    Returns:
+        the request keyword arguments
+    """
+    return dict(request_timeout=settings.es_write_timeout)
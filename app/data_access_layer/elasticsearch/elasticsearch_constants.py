@@ -2,11 +2,42 @@
 All constants used by ES dal for performing search/indexing operations.
 """
 YOUTUBE_VIDEOS_ALIAS = "youtube_videos_alias"
+YOUTUBE_VIDEOS_WRITE_ALIAS = "youtube_videos_write_alias"
 ES_INDEX_SHARDS_DEFAULT = 3
 ES_INDEX_REPLICAS_DEFAULT = 1
 ES_INDEX_REFRESH_INTERVAL_DEFAULT = "300s"
 YOUTUBE_VIDEOS_INDEX_NAME = "youtube_videos_{}"
+YOUTUBE_VIDEOS_INDEX_PATTERN = "youtube_videos_*"
+YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME = "youtube_videos_template"
+# Days before the month end when the next month's index is created
+ES_INDEX_PRECREATE_DAYS = 3
+# Suffix of the temporary index a legacy index is reindexed through
+ES_MIGRATION_INDEX_SUFFIX = "_migrating"
 
 ES_REFRESH_INTERVAL = "5s"
 
 ES_SIMPLE_QUERY_STRING_KEY = "simple_query_string"
+
+# Bulk indexing
+ES_BULK_CHUNK_SIZE_KEY = "chunk_size"
+ES_BULK_MAX_CHUNK_BYTES_KEY = "max_chunk_bytes"
+ES_BULK_MAX_RETRIES_KEY = "max_retries"
+ES_BULK_RETRYABLE_STATUS = 429
+
+# Scrolling over all the documents
+ES_SCAN_BATCH_SIZE = 5000
+ES_SCAN_SCROLL_TIMEOUT = "2m"
+
+# Title suggestions
+ES_TITLE_SUGGESTION_NAME = "title_suggestion"
+
+# Aggregations
+ES_CHANNELS_AGG = "channels"
+ES_PUBLISHED_AT_AGG = "published_at_histogram"
+ES_QUERIES_AGG = "query_counts"
+ES_CHANNEL_TITLE_KEYWORD_FIELD = "channel_title.keyword"
+ES_HISTOGRAM_DATE_FORMAT = "yyyy-MM-dd"
+
+# Cursor pagination, the video id keyword is the sort tiebreaker
+ES_TIEBREAKER_FIELD = "id"
+ES_POINT_IN_TIME_KEEP_ALIVE = "1m"
@@ -1,14 +1,18 @@
-from elasticsearch import exceptions
+import time
+
+from elasticsearch import exceptions, helpers
 from elasticsearch_dsl import Search
 from structlog import get_logger
 
+from app.core.config import settings
 from app.core.exception_handler.video_registry_exception import VideoRegistryException
-from app.data_access_layer import es_conn
+from app.data_access_layer import es_conn, get_async_es_conn
 from app.data_access_layer.elasticsearch import (
+    elasticsearch_connection,
     elasticsearch_constants,
     elasticsearch_query_builder,
-    elasticsearch_util,
 )
+from app.data_access_layer.elasticsearch.index_manager import index_manager
 from app.data_access_layer.generic.video_registry_db_interface import (
     VideoRegistryDBInterface,
 )
@@ -19,6 +23,9 @@ logger = get_logger()
 # Error messages
 INDEX_NOT_FOUND_MESSAGE = "Index not found in the elasticsearch database"
 QUERYING_FAILURE_MESSAGE = "Exception while fetching video records from Elasticsearch"
+POINT_IN_TIME_EXPIRED_MESSAGE = (
+    "The point in time of the cursor has expired, restart the pagination"
+)
 
 
 class ElasticsearchDAL(VideoRegistryDBInterface):
@@ -42,12 +49,17 @@ class ElasticsearchDAL(VideoRegistryDBInterface):
             returns boolean based on the indexing result. True- success, False- Failure
         """
         try:
-            index_name = elasticsearch_util.get_index()
+            index_name = index_manager.get_write_index()
             created_at = common_utils.get_epoch_millis()
             data[shared_constants.CREATED_AT_KEY] = created_at
             doc_id = data["id"]
 
-            res = es_conn.index(index=index_name, id=doc_id, body=data)
+            res = es_conn.index(
+                index=index_name,
+                id=doc_id,
+                body=data,
+                **elasticsearch_connection.get_write_options(),
+            )
 
             if res["result"] == "created":
                 logger.info(
@@ -79,71 +91,156 @@ class ElasticsearchDAL(VideoRegistryDBInterface):
             )
             raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
 
-    def get_all_records(self, data: dict, execution_context: dict):
+    def add_records_bulk(self, data: list, execution_context: dict):
         """
-        Method to get youtube-videos entries from the elasticsearch index
+        Method to index a batch of youtube-videos entries using the ES bulk helpers.
+        Only the documents which failed with a retryable error are sent again.
         Args:
-            data: the data to be indexed into the ES
-            execution_context: additional information required for reading the data
+            data: the list of documents to be indexed into the ES
+            execution_context: additional information required for indexing the data
+                i.e., chunk_size, max_chunk_bytes & max_retries overrides
         Returns:
-            returns the response & the count of videos in the response
+            returns the count of indexed documents & the list of per-document errors
         """
+        chunk_size = execution_context.get(
+            elasticsearch_constants.ES_BULK_CHUNK_SIZE_KEY, settings.es_bulk_chunk_size
+        )
+        max_chunk_bytes = execution_context.get(
+            elasticsearch_constants.ES_BULK_MAX_CHUNK_BYTES_KEY,
+            settings.es_bulk_max_chunk_bytes,
+        )
+        max_retries = execution_context.get(
+            elasticsearch_constants.ES_BULK_MAX_RETRIES_KEY,
+            settings.es_bulk_max_retries,
+        )
         try:
-            logger.debug(
-                "Reading all the youtube-videos.",
-                search_params=data,
-            )
-
-            limit = (
-                int(data[shared_constants.LIMIT_KEY])
-                if shared_constants.LIMIT_KEY in data
-                else shared_constants.DEFAULT_PER_PAGE_LIMIT
-            )
-            offset = (
-                int(data[shared_constants.OFFSET_KEY])
-                if shared_constants.OFFSET_KEY in data
-                else shared_constants.DEFAULT_OFFSET
-            )
+            index_name = index_manager.get_write_index()
+            created_at = common_utils.get_epoch_millis()
 
-            search_query = elasticsearch_query_builder.get_all_docs()
-            logger.debug("Done building the ES search query", search_query=search_query)
-            sort = data.pop("sort", None)
+            pending_docs = {}
+            for doc in data:
+                doc[shared_constants.CREATED_AT_KEY] = created_at
+                pending_docs[doc["id"]] = doc
 
-            index = elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS
-            s = Search(index=index).query(search_query)
-            sort = sort.lstrip("+") if sort else f"-{shared_constants.PUBLISHED_AT}"
-            s = s.sort(sort)
-            s = s[offset : (offset + limit)]
-            resp = s.execute()
-            count = resp.hits.total
+            indexed_count = 0
+            errors = {}
+            for attempt in range(max_retries + 1):
+                if attempt:
+                    time.sleep(settings.es_bulk_retry_backoff * 2 ** (attempt - 1))
+                    logger.info(
+                        "Retrying the failed bulk index operations.",
+                        attempt=attempt,
+                        pending_count=len(pending_docs),
+                    )
 
-            return resp, count["value"]
+                attempt_count, pending_docs = _run_bulk_attempt(
+                    index_name, pending_docs, errors, chunk_size, max_chunk_bytes
+                )
+                indexed_count += attempt_count
+                if not pending_docs:
+                    break
 
+            logger.info(
+                "Done bulk writing data to elasticsearch",
+                index=index_name,
+                indexed_count=indexed_count,
+                failed_count=len(errors),
+            )
+            return indexed_count, list(errors.values())
         except exceptions.NotFoundError as nfe:
             logger.exception(
                 INDEX_NOT_FOUND_MESSAGE,
                 index_alias=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
                 exception=str(nfe),
             )
-            return None, None
-        except exceptions.SerializationError as se:
-            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(se))
             raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
         except exceptions.TransportError as te:
-            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(te))
+            logger.exception(f"Failed to bulk index the documents.", exception=str(te))
             raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
         except VideoRegistryException as ae:
+            logger.exception(f"Failed to bulk index the documents.", exception=str(ae))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+    def get_all_record_ids(self, execution_context: dict):
+        """
+        Method to get the ids of all the youtube-videos entries, scrolling
+        over the whole index without fetching the documents' source
+        Args:
+            execution_context: additional information required for reading the data
+        Returns:
+            returns a generator of the document ids
+        """
+        try:
+            hits = helpers.scan(
+                es_conn,
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                query={"query": elasticsearch_query_builder.get_all_docs().to_dict()},
+                _source=False,
+                size=elasticsearch_constants.ES_SCAN_BATCH_SIZE,
+                scroll=elasticsearch_constants.ES_SCAN_SCROLL_TIMEOUT,
+            )
+            for hit in hits:
+                yield hit["_id"]
+        except exceptions.NotFoundError as nfe:
             logger.exception(
-                QUERYING_FAILURE_MESSAGE,
-                exception=str(ae),
+                INDEX_NOT_FOUND_MESSAGE,
+                index_alias=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                exception=str(nfe),
+            )
+        except exceptions.TransportError as te:
+            logger.exception(QUERYING_FAILURE_MESSAGE, exception=str(te))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+    def get_all_records(self, data: dict, execution_context: dict):
+        """
+        Method to get youtube-videos entries from the elasticsearch index
+        Args:
+            data: the data to be indexed into the ES
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the raw search response & the count of videos in the response
+        """
+        try:
+            logger.debug(
+                "Reading all the youtube-videos.",
+                search_params=data,
             )
-            raise VideoRegistryException(500, self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+            search_query = elasticsearch_query_builder.get_all_docs()
+            logger.debug("Done building the ES search query", search_query=search_query)
+
+            pit_id = self._get_point_in_time_id(data)
+            s = self._get_paginated_search(search_query, data, pit_id)
+            resp = self._execute(s, pit_id)
+            return resp, _get_total_count(resp)
         except Exception as e:
-            logger.exception(
-                QUERYING_FAILURE_MESSAGE,
-                exception=str(e),
+            return self._handle_query_exception(e, data)
+
+    async def get_all_records_async(self, data: dict, execution_context: dict):
+        """
+        Method to get youtube-videos entries from the elasticsearch index,
+        without blocking the event loop
+        Args:
+            data: the pagination/sorting data
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the raw search response & the count of videos in the response
+        """
+        try:
+            logger.debug(
+                "Reading all the youtube-videos.",
+                search_params=data,
             )
-            raise VideoRegistryException(500, self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+            search_query = elasticsearch_query_builder.get_all_docs()
+            logger.debug("Done building the ES search query", search_query=search_query)
+
+            pit_id = await self._get_point_in_time_id_async(data)
+            s = self._get_paginated_search(search_query, data, pit_id)
+            resp = await self._execute_async(s, pit_id)
+            return resp, _get_total_count(resp)
+        except Exception as e:
+            return self._handle_query_exception(e, data)
 
     def search_all_records(self, data: dict, execution_context: dict):
         """
@@ -152,66 +249,463 @@ class ElasticsearchDAL(VideoRegistryDBInterface):
             data: the data to be indexed into the ES
             execution_context: additional information required for reading the data
         Returns:
-            returns the response & the count of videos in the response
+            returns the raw search response & the count of videos in the response
+        """
+        try:
+            search_query = self._get_search_query(data)
+
+            pit_id = self._get_point_in_time_id(data)
+            s = self._get_paginated_search(search_query, data, pit_id)
+            resp = self._execute(s, pit_id)
+            return resp, _get_total_count(resp)
+        except Exception as e:
+            return self._handle_query_exception(e, data)
+
+    async def search_all_records_async(self, data: dict, execution_context: dict):
+        """
+        Method to search youtube-videos entries in the elasticsearch index,
+        without blocking the event loop
+        Args:
+            data: the filtering/query data
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the raw search response & the count of videos in the response
+        """
+        try:
+            search_query = self._get_search_query(data)
+
+            pit_id = await self._get_point_in_time_id_async(data)
+            s = self._get_paginated_search(search_query, data, pit_id)
+            resp = await self._execute_async(s, pit_id)
+            return resp, _get_total_count(resp)
+        except Exception as e:
+            return self._handle_query_exception(e, data)
+
+    def suggest_records(self, data: dict, execution_context: dict):
+        """
+        Method to suggest the youtube-videos by their title prefix,
+        using the title completion index
+        Args:
+            data: the prefix & the maximum suggestions
+            execution_context: additional information required for reading the data
+        Returns:
+            returns a list of {"id", "title"} dicts
         """
         try:
-            search_query_string = data.get(shared_constants.VIDEOS_SEARCH_QUERY_KEY)
-            limit = (
-                int(data[shared_constants.LIMIT_KEY])
-                if shared_constants.LIMIT_KEY in data
-                else shared_constants.DEFAULT_PER_PAGE_LIMIT
+            resp = es_conn.search(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                body=self._get_suggestion_body(data),
             )
-            offset = (
-                int(data[shared_constants.OFFSET_KEY])
-                if shared_constants.OFFSET_KEY in data
-                else shared_constants.DEFAULT_OFFSET
+            return _get_suggestions(resp)
+        except Exception as e:
+            self._handle_query_exception(e, data)
+            return []
+
+    async def suggest_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of suggest_records, using the async ES client
+        """
+        try:
+            resp = await get_async_es_conn().search(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                body=self._get_suggestion_body(data),
             )
+            return _get_suggestions(resp)
+        except Exception as e:
+            self._handle_query_exception(e, data)
+            return []
 
-            logger.debug(
-                "Querying data with user specific string.",
-                search_query_string=search_query_string,
-                limit=limit,
-                offset=offset,
+    def aggregate_records(self, data: dict, execution_context: dict):
+        """
+        Method to get the facets of the youtube-videos, computed with
+        ES aggregations without fetching any of the hits
+        Args:
+            data: the search query, the top channels size, the histogram
+                interval & the queries to count the matches of
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the facets dict, None if the index does not exist yet
+        """
+        try:
+            s = self._get_aggregations_search(data)
+            resp = es_conn.search(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS, body=s.to_dict()
             )
+            return _get_facets(resp)
+        except Exception as e:
+            return self._handle_query_exception(e, data)[0]
 
-            search_query = elasticsearch_query_builder.get_search_query(
-                search_query_string
+    async def aggregate_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of aggregate_records, using the async ES client
+        """
+        try:
+            s = self._get_aggregations_search(data)
+            resp = await get_async_es_conn().search(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS, body=s.to_dict()
             )
-            logger.debug("Done building the ES search query", search_query=search_query)
-            sort = data.pop("sort", None)
+            return _get_facets(resp)
+        except Exception as e:
+            return self._handle_query_exception(e, data)[0]
 
-            index = elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS
-            s = Search(index=index).query(search_query)
-            sort = sort.lstrip("+") if sort else f"-{shared_constants.PUBLISHED_AT}"
-            s = s.sort(sort)
-            s = s[offset : (offset + limit)]
-            resp = s.execute()
-            count = resp.hits.total
+    def _get_aggregations_search(self, data: dict):
+        """
+        Method to build the ES search of the facets
+        Args:
+            data: the search query, the top channels size, the histogram
+                interval & the queries to count the matches of
+        Returns:
+            the search instance
+        """
+        if data.get(shared_constants.VIDEOS_SEARCH_QUERY_KEY):
+            search_query = self._get_search_query(data)
+        else:
+            search_query = elasticsearch_query_builder.get_all_docs()
 
-            return resp, count["value"]
+        s = Search().query(search_query).extra(size=0, track_total_hits=True)
+        s.aggs.bucket(
+            elasticsearch_constants.ES_CHANNELS_AGG,
+            "terms",
+            field=elasticsearch_constants.ES_CHANNEL_TITLE_KEYWORD_FIELD,
+            size=int(data[shared_constants.CHANNELS_SIZE_KEY]),
+        )
+        s.aggs.bucket(
+            elasticsearch_constants.ES_PUBLISHED_AT_AGG,
+            "date_histogram",
+            field=shared_constants.PUBLISHED_AT,
+            calendar_interval=data[shared_constants.INTERVAL_KEY],
+            format=elasticsearch_constants.ES_HISTOGRAM_DATE_FORMAT,
+        )
+        queries = data.get(shared_constants.QUERIES_KEY)
+        if queries:
+            s.aggs.bucket(
+                elasticsearch_constants.ES_QUERIES_AGG,
+                "filters",
+                filters={
+                    query: elasticsearch_query_builder.get_search_query(query)
+                    for query in queries
+                },
+            )
+        return s
 
-        except exceptions.NotFoundError as nfe:
+    @staticmethod
+    def _get_suggestion_body(data: dict):
+        """
+        Method to build the ES title suggestion body
+        Args:
+            data: the prefix & the maximum suggestions
+        Returns:
+            the search body
+        """
+        return elasticsearch_query_builder.get_title_suggestion_body(
+            data[shared_constants.PREFIX_KEY],
+            int(
+                data.get(
+                    shared_constants.LIMIT_KEY, shared_constants.DEFAULT_SUGGEST_LIMIT
+                )
+            ),
+        )
+
+    @staticmethod
+    def _get_search_query(data: dict):
+        """
+        Method to build the ES query for the user specific search string
+        Args:
+            data: the filtering/query data
+        Returns:
+            the ES query
+        """
+        search_query_string = data.get(shared_constants.VIDEOS_SEARCH_QUERY_KEY)
+
+        logger.debug(
+            "Querying data with user specific string.",
+            search_query_string=search_query_string,
+            search_params=data,
+        )
+
+        search_query = elasticsearch_query_builder.get_search_query(search_query_string)
+        logger.debug("Done building the ES search query", search_query=search_query)
+        return search_query
+
+    def _handle_query_exception(self, ex: Exception, data: dict):
+        """
+        Method to log & translate the exceptions of the read operations
+        Args:
+            ex: the raised exception
+            data: the pagination/filtering data of the operation
+        Returns:
+            returns None, None if the index does not exist yet
+        Raises:
+            VideoRegistryException: 410 if the point in time of the cursor has
+            expired, 500 for all the other failures
+        """
+        if isinstance(ex, exceptions.NotFoundError) and data.get(
+            shared_constants.PIT_ID_KEY
+        ):
+            logger.info(POINT_IN_TIME_EXPIRED_MESSAGE, exception=str(ex))
+            raise VideoRegistryException(410, detail=POINT_IN_TIME_EXPIRED_MESSAGE)
+        if isinstance(ex, exceptions.NotFoundError):
             logger.exception(
                 INDEX_NOT_FOUND_MESSAGE,
                 index_alias=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
-                exception=str(nfe),
+                exception=str(ex),
             )
             return None, None
-        except exceptions.SerializationError as se:
-            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(se))
-            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
-        except exceptions.TransportError as te:
-            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(te))
-            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
-        except VideoRegistryException as ae:
-            logger.exception(
-                QUERYING_FAILURE_MESSAGE,
-                exception=str(ae),
+        if isinstance(ex, (exceptions.SerializationError, exceptions.TransportError)):
+            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(ex))
+        else:
+            logger.exception(QUERYING_FAILURE_MESSAGE, exception=str(ex))
+        raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+    @staticmethod
+    def _get_point_in_time_id(data: dict):
+        """
+        Method to get the point in time to search within, opening a new one
+        if it is requested & none is given
+        Args:
+            data: the pagination data
+        Returns:
+            the point in time id, None if not used
+        """
+        pit_id = data.get(shared_constants.PIT_ID_KEY)
+        if not pit_id and data.get(shared_constants.POINT_IN_TIME_KEY):
+            pit_id = es_conn.open_point_in_time(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                keep_alive=elasticsearch_constants.ES_POINT_IN_TIME_KEEP_ALIVE,
+            )["id"]
+        return pit_id
+
+    @staticmethod
+    async def _get_point_in_time_id_async(data: dict):
+        """
+        Awaitable variant of _get_point_in_time_id
+        """
+        pit_id = data.get(shared_constants.PIT_ID_KEY)
+        if not pit_id and data.get(shared_constants.POINT_IN_TIME_KEY):
+            resp = await get_async_es_conn().open_point_in_time(
+                index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS,
+                keep_alive=elasticsearch_constants.ES_POINT_IN_TIME_KEEP_ALIVE,
             )
-            raise VideoRegistryException(500, self.INTERNAL_SERVER_ERROR_MESSAGE)
-        except Exception as e:
-            logger.exception(
-                QUERYING_FAILURE_MESSAGE,
-                exception=str(e),
+            pit_id = resp["id"]
+        return pit_id
+
+    @staticmethod
+    def _execute(s: Search, pit_id):
+        """
+        Method to execute the search, skipping the elasticsearch_dsl
+        response wrappers as the hits are consumed as plain dicts
+        Args:
+            s: the search instance
+            pit_id: the point in time the search targets, if any
+        Returns:
+            the raw search response
+        """
+        # The point in time already targets the index
+        index = None if pit_id else elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS
+        return es_conn.search(index=index, body=s.to_dict())
+
+    @staticmethod
+    async def _execute_async(s: Search, pit_id):
+        """
+        Awaitable variant of _execute, using the async ES client
+        """
+        index = None if pit_id else elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS
+        return await get_async_es_conn().search(index=index, body=s.to_dict())
+
+    @staticmethod
+    def _get_paginated_search(search_query, data: dict, pit_id=None):
+        """
+        Method to build the sorted & paginated ES search for the given query.
+        Pages either by offset or, when a 'search_after' is given, by cursor,
+        optionally within a point in time.
+        Args:
+            search_query: the ES query
+            data: the pagination/sorting data
+            pit_id: the point in time to search within, if any
+        Returns:
+            the search instance
+        """
+        limit = (
+            int(data[shared_constants.LIMIT_KEY])
+            if shared_constants.LIMIT_KEY in data
+            else shared_constants.DEFAULT_PER_PAGE_LIMIT
+        )
+        offset = (
+            int(data[shared_constants.OFFSET_KEY])
+            if shared_constants.OFFSET_KEY in data
+            else shared_constants.DEFAULT_OFFSET
+        )
+        sort = data.pop("sort", None)
+        sort = sort.lstrip("+") if sort else f"-{shared_constants.PUBLISHED_AT}"
+
+        if pit_id:
+            # The point in time already targets the index
+            s = Search().extra(
+                pit={
+                    "id": pit_id,
+                    "keep_alive": elasticsearch_constants.ES_POINT_IN_TIME_KEEP_ALIVE,
+                }
             )
-            raise VideoRegistryException(500, self.INTERNAL_SERVER_ERROR_MESSAGE)
+        else:
+            s = Search(index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS)
+
+        # The video id is the tiebreaker, keeping the cursor position unique.
+        # The default sort matches the index sorting, letting ES stop early.
+        s = s.query(search_query).sort(
+            sort, f"-{elasticsearch_constants.ES_TIEBREAKER_FIELD}"
+        )
+
+        track_total_hits = data.get(shared_constants.TRACK_TOTAL_HITS_KEY)
+        if track_total_hits is not None:
+            s = s.extra(track_total_hits=track_total_hits)
+
+        fields = data.get(shared_constants.FIELDS_KEY)
+        if fields:
+            s = s.source(includes=fields)
+
+        search_after = data.get(shared_constants.SEARCH_AFTER_KEY)
+        if search_after:
+            return s.extra(search_after=search_after)[:limit]
+        return s[offset : (offset + limit)]
+
+
+def _get_facets(resp):
+    """
+    Method to get the facets from the raw aggregations response
+    Args:
+        resp: the raw search response
+    Returns:
+        the facets dict
+    """
+    aggregations = resp["aggregations"]
+    query_buckets = aggregations.get(elasticsearch_constants.ES_QUERIES_AGG, {}).get(
+        "buckets", {}
+    )
+    return {
+        "total_count": resp["hits"]["total"]["value"],
+        "channels": [
+            (bucket["key"], bucket["doc_count"])
+            for bucket in aggregations[elasticsearch_constants.ES_CHANNELS_AGG][
+                "buckets"
+            ]
+        ],
+        "published_at_histogram": [
+            (bucket["key_as_string"], bucket["doc_count"])
+            for bucket in aggregations[elasticsearch_constants.ES_PUBLISHED_AT_AGG][
+                "buckets"
+            ]
+        ],
+        "query_counts": {
+            query: bucket["doc_count"] for query, bucket in query_buckets.items()
+        },
+    }
+
+
+def _get_suggestions(resp):
+    """
+    Method to get the suggested videos from the raw search response
+    Args:
+        resp: the raw search response
+    Returns:
+        the list of {"id", "title"} dicts
+    """
+    options = resp["suggest"][elasticsearch_constants.ES_TITLE_SUGGESTION_NAME][0][
+        "options"
+    ]
+    return [
+        {
+            shared_constants.ID_KEY: option["_id"],
+            shared_constants.TITLE_KEY: option["_source"].get(
+                shared_constants.TITLE_KEY
+            ),
+        }
+        for option in options
+    ]
+
+
+def _get_total_count(resp):
+    """
+    Method to get the total count of the matching documents
+    Args:
+        resp: the raw search response
+    Returns:
+        the total count, a lower bound if the counting was capped,
+        None if the counting was off
+    """
+    total = resp["hits"].get("total")
+    return total["value"] if total else None
+
+
+def _run_bulk_attempt(index_name, pending_docs, errors, chunk_size, max_chunk_bytes):
+    """
+    Method to stream a bulk index attempt of the pending documents,
+    collecting the failures of the attempt
+    Args:
+        index_name: the index to write the documents to
+        pending_docs: the documents to be indexed by their id
+        errors: the per-document errors by their id, updated with the
+            failures & cleared of the successes
+        chunk_size: the documents sent per bulk request
+        max_chunk_bytes: the maximum size of a bulk request
+    Returns:
+        the count of indexed documents & the documents to retry by their id
+    """
+    indexed_count = 0
+    retry_docs = {}
+    actions = (_get_bulk_index_action(index_name, doc) for doc in pending_docs.values())
+    for ok, item in helpers.streaming_bulk(
+        es_conn,
+        actions,
+        chunk_size=chunk_size,
+        max_chunk_bytes=max_chunk_bytes,
+        raise_on_error=False,
+        raise_on_exception=False,
+        **elasticsearch_connection.get_write_options(),
+    ):
+        result = item.get("index", {})
+        doc_id = result.get("_id")
+        if ok:
+            indexed_count += 1
+            errors.pop(doc_id, None)
+            continue
+        status = result.get("status")
+        errors[doc_id] = {
+            "id": doc_id,
+            "status": status,
+            "error": str(result.get("error")),
+        }
+        if _is_retryable_bulk_status(status):
+            retry_docs[doc_id] = pending_docs[doc_id]
+    return indexed_count, retry_docs
+
+
+def _get_bulk_index_action(index_name, doc):
+    """
+    Method to build the bulk helper action for indexing a document
+    Args:
+        index_name: the index to write the document to
+        doc: the document to be indexed
+    Returns:
+        the bulk index action
+    """
+    return {
+        "_op_type": "index",
+        "_index": index_name,
+        "_id": doc["id"],
+        "_source": doc,
+    }
+
+
+def _is_retryable_bulk_status(status):
+    """
+    Method to check if a failed bulk operation is worth retrying,
+    i.e., it was rejected (429), failed on the server side (5xx)
+    or never reached the server (connection errors have no status code)
+    Args:
+        status: the status of the failed bulk operation
+    Returns:
+        returns True if the operation can be retried else False
+    """
+    if not isinstance(status, int):
+        return True
+    return status == elasticsearch_constants.ES_BULK_RETRYABLE_STATUS or status >= 500
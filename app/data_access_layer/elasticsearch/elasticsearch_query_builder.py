@@ -36,6 +36,31 @@ def get_search_query(search_text):
         raise VideoRegistryException(500, "Failed to search the videos collections.")
 
 
+def get_title_suggestion_body(prefix, size):
+    """
+    Returns the ES search body suggesting the videos by their title prefix,
+    fetching no hits & only the id/title of the suggested videos
+    Args:
+        prefix: the typed title prefix
+        size: the maximum suggestions
+    Returns:
+        returns the search body
+    """
+    return {
+        "size": 0,
+        "_source": [shared_constants.ID_KEY, shared_constants.TITLE_KEY],
+        "suggest": {
+            elasticsearch_constants.ES_TITLE_SUGGESTION_NAME: {
+                "prefix": prefix,
+                "completion": {
+                    "field": shared_constants.TITLE_SUGGEST_KEY,
+                    "size": size,
+                },
+            }
+        },
+    }
+
+
 def _get_es_simple_query_string(value):
     f"""
     Method to get elasticsearch query using 'simple_query_string' for title & description fields.
@@ -1,55 +1,138 @@
-from datetime import datetime
-
+from elasticsearch import exceptions
 from elasticsearch_dsl import Index
 from structlog import get_logger
 
 from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer import es_conn
+from app.data_access_layer.elasticsearch import elasticsearch_connection
 from app.data_access_layer.elasticsearch.elasticsearch_constants import (
     ES_INDEX_REFRESH_INTERVAL_DEFAULT,
     ES_INDEX_REPLICAS_DEFAULT,
     ES_INDEX_SHARDS_DEFAULT,
     ES_REFRESH_INTERVAL,
     YOUTUBE_VIDEOS_ALIAS,
-    YOUTUBE_VIDEOS_INDEX_NAME,
+    YOUTUBE_VIDEOS_INDEX_PATTERN,
+    YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME,
 )
+from app.utils import shared_constants
 
 logger = get_logger()
 
-current_index = ""
-
 
-def get_index():
+def put_index_template():
     """
-    Method to get the index-name
-    Returns:
-        returns the ES index-name
+    Method to create/update the index template of the youtube-videos indices,
+    applied to every monthly index on creation. It maps the dates as dates,
+    keeps the unused fields out of the index, builds the title completion
+    index & sorts the segments by the publish time, so the default listing
+    can terminate early.
     """
-    index_name = _get_current_index(YOUTUBE_VIDEOS_INDEX_NAME)
-    if not is_index_created(index_name):
-        create_index(index_name)
-    return index_name
+    body = {
+        "index_patterns": [YOUTUBE_VIDEOS_INDEX_PATTERN],
+        "template": {
+            "settings": {
+                "index": {
+                    "sort.field": [
+                        shared_constants.PUBLISHED_AT,
+                        shared_constants.ID_KEY,
+                    ],
+                    "sort.order": ["desc", "desc"],
+                }
+            },
+            "mappings": _get_youtube_videos_mappings(),
+        },
+    }
+    try:
+        es_conn.indices.put_index_template(
+            name=YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME,
+            body=body,
+            **elasticsearch_connection.get_write_options(),
+        )
+        logger.info(
+            "Updated the index template in ElasticSearch",
+            template=YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME,
+        )
+    except exceptions.TransportError as te:
+        logger.exception(
+            f"Failed to update the index template {YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME}",
+            exception=str(te),
+        )
+        raise VideoRegistryException(
+            500,
+            f"Failed to update the index template {YOUTUBE_VIDEOS_INDEX_TEMPLATE_NAME}",
+        )
 
 
-def is_index_created(index):
+def put_title_suggest_mapping():
+    """
+    Method to add the title completion field to the youtube-videos indices
+    created before the index template, so the title suggester can run on all
+    of them. An index where the field was dynamically mapped can't be updated
+    & is logged, it has to be migrated: poetry run migrate-indices
     """
-    Method to check if the given index exists or not
+    mappings = es_conn.indices.get_mapping(index=YOUTUBE_VIDEOS_INDEX_PATTERN)
+    for index, mapping in mappings.items():
+        if has_title_suggest_mapping(mapping):
+            continue
+        try:
+            es_conn.indices.put_mapping(
+                index=index,
+                body={
+                    "properties": {
+                        shared_constants.TITLE_SUGGEST_KEY: {"type": "completion"}
+                    }
+                },
+                **elasticsearch_connection.get_write_options(),
+            )
+            logger.info("Added the title completion mapping", index=index)
+        except exceptions.TransportError as te:
+            logger.warning(
+                "Failed to add the title completion mapping, migrate the index",
+                index=index,
+                exception=str(te),
+            )
+
+
+def has_title_suggest_mapping(mapping) -> bool:
+    """
+    Method to check if the title completion field is mapped in an index
     Args:
-        index: the index value
+        mapping: the mapping of the index, as returned by the get mapping API
     Returns:
-        returns True if true else False
+        True if the title completion field is mapped
     """
-    try:
-        global current_index
-        if not current_index:
-            ind = Index(index)
-            if ind.exists():
-                current_index = index
-        return index == current_index
-    except VideoRegistryException as ex:
-        logger.exception(
-            "Exception while creating ES index", index=index, exception=str(ex)
-        )
-        raise VideoRegistryException(500, f"Exception while creating ES index: {index}")
+    properties = mapping["mappings"].get("properties", {})
+    field = properties.get(shared_constants.TITLE_SUGGEST_KEY, {})
+    return field.get("type") == "completion"
+
+
+def _get_youtube_videos_mappings():
+    """
+    Returns the explicit mappings of the youtube-videos documents
+    """
+    not_indexed_keyword = {"type": "keyword", "index": False, "doc_values": False}
+    return {
+        "dynamic": False,
+        # The suggest inputs are only needed in the completion index
+        "_source": {"excludes": [shared_constants.TITLE_SUGGEST_KEY]},
+        "properties": {
+            shared_constants.KIND_KEY: not_indexed_keyword,
+            shared_constants.ID_KEY: {"type": "keyword"},
+            shared_constants.PUBLISHED_AT: {
+                "type": "date",
+                "format": "strict_date_optional_time||epoch_millis",
+            },
+            shared_constants.TITLE_KEY: {"type": "text"},
+            shared_constants.TITLE_SUGGEST_KEY: {"type": "completion"},
+            shared_constants.DESCRIPTION_KEY: {"type": "text"},
+            shared_constants.THUMBNAIL_URL_KEY: not_indexed_keyword,
+            shared_constants.CHANNEL_TITLE_KEY: {
+                "type": "text",
+                "fields": {"keyword": {"type": "keyword", "ignore_above": 256}},
+            },
+            shared_constants.CREATED_AT_KEY: {"type": "date", "format": "epoch_millis"},
+        },
+    }
 
 
 def create_index(index_name):
@@ -58,7 +141,6 @@ def create_index(index_name):
     Args:
         index_name: the name of the index to be created
     """
-    global current_index
     create_index_with_properties(
         index_name, YOUTUBE_VIDEOS_ALIAS, refresh_interval=ES_REFRESH_INTERVAL
     )
@@ -103,26 +185,14 @@ def create_index_with_properties(
             index.aliases(**alias_kwargs)
 
         """ Create the index """
-        index.create()
+        index.create(**elasticsearch_connection.get_write_options())
         logger.info("Created index {} in ElasticSearch".format(name))
     except VideoRegistryException as ex:
         logger.exception(f"Failed to create index {name}", exception=str(ex))
         raise VideoRegistryException(500, f"Failed to create index {name}")
 
 
-def _get_current_index(index_name_placeholder: str):
-    """
-    Returns the current index as per the syntax defined
-    Args:
-        index_name_placeholder: index name string format
-    Returns:
-        formatted index name
-    """
-    index_suffix = _get_month_of_year(datetime.now())
-    return index_name_placeholder.format(index_suffix)
-
-
-def _get_month_of_year(date):
+def get_month_of_year(date):
     """
     Method to get the <Year>_<month> string corresponding to given date
     i.e., 2021_6
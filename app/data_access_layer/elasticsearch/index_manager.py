@@ -0,0 +1,138 @@
+import threading
+from datetime import datetime, timedelta
+
+from elasticsearch import exceptions
+from structlog import get_logger
+
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer import es_conn
+from app.data_access_layer.elasticsearch import (
+    elasticsearch_connection,
+    elasticsearch_util,
+)
+from app.data_access_layer.elasticsearch.elasticsearch_constants import (
+    ES_INDEX_PRECREATE_DAYS,
+    YOUTUBE_VIDEOS_INDEX_NAME,
+    YOUTUBE_VIDEOS_WRITE_ALIAS,
+)
+
+logger = get_logger()
+
+
+class IndexManager:
+    """
+    Manages the monthly youtube-videos indices & the write alias.
+
+    The documents are always written through the write alias, which points
+    to the index of the current month. The active month is cached, so the
+    write path makes no metadata round trips; the index template is put
+    once per process, before any index is created, along with the title
+    completion mapping of the indices created before the template. At the
+    month boundary the alias is moved to the new index in a single atomic
+    aliases update. The next month's index is created ahead of the rollover.
+    """
+
+    def __init__(self):
+        self._is_template_updated = False
+        self._active_index = None
+        self._next_index = None
+        self._lock = threading.Lock()
+
+    def get_write_index(self) -> str:
+        """
+        Method to get the index to write the documents to
+        Returns:
+            returns the write alias
+        """
+        if not self._is_template_updated:
+            with self._lock:
+                if not self._is_template_updated:
+                    elasticsearch_util.put_index_template()
+                    elasticsearch_util.put_title_suggest_mapping()
+                    self._is_template_updated = True
+
+        now = datetime.now()
+        index_name = _get_index_name(now)
+        if index_name != self._active_index:
+            with self._lock:
+                if index_name != self._active_index:
+                    self._rollover(index_name)
+
+        if _get_first_day_of_next_month(now) - now <= timedelta(
+            days=ES_INDEX_PRECREATE_DAYS
+        ):
+            next_index_name = _get_index_name(_get_first_day_of_next_month(now))
+            if next_index_name != self._next_index:
+                with self._lock:
+                    if next_index_name != self._next_index:
+                        elasticsearch_util.create_index(next_index_name)
+                        self._next_index = next_index_name
+
+        return YOUTUBE_VIDEOS_WRITE_ALIAS
+
+    def _rollover(self, index_name: str):
+        """
+        Method to create the index of the current month (if needed)
+        & atomically move the write alias to it
+        Args:
+            index_name: the index of the current month
+        """
+        elasticsearch_util.create_index(index_name)
+        try:
+            try:
+                holders = es_conn.indices.get_alias(name=YOUTUBE_VIDEOS_WRITE_ALIAS)
+            except exceptions.NotFoundError:
+                holders = {}
+
+            if set(holders) != {index_name}:
+                actions = [
+                    {"remove": {"index": holder, "alias": YOUTUBE_VIDEOS_WRITE_ALIAS}}
+                    for holder in holders
+                    if holder != index_name
+                ]
+                actions.append(
+                    {
+                        "add": {
+                            "index": index_name,
+                            "alias": YOUTUBE_VIDEOS_WRITE_ALIAS,
+                            "is_write_index": True,
+                        }
+                    }
+                )
+                es_conn.indices.update_aliases(
+                    body={"actions": actions},
+                    **elasticsearch_connection.get_write_options(),
+                )
+                logger.info(
+                    "Moved the write alias.",
+                    alias=YOUTUBE_VIDEOS_WRITE_ALIAS,
+                    index=index_name,
+                    previous_indices=list(holders),
+                )
+        except exceptions.TransportError as te:
+            logger.exception(
+                "Failed to move the write alias", index=index_name, exception=str(te)
+            )
+            raise VideoRegistryException(
+                500, f"Failed to move the write alias to {index_name}"
+            )
+        self._active_index = index_name
+
+
+def _get_index_name(date: datetime) -> str:
+    """
+    Returns the name of the index holding the given month's videos
+    """
+    return YOUTUBE_VIDEOS_INDEX_NAME.format(elasticsearch_util.get_month_of_year(date))
+
+
+def _get_first_day_of_next_month(date: datetime) -> datetime:
+    """
+    Returns the midnight of the first day of the month after the given date
+    """
+    return (date.replace(day=1) + timedelta(days=32)).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+index_manager = IndexManager()
@@ -0,0 +1,154 @@
+"""
+Migration of the youtube-videos indices created before the index template.
+
+Those indices were dynamically mapped, so the video id is a text field
+that can't be the listing sort tiebreaker & the title suggestions may be
+missing their completion field. Each of them is reindexed into an index
+created from the template under the same name, through a temporary index,
+moving its aliases along atomically at each step so that the videos stay
+listed. The title suggestion inputs are rebuilt while reindexing, as the
+source of the videos doesn't carry them. Run it with the ingestion stopped:
+    poetry run migrate-indices
+"""
+from elasticsearch import exceptions
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer import es_conn
+from app.data_access_layer.elasticsearch import (
+    elasticsearch_connection,
+    elasticsearch_util,
+)
+from app.data_access_layer.elasticsearch.elasticsearch_constants import (
+    ES_MIGRATION_INDEX_SUFFIX,
+    ES_REFRESH_INTERVAL,
+    YOUTUBE_VIDEOS_INDEX_PATTERN,
+)
+from app.utils import shared_constants
+
+logger = get_logger()
+
+# Rebuilds the title suggestion inputs of each reindexed video, like the
+# ingestion does: the title suffixes from each of its first words, weighted
+# by the publish time in hours. The inputs aren't kept in the source of the
+# templated indices, nor were they in the source of the older videos.
+TITLE_SUGGEST_SCRIPT = """
+def title = ctx._source[params.title_key];
+def publishedAt = ctx._source[params.published_at_key];
+if (title == null || publishedAt == null) {
+    ctx._source.remove(params.title_suggest_key);
+    return;
+}
+def words = [];
+for (def token : title.replace('\\t', ' ').replace('\\n', ' ').splitOnToken(' ')) {
+    if (!token.isEmpty()) {
+        words.add(token);
+    }
+}
+def inputs = [];
+for (int i = 0; i < Math.min(words.size(), params.max_inputs); i++) {
+    inputs.add(String.join(' ', words.subList(i, words.size())));
+}
+long hours = ZonedDateTime.parse(publishedAt).toEpochSecond() / 3600;
+ctx._source[params.title_suggest_key] = ['input': inputs, 'weight': (int) hours];
+"""
+
+
+def get_legacy_indices() -> list:
+    """
+    Method to get the youtube-videos indices whose video id isn't a keyword
+    or without the title completion field
+    Returns:
+        the names of the indices to migrate
+    """
+    mappings = es_conn.indices.get_mapping(index=YOUTUBE_VIDEOS_INDEX_PATTERN)
+    return sorted(
+        index
+        for index, mapping in mappings.items()
+        if mapping["mappings"]
+        .get("properties", {})
+        .get(shared_constants.ID_KEY, {})
+        .get("type")
+        != "keyword"
+        or not elasticsearch_util.has_title_suggest_mapping(mapping)
+    )
+
+
+def migrate_legacy_indices():
+    """
+    Method to reindex the legacy indices into templated indices of the same name
+    Returns:
+        the names of the migrated indices
+    """
+    elasticsearch_util.put_index_template()
+    legacy_indices = get_legacy_indices()
+    for index in legacy_indices:
+        temporary_index = f"{index}{ES_MIGRATION_INDEX_SUFFIX}"
+        _move_index(index, temporary_index)
+        _move_index(temporary_index, index)
+        logger.info("Migrated the index.", index=index)
+    return legacy_indices
+
+
+def _move_index(source, target):
+    """
+    Method to reindex an index into a new templated index, then move the
+    aliases of the source index to it & delete the source, atomically
+    Args:
+        source: the index to move
+        target: the name of the new index
+    """
+    try:
+        elasticsearch_util.create_index_with_properties(
+            target, alias=None, refresh_interval=ES_REFRESH_INTERVAL
+        )
+        es_conn.reindex(
+            body={
+                "source": {"index": source},
+                "dest": {"index": target},
+                "script": _get_title_suggest_script(),
+            },
+            refresh=True,
+            wait_for_completion=True,
+            request_timeout=settings.es_reindex_timeout,
+        )
+        aliases = es_conn.indices.get_alias(index=source)[source]["aliases"]
+        actions = [
+            {"add": {"index": target, "alias": alias, **properties}}
+            for alias, properties in aliases.items()
+        ]
+        actions.append({"remove_index": {"index": source}})
+        es_conn.indices.update_aliases(
+            body={"actions": actions},
+            **elasticsearch_connection.get_write_options(),
+        )
+        logger.info(
+            "Moved the index.", source=source, target=target, aliases=list(aliases)
+        )
+    except exceptions.TransportError as te:
+        logger.exception(
+            "Failed to move the index", source=source, target=target, exception=str(te)
+        )
+        raise VideoRegistryException(500, f"Failed to move the index {source}")
+
+
+def _get_title_suggest_script():
+    """
+    Returns the reindex script building the title suggestion inputs
+    """
+    return {
+        "lang": "painless",
+        "source": TITLE_SUGGEST_SCRIPT,
+        "params": {
+            "title_key": shared_constants.TITLE_KEY,
+            "published_at_key": shared_constants.PUBLISHED_AT,
+            "title_suggest_key": shared_constants.TITLE_SUGGEST_KEY,
+            "max_inputs": shared_constants.TITLE_SUGGEST_MAX_INPUTS,
+        },
+    }
+
+
+if __name__ == "__main__":
+    migrated_indices = migrate_legacy_indices()
+    logger.info("Done migrating the indices.", indices=migrated_indices)
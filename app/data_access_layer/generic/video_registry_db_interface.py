@@ -1,3 +1,5 @@
+import asyncio
+import functools
 from abc import ABC, abstractmethod
 
 
@@ -15,6 +17,17 @@ class VideoRegistryDBInterface(ABC):
             execution_context: any additional data/info required for performing the operation
         """
 
+    @abstractmethod
+    def add_records_bulk(self, data: list, execution_context: dict):
+        """
+        Method to create a batch of entries in the database
+        Args:
+            data: the list of entries which need to be inserted
+            execution_context: any additional data/info required for performing the operation
+        Returns:
+            the count of inserted entries & the list of per-entry errors
+        """
+
     @abstractmethod
     def get_all_records(self, data: dict, execution_context: dict):
         """
@@ -22,6 +35,13 @@ class VideoRegistryDBInterface(ABC):
         Args:
             data: the pagination/sorting data
             execution_context: any additional data/info required for performing the operation
+        Returns:
+            the search response, in the elasticsearch response format
+            ({"hits": {"hits": [{"_index", "_id", "_source", "sort"}, ...]}}),
+            & the total count of the entries. The counting follows the
+            'track_total_hits' data: True for exact, a number to cap it
+            ("total": {"relation": "gte"} beyond it) or False to skip it,
+            when the count is None
         """
 
     @abstractmethod
@@ -31,4 +51,79 @@ class VideoRegistryDBInterface(ABC):
         Args:
             data: the filtering/query data
             execution_context: any additional data/info required for performing the operation
+        Returns:
+            the search response, in the elasticsearch response format,
+            & the total count of the matching entries
+        """
+
+    @abstractmethod
+    def suggest_records(self, data: dict, execution_context: dict):
+        """
+        Method to get the entries whose title matches the given prefix
+        Args:
+            data: the prefix & the maximum suggestions
+            execution_context: any additional data/info required for performing the operation
+        Returns:
+            a list of {"id", "title"} dicts, the best matches first
+        """
+
+    @abstractmethod
+    def aggregate_records(self, data: dict, execution_context: dict):
+        """
+        Method to get the facets of the entries, optionally of the ones
+        matching a search query
+        Args:
+            data: the search query, the top channels size, the histogram
+                interval & the queries to count the matches of
+            execution_context: any additional data/info required for performing the operation
+        Returns:
+            a dict with the "total_count", the top "channels" & the
+            "published_at_histogram" as lists of (key, count) tuples
+            & the "query_counts" as a {query: count} dict
+        """
+
+    @abstractmethod
+    def get_all_record_ids(self, execution_context: dict):
+        """
+        Method to get the ids of all the entries in the database
+        Args:
+            execution_context: any additional data/info required for performing the operation
+        Returns:
+            an iterable of the entry ids
+        """
+
+    async def get_all_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of get_all_records.
+        Runs it in the default thread pool unless the DAL implements it natively.
+        """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(self.get_all_records, data, execution_context)
+        )
+
+    async def search_all_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of search_all_records.
+        Runs it in the default thread pool unless the DAL implements it natively.
+        """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(self.search_all_records, data, execution_context)
+        )
+
+    async def suggest_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of suggest_records.
+        Runs it in the default thread pool unless the DAL implements it natively.
+        """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(self.suggest_records, data, execution_context)
+        )
+
+    async def aggregate_records_async(self, data: dict, execution_context: dict):
+        """
+        Awaitable variant of aggregate_records.
+        Runs it in the default thread pool unless the DAL implements it natively.
         """
+        return await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(self.aggregate_records, data, execution_context)
+        )
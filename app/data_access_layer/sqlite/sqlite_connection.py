@@ -0,0 +1,142 @@
+"""Pooled connections to the embedded sqlite videos database"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from structlog import get_logger
+
+from app.core.config import settings
+from app.data_access_layer.sqlite import sqlite_util
+
+logger = get_logger()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class SqliteConnectionPool:
+    """
+    Connections to the embedded videos database.
+
+    A single write connection, serialized by a lock, and a pool of read-only
+    connections opened on demand up to the pool size. In the WAL journal mode
+    the reads neither block the writes nor each other, each read sees the
+    last committed state.
+    """
+
+    def __init__(self, db_path: str, reader_pool_size: int):
+        self.db_path = db_path
+        self.reader_pool_size = reader_pool_size
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._writer = self._connect()
+        sqlite_util.create_schema(self._writer)
+        self._write_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_count_lock = threading.Lock()
+
+    @contextmanager
+    def writer(self):
+        """
+        Holds the write connection, the writes are done one at a time
+        """
+        with self._write_lock:
+            yield self._writer
+
+    @contextmanager
+    def reader(self):
+        """
+        Holds a read connection, waiting for one to be released if all the
+        pool's connections are in use
+        """
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self):
+        """
+        Closes the idle connections, after checkpointing the WAL into the database
+        """
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writer.close()
+
+    def _acquire_reader(self):
+        """
+        Method to get an idle read connection, opening a new one while the
+        pool is not full
+        """
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_count_lock:
+            can_open = self._reader_count < self.reader_pool_size
+            if can_open:
+                self._reader_count += 1
+        if can_open:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+            return conn
+        return self._readers.get()
+
+    def _connect(self):
+        """
+        Method to open a connection, in autocommit mode with the transactions
+        begun explicitly, shared across the threads of the thread pool
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=settings.sqlite_busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        # Durable at each checkpoint, a commit does not wait for the disk
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}")
+        conn.execute(f"PRAGMA mmap_size = {settings.sqlite_mmap_size}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+
+def get_pool() -> SqliteConnectionPool:
+    """
+    Returns the shared connection pool, creating it & the schema on first use
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SqliteConnectionPool(
+                    settings.sqlite_db_path, settings.sqlite_reader_pool_size
+                )
+                logger.info(
+                    "Opened the sqlite database.",
+                    db_path=settings.sqlite_db_path,
+                    reader_pool_size=settings.sqlite_reader_pool_size,
+                )
+    return _pool
+
+
+def close_pool():
+    """
+    Closes the shared connection pool, if it was opened
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            logger.info("Closed the sqlite database.")
+        _pool = None
@@ -0,0 +1,19 @@
+YOUTUBE_VIDEOS_TABLE = "youtube_videos"
+YOUTUBE_VIDEOS_FTS_TABLE = "youtube_videos_fts"
+# Internal row id of the videos, the rowid of their full-text index entries
+ROW_ID_COLUMN = "row_id"
+# Publish time in epoch millis, the sort value of the videos like in ES
+PUBLISHED_AT_MS_COLUMN = "published_at_ms"
+PUBLISHED_AT_INDEX = f"{YOUTUBE_VIDEOS_TABLE}_published_at"
+
+# Execution context overrides
+SQLITE_BATCH_SIZE_KEY = "batch_size"
+
+# Date modifiers mapping a publish date to the first day of its histogram
+# bucket, the weeks start on monday like the ES calendar intervals
+HISTOGRAM_BUCKET_MODIFIERS = {
+    "day": (),
+    "week": ("weekday 0", "-6 days"),
+    "month": ("start of month",),
+}
+HISTOGRAM_DATE_FORMAT = "%Y-%m-%d"
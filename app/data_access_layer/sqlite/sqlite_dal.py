@@ -0,0 +1,615 @@
+import calendar
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from structlog import get_logger
+
+from app.core.config import settings
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer.generic.video_registry_db_interface import (
+    VideoRegistryDBInterface,
+)
+from app.data_access_layer.sqlite import sqlite_query_builder, sqlite_util
+from app.data_access_layer.sqlite.sqlite_connection import get_pool
+from app.data_access_layer.sqlite.sqlite_constants import (
+    HISTOGRAM_BUCKET_MODIFIERS,
+    HISTOGRAM_DATE_FORMAT,
+    PUBLISHED_AT_INDEX,
+    PUBLISHED_AT_MS_COLUMN,
+    SQLITE_BATCH_SIZE_KEY,
+    YOUTUBE_VIDEOS_TABLE,
+)
+from app.utils import common_utils, shared_constants
+
+logger = get_logger()
+
+# Error messages
+QUERYING_FAILURE_MESSAGE = "Exception while fetching video records from SQLite"
+
+
+class SqliteDAL(VideoRegistryDBInterface):
+    """
+    Data access layer for the embedded SQLite storage.
+
+    Stores the videos in a single table sorted by an index on the publish
+    time, with an FTS5 full-text index on their title & description. The
+    responses have the elasticsearch response format, so that both storages
+    are interchangeable. The videos are paged by offset or, when a
+    'search_after' is given, by keyset on the publish time & the id;
+    a point in time is not supported, the pages read the latest state.
+    """
+
+    INTERNAL_SERVER_ERROR_MESSAGE = "Internal server error."
+
+    def add_records(self, data: dict, execution_context: dict):
+        """
+        Method to insert a youtube-videos entry, replacing the stored one with the same id
+        Args:
+            data: the video to be stored
+            execution_context: additional information required for storing the data
+        """
+        _, errors = self.add_records_bulk([data], execution_context)
+        if errors:
+            logger.error("Failed to store the document.", data=data, errors=errors)
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+    def add_records_bulk(self, data: list, execution_context: dict):
+        """
+        Method to insert a batch of youtube-videos entries, replacing the stored
+        ones with the same ids, in transactions of 'batch_size' entries
+        Args:
+            data: the list of videos to be stored
+            execution_context: additional information required for storing the data
+                i.e., the batch_size override
+        Returns:
+            returns the count of stored videos & the list of per-video errors
+        """
+        batch_size = execution_context.get(
+            SQLITE_BATCH_SIZE_KEY, settings.sqlite_batch_size
+        )
+        created_at = common_utils.get_epoch_millis()
+        rows, errors = [], []
+        for doc in data:
+            try:
+                rows.append(_get_row(doc, created_at))
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append(
+                    {
+                        "id": doc.get(shared_constants.ID_KEY),
+                        "status": 400,
+                        "error": str(e),
+                    }
+                )
+
+        upsert_statement = sqlite_util.get_upsert_statement()
+        try:
+            with get_pool().writer() as conn:
+                for i in range(0, len(rows), batch_size):
+                    conn.execute("BEGIN")
+                    try:
+                        conn.executemany(upsert_statement, rows[i : i + batch_size])
+                        conn.execute("COMMIT")
+                    except sqlite3.Error:
+                        conn.execute("ROLLBACK")
+                        raise
+        except sqlite3.Error as e:
+            logger.exception("Failed to bulk store the documents.", exception=str(e))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+        logger.info(
+            "Done bulk writing data to sqlite",
+            indexed_count=len(rows),
+            failed_count=len(errors),
+        )
+        return len(rows), errors
+
+    def get_all_record_ids(self, execution_context: dict):
+        """
+        Method to get the ids of all the youtube-videos entries
+        Args:
+            execution_context: additional information required for reading the data
+        Returns:
+            returns a generator of the video ids
+        """
+        try:
+            with get_pool().reader() as conn:
+                for (video_id,) in conn.execute(
+                    f"SELECT id FROM {YOUTUBE_VIDEOS_TABLE}"
+                ):
+                    yield video_id
+        except sqlite3.Error as e:
+            logger.exception(QUERYING_FAILURE_MESSAGE, exception=str(e))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+    def get_all_records(self, data: dict, execution_context: dict):
+        """
+        Method to get a page of the youtube-videos entries
+        Args:
+            data: the pagination/sorting data
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the search response in the ES format & the count of videos
+        """
+        return self._get_page(None, data)
+
+    def search_all_records(self, data: dict, execution_context: dict):
+        """
+        Method to get a page of the youtube-videos entries matching the
+        search query on their title/description
+        Args:
+            data: the filtering/query data
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the search response in the ES format & the count of videos
+        """
+        search_expression = sqlite_query_builder.get_search_expression(
+            data.get(shared_constants.VIDEOS_SEARCH_QUERY_KEY)
+        )
+        if not search_expression:
+            # No words to search for, nothing matches
+            return {"hits": {"hits": []}}, 0
+        return self._get_page(search_expression, data)
+
+    def suggest_records(self, data: dict, execution_context: dict):
+        """
+        Method to suggest the youtube-videos by their title prefix,
+        the newest videos first
+        Args:
+            data: the prefix & the maximum suggestions
+            execution_context: additional information required for reading the data
+        Returns:
+            returns a list of {"id", "title"} dicts
+        """
+        expression = sqlite_query_builder.get_title_prefix_expression(
+            data[shared_constants.PREFIX_KEY]
+        )
+        if not expression:
+            return []
+        limit = int(
+            data.get(shared_constants.LIMIT_KEY, shared_constants.DEFAULT_SUGGEST_LIMIT)
+        )
+        try:
+            with get_pool().reader() as conn:
+                conn.execute("BEGIN")
+                try:
+                    match_filter, index = self._get_match_filter(conn, expression, None)
+                    table = YOUTUBE_VIDEOS_TABLE
+                    if index:
+                        table = f"{YOUTUBE_VIDEOS_TABLE} INDEXED BY {index}"
+                    rows = conn.execute(
+                        f"SELECT id, title FROM {table} WHERE {match_filter} "
+                        f"ORDER BY {PUBLISHED_AT_MS_COLUMN} DESC, id DESC LIMIT ?",
+                        (expression, limit),
+                    ).fetchall()
+                finally:
+                    conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(e))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+        return [
+            {shared_constants.ID_KEY: video_id, shared_constants.TITLE_KEY: title}
+            for video_id, title in rows
+        ]
+
+    def aggregate_records(self, data: dict, execution_context: dict):
+        """
+        Method to get the facets of the youtube-videos, optionally of the
+        ones matching the search query
+        Args:
+            data: the search query, the top channels size, the histogram
+                interval & the queries to count the matches of
+            execution_context: additional information required for reading the data
+        Returns:
+            returns the facets dict
+        """
+        search_expression = sqlite_query_builder.get_search_expression(
+            data.get(shared_constants.VIDEOS_SEARCH_QUERY_KEY)
+        )
+        where, params = "", ()
+        if search_expression:
+            where = f"WHERE {sqlite_query_builder.get_match_filter()}"
+            params = (search_expression,)
+        interval = data[shared_constants.INTERVAL_KEY]
+        try:
+            with get_pool().reader() as conn:
+                # A single read transaction, all the facets see the same state
+                conn.execute("BEGIN")
+                try:
+                    total = self._count_total(conn, search_expression, True)
+                    channels = conn.execute(
+                        f"SELECT channel_title, COUNT(*) AS count "
+                        f"FROM {YOUTUBE_VIDEOS_TABLE} {where} "
+                        f"{'AND' if where else 'WHERE'} channel_title IS NOT NULL "
+                        f"GROUP BY channel_title ORDER BY count DESC, channel_title "
+                        f"LIMIT ?",
+                        (*params, int(data[shared_constants.CHANNELS_SIZE_KEY])),
+                    ).fetchall()
+                    if search_expression:
+                        histogram = self._group_histogram(conn, where, params, interval)
+                    else:
+                        histogram = self._count_histogram_ranges(conn, interval)
+                    query_counts = {
+                        query: self._count_matches(
+                            conn,
+                            sqlite_query_builder.combine_expressions(
+                                sqlite_query_builder.get_search_expression(query),
+                                search_expression,
+                            ),
+                        )
+                        for query in data.get(shared_constants.QUERIES_KEY) or []
+                    }
+                finally:
+                    conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(e))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+        return {
+            "total_count": total["value"],
+            "channels": [tuple(channel) for channel in channels],
+            "published_at_histogram": histogram,
+            "query_counts": query_counts,
+        }
+
+    def _get_page(self, search_expression, data: dict):
+        """
+        Method to read a sorted page of the videos, optionally of the ones
+        matching the full-text search expression
+        Args:
+            search_expression: the FTS5 match expression, None for all the videos
+            data: the pagination/sorting data
+        Returns:
+            returns the search response in the ES format & the count of videos
+        """
+        limit = int(
+            data.get(
+                shared_constants.LIMIT_KEY, shared_constants.DEFAULT_PER_PAGE_LIMIT
+            )
+        )
+        offset = int(
+            data.get(shared_constants.OFFSET_KEY, shared_constants.DEFAULT_OFFSET)
+        )
+        is_ascending = self._is_ascending_sort(data.pop("sort", None))
+        search_after = data.get(shared_constants.SEARCH_AFTER_KEY)
+        filters, params = self._get_keyset_filters(search_after, is_ascending)
+        if search_after:
+            offset = 0
+
+        fields = data.get(shared_constants.FIELDS_KEY) or sorted(
+            shared_constants.VIDEO_FIELDS
+        )
+        start = time.perf_counter()
+        try:
+            with get_pool().reader() as conn:
+                conn.execute("BEGIN")
+                try:
+                    total = self._count_total(
+                        conn,
+                        search_expression,
+                        data.get(shared_constants.TRACK_TOTAL_HITS_KEY),
+                    )
+                    query, params = self._get_page_query(
+                        conn, search_expression, total, filters, params, fields
+                    )
+                    cursor = conn.execute(
+                        f"{query} "
+                        f"ORDER BY {PUBLISHED_AT_MS_COLUMN} "
+                        f"{'ASC' if is_ascending else 'DESC'}, id DESC "
+                        f"LIMIT ? OFFSET ?",
+                        (*params, limit, offset),
+                    )
+                    names = [description[0] for description in cursor.description]
+                    rows = cursor.fetchall()
+                finally:
+                    conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.exception(QUERYING_FAILURE_MESSAGE, data=data, exception=str(e))
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+
+        resp = {
+            "took": round((time.perf_counter() - start) * 1000),
+            "timed_out": False,
+            "hits": {"hits": [_get_hit(dict(zip(names, row)), fields) for row in rows]},
+        }
+        if total:
+            resp["hits"]["total"] = total
+        return resp, total["value"] if total else None
+
+    def _is_ascending_sort(self, sort):
+        """
+        Method to get the order of the publish time sort
+        Args:
+            sort: the sort field, prefixed with '-' for a descending order,
+            None for the default newest first order
+        Returns:
+            True for an ascending sort
+        Raises:
+            VideoRegistryException: if the sort field is not the publish time
+        """
+        if sort and sort.lstrip("+-") != shared_constants.PUBLISHED_AT:
+            logger.error("Unsupported sort field.", sort=sort)
+            raise VideoRegistryException(500, detail=self.INTERNAL_SERVER_ERROR_MESSAGE)
+        return bool(sort) and not sort.lstrip("+").startswith("-")
+
+    @staticmethod
+    def _get_keyset_filters(search_after, is_ascending):
+        """
+        Method to get the filters of the videos after the keyset cursor
+        Args:
+            search_after: the publish time (epoch millis) & the id of the
+            last video of the previous page, None for the first page
+            is_ascending: whether the publish time is sorted ascending
+        Returns:
+            the filters & their params
+        """
+        if not search_after:
+            return [], []
+        published_at_ms, video_id = search_after
+        # The video id is the tiebreaker, always descending like in ES
+        if is_ascending:
+            return [
+                f"({PUBLISHED_AT_MS_COLUMN} > ? OR "
+                f"({PUBLISHED_AT_MS_COLUMN} = ? AND id < ?))"
+            ], [published_at_ms, published_at_ms, video_id]
+        return [f"({PUBLISHED_AT_MS_COLUMN}, id) < (?, ?)"], [
+            published_at_ms,
+            video_id,
+        ]
+
+    def _get_page_query(self, conn, search_expression, total, filters, params, fields):
+        """
+        Method to build the filtered select of the page videos, before its
+        ordering & limits
+        Args:
+            conn: the read connection
+            search_expression: the FTS5 match expression, None for all the videos
+            total: the ES total dict of the matches, if they were counted
+            filters: the keyset filters
+            params: the params of the keyset filters
+            fields: the fields to select
+        Returns:
+            the select query & its params
+        """
+        columns = ", ".join(
+            dict.fromkeys((PUBLISHED_AT_MS_COLUMN, shared_constants.ID_KEY, *fields))
+        )
+        table = YOUTUBE_VIDEOS_TABLE
+        if search_expression:
+            match_filter, index = self._get_match_filter(conn, search_expression, total)
+            filters = [match_filter, *filters]
+            params = [search_expression, *params]
+            if index:
+                table = f"{YOUTUBE_VIDEOS_TABLE} INDEXED BY {index}"
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        return f"SELECT {columns} FROM {table} {where}", params
+
+    @staticmethod
+    def _count_total(conn, search_expression, track_total_hits):
+        """
+        Method to count the matching videos, following the ES 'track_total_hits'
+        Args:
+            conn: the read connection
+            search_expression: the FTS5 match expression, None for all the videos
+            track_total_hits: True for exact, a number to cap it, False to skip it
+        Returns:
+            the ES total dict, None if the counting is off
+        """
+        if track_total_hits is False:
+            return None
+        if track_total_hits is True:
+            # An unbounded limit, counted in full
+            cap, limit = None, -1
+        else:
+            # Counting no further than the cap, by default the ES one
+            cap = int(track_total_hits or settings.total_count_cap)
+            limit = cap + 1
+        if search_expression:
+            # Every video has its full-text index entry, the videos aren't read
+            (count,) = conn.execute(
+                sqlite_query_builder.get_match_count_query(),
+                (search_expression, limit),
+            ).fetchone()
+        elif cap is None:
+            (count,) = conn.execute(
+                f"SELECT COUNT(*) FROM {YOUTUBE_VIDEOS_TABLE}"
+            ).fetchone()
+        else:
+            (count,) = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT 1 FROM {YOUTUBE_VIDEOS_TABLE} "
+                f"LIMIT ?)",
+                (limit,),
+            ).fetchone()
+        if cap is not None and count > cap:
+            return {"value": cap, "relation": "gte"}
+        return {"value": count, "relation": "eq"}
+
+    @staticmethod
+    def _get_match_filter(conn, search_expression, total):
+        """
+        Method to pick how the videos matching the FTS5 expression are read.
+        The matches of a selective expression are read from the full-text
+        index & sorted, while the ones of a common expression are probed in
+        the publish time index order, stopping at the page end like ES does
+        with its sorted index
+        Args:
+            conn: the read connection
+            search_expression: the FTS5 match expression
+            total: the ES total dict of the matches, if they were counted
+        Returns:
+            the filter taking the expression as its parameter & the index
+            to read the videos by, None to let SQLite choose
+        """
+        cap = settings.total_count_cap
+        if total and (total["relation"] == "eq" or total["value"] >= cap):
+            matches = total["value"] + (total["relation"] == "gte")
+        else:
+            (matches,) = conn.execute(
+                sqlite_query_builder.get_match_count_query(),
+                (search_expression, cap + 1),
+            ).fetchone()
+        if matches > cap:
+            return sqlite_query_builder.get_match_probe(), PUBLISHED_AT_INDEX
+        return sqlite_query_builder.get_match_filter(), None
+
+    @staticmethod
+    def _group_histogram(conn, where, params, interval):
+        """
+        Method to count the filtered videos of each histogram bucket, grouping
+        the matching videos by their bucket
+        Args:
+            conn: the read connection
+            where: the where clause of the filtered videos
+            params: the params of the where clause
+            interval: the bucket interval
+        Returns:
+            the list of (date, count) tuples
+        """
+        bucket = _get_bucket_expression(PUBLISHED_AT_MS_COLUMN, interval)
+        buckets = conn.execute(
+            f"SELECT {bucket} AS bucket, COUNT(*) FROM {YOUTUBE_VIDEOS_TABLE} {where} "
+            f"GROUP BY bucket ORDER BY bucket",
+            params,
+        ).fetchall()
+        return _fill_histogram_gaps(buckets, interval)
+
+    @staticmethod
+    def _count_histogram_ranges(conn, interval):
+        """
+        Method to count the videos of each histogram bucket, from the first
+        to the last one, as ranges of the publish time index. Unlike grouping
+        the videos by their bucket, the videos themselves are neither read
+        nor sorted
+        Args:
+            conn: the read connection
+            interval: the bucket interval
+        Returns:
+            the list of (date, count) tuples
+        """
+        first_bucket = _get_bucket_expression(
+            f"MIN({PUBLISHED_AT_MS_COLUMN})", interval
+        )
+        first_date, last_ms = conn.execute(
+            f"SELECT {first_bucket}, MAX({PUBLISHED_AT_MS_COLUMN}) "
+            f"FROM {YOUTUBE_VIDEOS_TABLE}"
+        ).fetchone()
+        if first_date is None:
+            return []
+        # The bucket start dates, the last one ending the last bucket
+        dates = [datetime.strptime(first_date, HISTOGRAM_DATE_FORMAT)]
+        while calendar.timegm(dates[-1].timetuple()) * 1000 <= last_ms:
+            dates.append(_get_next_bucket_date(dates[-1], interval))
+        rows = conn.execute(
+            f"WITH buckets AS (SELECT key, value AS start, "
+            f"lead(value) OVER (ORDER BY key) AS end FROM json_each(?)) "
+            f"SELECT (SELECT COUNT(*) FROM {YOUTUBE_VIDEOS_TABLE} "
+            f"INDEXED BY {PUBLISHED_AT_INDEX} "
+            f"WHERE {PUBLISHED_AT_MS_COLUMN} >= start "
+            f"AND {PUBLISHED_AT_MS_COLUMN} < end) "
+            f"FROM buckets WHERE end IS NOT NULL ORDER BY key",
+            (json.dumps([calendar.timegm(date.timetuple()) * 1000 for date in dates]),),
+        ).fetchall()
+        return [
+            (date.strftime(HISTOGRAM_DATE_FORMAT), count)
+            for date, (count,) in zip(dates, rows)
+        ]
+
+    @staticmethod
+    def _count_matches(conn, expression):
+        """
+        Method to count the videos matching the FTS5 expression
+        """
+        if not expression:
+            return 0
+        (count,) = conn.execute(
+            sqlite_query_builder.get_match_count_query(), (expression, -1)
+        ).fetchone()
+        return count
+
+
+def _get_hit(values, fields):
+    """
+    Method to map a video row onto an ES search hit
+    Args:
+        values: the column values of the row by column name
+        fields: the fields of the hit source, the missing ones left out
+    Returns:
+        the search hit, sorted by the publish time (epoch millis) & the id
+    """
+    return {
+        "_index": YOUTUBE_VIDEOS_TABLE,
+        "_id": values[shared_constants.ID_KEY],
+        "_score": None,
+        "_source": {
+            field: values[field] for field in fields if values[field] is not None
+        },
+        "sort": [values[PUBLISHED_AT_MS_COLUMN], values[shared_constants.ID_KEY]],
+    }
+
+
+def _get_row(doc, created_at):
+    """
+    Method to get the stored columns of a video document
+    Args:
+        doc: the video document
+        created_at: the write time in epoch millis
+    Returns:
+        the column values, in the order of the stored columns
+    """
+    published_at = doc[shared_constants.PUBLISHED_AT]
+    values = {
+        **doc,
+        PUBLISHED_AT_MS_COLUMN: common_utils.rfc_3339_to_epoch(published_at) * 1000,
+        shared_constants.CREATED_AT_KEY: created_at,
+    }
+    if not values[shared_constants.ID_KEY]:
+        raise ValueError("The video id is missing")
+    return tuple(values.get(column) for column in sqlite_util.VIDEO_COLUMNS)
+
+
+def _get_bucket_expression(published_at_ms, interval):
+    """
+    Method to get the SQL expression of the first day of the histogram bucket
+    of a publish time in epoch millis
+    """
+    return "date({})".format(
+        ", ".join(
+            (
+                f"{published_at_ms} / 1000",
+                "'unixepoch'",
+                *(f"'{modifier}'" for modifier in HISTOGRAM_BUCKET_MODIFIERS[interval]),
+            )
+        )
+    )
+
+
+def _get_next_bucket_date(date, interval):
+    """
+    Method to get the first day of the histogram bucket following the given one
+    """
+    if interval == "month":
+        return (date.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return date + timedelta(days=7 if interval == "week" else 1)
+
+
+def _fill_histogram_gaps(buckets, interval):
+    """
+    Method to add the empty buckets between the first & the last bucket,
+    like the ES date histogram
+    Args:
+        buckets: the (first day of the bucket, count) rows, ordered by date
+        interval: the bucket interval
+    Returns:
+        the list of (date, count) tuples
+    """
+    counts = dict(buckets)
+    if not counts:
+        return []
+    date = datetime.strptime(buckets[0][0], HISTOGRAM_DATE_FORMAT)
+    last_date = datetime.strptime(buckets[-1][0], HISTOGRAM_DATE_FORMAT)
+    histogram = []
+    while date <= last_date:
+        key = date.strftime(HISTOGRAM_DATE_FORMAT)
+        histogram.append((key, counts.get(key, 0)))
+        date = _get_next_bucket_date(date, interval)
+    return histogram
@@ -0,0 +1,95 @@
+from typing import Optional
+
+from app.data_access_layer.sqlite.sqlite_constants import (
+    ROW_ID_COLUMN,
+    YOUTUBE_VIDEOS_FTS_TABLE,
+)
+from app.utils import shared_constants
+from app.utils.common_utils import string_unquote
+
+
+def get_search_expression(search_text) -> Optional[str]:
+    """
+    Returns the FTS5 expression matching the videos containing any of the
+    words of the search text in their title/description, like the ES
+    simple query string
+    Args:
+        search_text: the search text, or a list of words
+    Returns:
+        returns the match expression, None if there are no words
+    """
+    if isinstance(search_text, list):
+        words = list(dict.fromkeys(search_text))
+    else:
+        words = string_unquote(search_text or "").split()
+    if not words:
+        return None
+    # Quoted as strings, the FTS5 operators & special characters are matched as text
+    return " OR ".join(_quote(word) for word in words)
+
+
+def get_title_prefix_expression(prefix) -> Optional[str]:
+    """
+    Returns the FTS5 expression matching the videos whose title contains
+    the words of the prefix in a row, the last of them as a word prefix
+    Args:
+        prefix: the typed title prefix
+    Returns:
+        returns the match expression, None if there are no words
+    """
+    words = string_unquote(prefix or "").split()
+    if not words:
+        return None
+    return f"{shared_constants.TITLE_KEY} : {_quote(' '.join(words))} *"
+
+
+def combine_expressions(*expressions) -> Optional[str]:
+    """
+    Returns the FTS5 expression matching all of the given expressions
+    """
+    expressions = [expression for expression in expressions if expression]
+    if not expressions:
+        return None
+    return " AND ".join(f"({expression})" for expression in expressions)
+
+
+def get_match_filter() -> str:
+    """
+    Returns the filter of the videos matching an FTS5 expression,
+    taking the expression as its single parameter
+    """
+    return (
+        f"{ROW_ID_COLUMN} IN (SELECT rowid FROM {YOUTUBE_VIDEOS_FTS_TABLE} "
+        f"WHERE {YOUTUBE_VIDEOS_FTS_TABLE} MATCH ?)"
+    )
+
+
+def get_match_probe() -> str:
+    """
+    Returns the filter of the videos matching an FTS5 expression, probing
+    the full-text index for each video, taking the expression as its single
+    parameter. Cheaper than the match filter when most videos match & only
+    the first ones of the publish time index are read.
+    """
+    return (
+        f"EXISTS (SELECT 1 FROM {YOUTUBE_VIDEOS_FTS_TABLE} "
+        f"WHERE {YOUTUBE_VIDEOS_FTS_TABLE} MATCH ? AND rowid = {ROW_ID_COLUMN})"
+    )
+
+
+def get_match_count_query() -> str:
+    """
+    Returns the query counting the matches of an FTS5 expression up to a cap,
+    on the full-text index only, taking the expression & the cap as parameters
+    """
+    return (
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {YOUTUBE_VIDEOS_FTS_TABLE} "
+        f"WHERE {YOUTUBE_VIDEOS_FTS_TABLE} MATCH ? LIMIT ?)"
+    )
+
+
+def _quote(text):
+    """
+    Method to quote a string in an FTS5 expression
+    """
+    return '"' + text.replace('"', '""') + '"'
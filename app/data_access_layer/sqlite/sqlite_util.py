@@ -0,0 +1,126 @@
+import sqlite3
+
+from structlog import get_logger
+
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer.sqlite.sqlite_constants import (
+    PUBLISHED_AT_INDEX,
+    PUBLISHED_AT_MS_COLUMN,
+    ROW_ID_COLUMN,
+    YOUTUBE_VIDEOS_FTS_TABLE,
+    YOUTUBE_VIDEOS_TABLE,
+)
+from app.utils import shared_constants
+
+logger = get_logger()
+
+# The stored columns of a video, besides the row id
+VIDEO_COLUMNS = (
+    shared_constants.KIND_KEY,
+    shared_constants.ID_KEY,
+    shared_constants.PUBLISHED_AT,
+    PUBLISHED_AT_MS_COLUMN,
+    shared_constants.TITLE_KEY,
+    shared_constants.DESCRIPTION_KEY,
+    shared_constants.THUMBNAIL_URL_KEY,
+    shared_constants.CHANNEL_TITLE_KEY,
+    shared_constants.CREATED_AT_KEY,
+)
+
+SCHEMA_STATEMENTS = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {YOUTUBE_VIDEOS_TABLE} (
+        {ROW_ID_COLUMN} INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        kind TEXT,
+        published_at TEXT NOT NULL,
+        {PUBLISHED_AT_MS_COLUMN} INTEGER NOT NULL,
+        title TEXT NOT NULL DEFAULT '',
+        description TEXT NOT NULL DEFAULT '',
+        thumbnail_url TEXT,
+        channel_title TEXT,
+        created_at INTEGER
+    )
+    """,
+    # The default listing order, read in order & stopped at the page end
+    f"""
+    CREATE INDEX IF NOT EXISTS {PUBLISHED_AT_INDEX}
+    ON {YOUTUBE_VIDEOS_TABLE} ({PUBLISHED_AT_MS_COLUMN} DESC, id DESC)
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS {YOUTUBE_VIDEOS_TABLE}_channel_title
+    ON {YOUTUBE_VIDEOS_TABLE} (channel_title)
+    """,
+    # Full-text index of the title & description, without a copy of their
+    # text. The 2 & 3 characters prefixes are indexed for the suggestions.
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {YOUTUBE_VIDEOS_FTS_TABLE} USING fts5(
+        title,
+        description,
+        content='{YOUTUBE_VIDEOS_TABLE}',
+        content_rowid='{ROW_ID_COLUMN}',
+        prefix='2 3'
+    )
+    """,
+    # Keeping the full-text index in sync with the videos
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {YOUTUBE_VIDEOS_TABLE}_after_insert
+    AFTER INSERT ON {YOUTUBE_VIDEOS_TABLE} BEGIN
+        INSERT INTO {YOUTUBE_VIDEOS_FTS_TABLE} (rowid, title, description)
+        VALUES (new.{ROW_ID_COLUMN}, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {YOUTUBE_VIDEOS_TABLE}_after_delete
+    AFTER DELETE ON {YOUTUBE_VIDEOS_TABLE} BEGIN
+        INSERT INTO {YOUTUBE_VIDEOS_FTS_TABLE}
+            ({YOUTUBE_VIDEOS_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.{ROW_ID_COLUMN}, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {YOUTUBE_VIDEOS_TABLE}_after_update
+    AFTER UPDATE OF title, description ON {YOUTUBE_VIDEOS_TABLE} BEGIN
+        INSERT INTO {YOUTUBE_VIDEOS_FTS_TABLE}
+            ({YOUTUBE_VIDEOS_FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.{ROW_ID_COLUMN}, old.title, old.description);
+        INSERT INTO {YOUTUBE_VIDEOS_FTS_TABLE} (rowid, title, description)
+        VALUES (new.{ROW_ID_COLUMN}, new.title, new.description);
+    END
+    """,
+)
+
+
+def create_schema(conn: sqlite3.Connection):
+    """
+    Method to create the youtube-videos table, its indices & its full-text
+    index, if they do not exist yet
+    Args:
+        conn: the write connection
+    """
+    try:
+        with conn:
+            for statement in SCHEMA_STATEMENTS:
+                conn.execute(statement)
+        logger.info("Created the sqlite schema.", table=YOUTUBE_VIDEOS_TABLE)
+    except sqlite3.Error as e:
+        logger.exception("Failed to create the sqlite schema.", exception=str(e))
+        raise VideoRegistryException(500, "Internal server error.")
+
+
+def get_upsert_statement():
+    """
+    Returns the statement inserting a video, or replacing the stored one
+    with the same id
+    """
+    columns = ", ".join(VIDEO_COLUMNS)
+    placeholders = ", ".join("?" for _ in VIDEO_COLUMNS)
+    updates = ", ".join(
+        f"{column} = excluded.{column}"
+        for column in VIDEO_COLUMNS
+        if column != shared_constants.ID_KEY
+    )
+    return (
+        f"INSERT INTO {YOUTUBE_VIDEOS_TABLE} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    )
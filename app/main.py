@@ -3,9 +3,12 @@ import asyncio
 from fastapi import FastAPI
 from structlog import get_logger
 
+from app.api.client import http_client
 from app.api.ui_api.v1.video_registry_endpoint import app as video_app
 from app.core.config import settings
 from app.core.cron import bg_video_updater
+from app.data_access_layer import close_async_es_conn
+from app.data_access_layer.sqlite import sqlite_connection
 
 logger = get_logger(__name__)
 
@@ -13,10 +16,33 @@ complete_description = (
     " This Document outlines the API contracts for for Fampay Assignment"
 )
 
-# Cron job to check & update the DB with the new video entries
-logger.info("Starting the cron to add newly uploaded videos to the database.")
-asyncio.create_task(bg_video_updater.insert_newly_published_videos())
-
 app = FastAPI(title=settings.APP_NAME, description=complete_description)
 
 app.include_router(video_app, prefix="/videos-registry/v1")
+
+ingestion_stop_event = None
+ingestion_task = None
+
+
+@app.on_event("startup")
+async def startup():
+    global ingestion_stop_event, ingestion_task
+    if not settings.in_api_ingestion_enabled:
+        logger.info("In-API ingestion is disabled, expecting a separate worker.")
+        return
+    # Cron job to check & update the DB with the new video entries
+    logger.info("Starting the cron to add newly uploaded videos to the database.")
+    ingestion_stop_event = asyncio.Event()
+    ingestion_task = asyncio.create_task(
+        bg_video_updater.insert_newly_published_videos(ingestion_stop_event)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if ingestion_task:
+        ingestion_stop_event.set()
+        await ingestion_task
+    await http_client.close_client()
+    await close_async_es_conn()
+    sqlite_connection.close_pool()
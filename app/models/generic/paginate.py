@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -6,4 +8,8 @@ class Paginate(BaseModel):
 
     offset: int = 0
     count_per_page: int = 2000
-    total_count: int = 0
+    # None when the counting is off
+    total_count: Optional[int] = 0
+    # 'eq' for an exact total count, 'gte' for a lower bound
+    total_count_relation: Optional[str] = None
+    next_cursor: Optional[str] = None
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class TotalCountMode(str, Enum):
+    """How the total count of the matching videos is computed"""
+
+    # Count all the matches
+    exact = "exact"
+    # Count up to the configured cap, reported as a lower bound beyond it
+    capped = "capped"
+    # Skip counting, only the 'next_cursor' tells whether more pages exist
+    off = "off"
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.ingestion.polling_decision import PollingDecision
+
+
+class IngestionStatus(BaseModel):
+    """Wrapper for the background ingestion status"""
+
+    state: str = "idle"
+    started_at: Optional[int] = None
+    polls: int = 0
+    last_poll_started_at: Optional[int] = None
+    last_poll_completed_at: Optional[int] = None
+    last_indexed_count: int = 0
+    total_indexed_count: int = 0
+    last_error: Optional[str] = None
+    next_poll: Optional[PollingDecision] = None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class PollingDecision(BaseModel):
+    """Wrapper for the planned interval until the next ingestion poll"""
+
+    # Seconds until the next poll
+    interval: float
+    # What decided the interval: high_yield, steady, no_yield_backoff,
+    # quota_budget or quota_exhausted
+    reason: str
+    # The interval planned on the yield of the polls
+    yield_interval: float
+    # The shortest interval the remaining quota units allow
+    budget_interval: float
+    remaining_units: int
+    estimated_units_per_poll: float
+    seconds_to_quota_reset: float
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class HistogramInterval(str, Enum):
+    """The bucket interval of the publish time histogram"""
+
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ChannelCount(BaseModel):
+    """
+    Wrapper for the videos count of a channel
+    """
+
+    channel_title: str
+    count: int
+
+
+class DateCount(BaseModel):
+    """
+    Wrapper for the videos count of a publish time bucket
+    """
+
+    date: str
+    count: int
+
+
+class QueryCount(BaseModel):
+    """
+    Wrapper for the videos count matching a search query
+    """
+
+    query: str
+    count: int
+
+
+class VideosAggregations(BaseModel):
+    """
+    Response model for the videos facets
+    """
+
+    total_count: int = Field(...)
+    channels: List[ChannelCount] = Field(...)
+    published_at_histogram: List[DateCount] = Field(...)
+    query_counts: List[QueryCount] = Field(...)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -8,17 +8,21 @@ from app.models.generic.paginate import Paginate
 
 
 class VideoMeta(BaseModel):
-    """Wrapper for video meta-data"""
+    """
+    Wrapper for video meta-data.
+    Only the requested fields are present when the 'fields' param is given.
+    """
 
     video_index: str
-    kind: str
-    id: str
-    published_at: str
-    title: str
-    description: str
-    thumbnail_url: str
-    channel_title: str
-    created_at: int
+    video_id: str
+    kind: Optional[str]
+    id: Optional[str]
+    published_at: Optional[str]
+    title: Optional[str]
+    description: Optional[str]
+    thumbnail_url: Optional[str]
+    channel_title: Optional[str]
+    created_at: Optional[int]
 
 
 class VideosDetails(BaseModel):
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class VideoSuggestion(BaseModel):
+    """
+    Wrapper for a video suggested by its title
+    """
+
+    video_id: str
+    title: Optional[str]
+
+
+class VideosSuggestions(BaseModel):
+    """
+    Response model for the videos suggestions
+    """
+
+    suggestions: List[VideoSuggestion] = Field(...)
@@ -0,0 +1,117 @@
+"""
+Lean projections of the youtube API responses.
+
+Only the fields the ingestion uses are picked from the parsed JSON, into
+compact '__slots__' records, skipping the pydantic models construction.
+The full models validation is done in the strict parsing mode.
+"""
+from typing import List, Optional
+
+from app.models.youtube.youtube_search_results import YoutubePublishedVideos
+from app.models.youtube.youtube_video_details import YoutubeVideoDetails
+
+
+class SearchPage:
+    """
+    A page of the youtube search API results
+    """
+
+    __slots__ = ("etag", "next_page_token", "video_ids")
+
+    def __init__(self, etag: str, next_page_token: Optional[str], video_ids: List[str]):
+        self.etag = etag
+        self.next_page_token = next_page_token
+        self.video_ids = video_ids
+
+
+class VideoRecord:
+    """
+    The stored details of a youtube video
+    """
+
+    __slots__ = (
+        "kind",
+        "id",
+        "published_at",
+        "title",
+        "description",
+        "thumbnail_url",
+        "channel_title",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        id: str,
+        published_at: str,
+        title: str,
+        description: str,
+        thumbnail_url: str,
+        channel_title: str,
+    ):
+        self.kind = kind
+        self.id = id
+        self.published_at = published_at
+        self.title = title
+        self.description = description
+        self.thumbnail_url = thumbnail_url
+        self.channel_title = channel_title
+
+
+def parse_search_page(data: dict, strict: bool = False) -> SearchPage:
+    """
+    Method to project a search API response onto a search page
+    Args:
+        data: the parsed response
+        strict: whether to validate the response against the full model
+    Returns:
+        the search page
+    """
+    if strict:
+        page = YoutubePublishedVideos(**data)
+        return SearchPage(
+            page.etag,
+            page.nextPageToken,
+            [item.id.videoId for item in page.items if item.id.videoId],
+        )
+    video_ids = []
+    for item in data["items"]:
+        video_id = item["id"].get("videoId")
+        if video_id:
+            video_ids.append(video_id)
+    return SearchPage(data["etag"], data.get("nextPageToken"), video_ids)
+
+
+def parse_videos(data: dict, strict: bool = False) -> List[VideoRecord]:
+    """
+    Method to project a videos API response onto the video records
+    Args:
+        data: the parsed response
+        strict: whether to validate the videos against the full model
+    Returns:
+        the video records
+    """
+    records = []
+    for item in data.get("items", ()):
+        snippet = item["snippet"]
+        record = VideoRecord(
+            item["kind"],
+            item["id"],
+            snippet["publishedAt"],
+            snippet["title"],
+            snippet["description"],
+            snippet["thumbnails"]["default"]["url"],
+            snippet["channelTitle"],
+        )
+        if strict:
+            YoutubeVideoDetails(
+                kind=record.kind,
+                id=record.id,
+                publishedAt=record.published_at,
+                title=record.title,
+                description=record.description,
+                thumbnail_url=record.thumbnail_url,
+                channelTitle=record.channel_title,
+            )
+        records.append(record)
+    return records
@@ -12,6 +12,7 @@ holds all the common_utils methods which are used by the endpoints
 """
 
 RFC_339_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+RFC_339_DATE_WITH_FRACTION_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
 
 def get_epoch_millis():
@@ -34,23 +35,41 @@ def string_unquote(value: str):
     return value.replace('"', "").replace("'", "")
 
 
-def get_published_after(date_format=RFC_339_DATE_FORMAT, timezone=pytz.utc):
+def get_published_after(
+    epoch_time=None, date_format=RFC_339_DATE_FORMAT, timezone=pytz.utc
+):
     """
     Method to convert the epoch time to a given string format
     Params:
-        epoch_time
+        epoch_time: defaults to the last 30 minutes
         format
         timezone
     Return:
         formatted date string
     """
-    # Checking for newly added videos since last 30 minutes
-    epoch_time = round(time.time() - 1800)
+    if epoch_time is None:
+        # Checking for newly added videos since last 30 minutes
+        epoch_time = round(time.time() - 1800)
     if not epoch_time:
         return None
     return datetime.fromtimestamp(epoch_time, timezone).strftime(date_format)
 
 
+def rfc_3339_to_epoch(value: str):
+    """
+    Method to convert a RFC 3339 (UTC) date string to the epoch time
+    Params:
+        value: i.e., 2021-06-27T10:15:30Z or 2021-06-27T10:15:30.123Z
+    Return:
+        epoch time in seconds
+    """
+    try:
+        date = datetime.strptime(value, RFC_339_DATE_FORMAT)
+    except ValueError:
+        date = datetime.strptime(value, RFC_339_DATE_WITH_FRACTION_FORMAT)
+    return int(date.replace(tzinfo=pytz.utc).timestamp())
+
+
 def multiple_args_to_single_dict(**kwargs):
     """
     This method stores all the arguments into a dict
@@ -32,3 +32,31 @@ def read_file(filepath) -> list:
         raise VideoRegistryException(
             status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error."
         )
+
+
+def get_bool_env(name, default=False) -> bool:
+    """
+    Reads a boolean flag from the environment
+    :param name: the environment variable name
+    :param default: the value to use when the variable is not set
+    :returns: the flag value
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_list_env(name, default=None) -> list:
+    """
+    Reads a comma separated list from the environment
+    :param name: the environment variable name
+    :param default: the value to use when the variable is not set
+    :returns: the non-empty, de-duplicated list items in their given order
+    """
+    value = os.getenv(name)
+    if value is None:
+        return list(default or [])
+    return list(
+        dict.fromkeys(item.strip() for item in value.split(",") if item.strip())
+    )
@@ -0,0 +1,66 @@
+"""Util for encoding/decoding the opaque pagination cursors"""
+import base64
+import binascii
+import json
+
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.utils import shared_constants
+
+INVALID_CURSOR_MESSAGE = "Invalid pagination cursor"
+
+
+def encode_cursor(search_after: list, pit_id: str = None) -> str:
+    """
+    Encodes the position of the last entry of a page into an opaque cursor
+    :param search_after: the sort values of the last entry
+    :param pit_id: the point in time the page was read from, if any
+    :returns: the cursor string
+    """
+    position = {shared_constants.SEARCH_AFTER_KEY: search_after}
+    if pit_id:
+        position[shared_constants.PIT_ID_KEY] = pit_id
+    encoded = base64.urlsafe_b64encode(json.dumps(position).encode())
+    return encoded.decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodes an opaque cursor. Only the position is taken from it, the cursor
+    is given by the client & can't override the other search params.
+    :param cursor: the cursor string
+    :returns: dict with the 'search_after' values & the optional 'pit_id'
+    :raises VideoRegistryException: 400 if the cursor is malformed
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise VideoRegistryException(400, INVALID_CURSOR_MESSAGE)
+    if not isinstance(position, dict):
+        raise VideoRegistryException(400, INVALID_CURSOR_MESSAGE)
+
+    search_after = position.get(shared_constants.SEARCH_AFTER_KEY)
+    pit_id = position.get(shared_constants.PIT_ID_KEY)
+    if not _is_valid_search_after(search_after) or not (
+        pit_id is None or isinstance(pit_id, str)
+    ):
+        raise VideoRegistryException(400, INVALID_CURSOR_MESSAGE)
+    decoded = {shared_constants.SEARCH_AFTER_KEY: search_after}
+    if pit_id:
+        decoded[shared_constants.PIT_ID_KEY] = pit_id
+    return decoded
+
+
+def _is_valid_search_after(search_after) -> bool:
+    """
+    Returns True if the search_after values are the publish time (epoch
+    millis) & the id of a video, the sort values of the listings
+    """
+    if not isinstance(search_after, list) or len(search_after) != 2:
+        return False
+    published_at_ms, video_id = search_after
+    return (
+        isinstance(published_at_ms, (int, float))
+        and not isinstance(published_at_ms, bool)
+        and isinstance(video_id, str)
+    )
@@ -0,0 +1,40 @@
+"""Util for serializing the API responses & parsing the external API ones"""
+import json
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+from app.core.config import settings
+
+
+class RawJSONResponse(Response):
+    """
+    JSON response for an already serialized body
+    """
+
+    media_type = "application/json"
+
+
+def dumps(content) -> bytes:
+    """
+    Serializes the response content to JSON.
+    With the fast JSON serialization enabled, the content is expected to hold
+    JSON native types only (i.e., data read from the DB) & is encoded with
+    orjson, skipping the jsonable_encoder conversion.
+    :param content: the response content
+    :returns: the serialized body
+    """
+    if settings.fast_json_enabled:
+        return orjson.dumps(content)
+    return json.dumps(jsonable_encoder(content)).encode()
+
+
+def loads(body: bytes):
+    """
+    Parses a JSON body with orjson, notably faster than the json module
+    on the large external API responses
+    :param body: the raw response body
+    :returns: the parsed content
+    """
+    return orjson.loads(body)
@@ -1,16 +1,48 @@
 CREATED_AT_KEY = "created_at"
+KIND_KEY = "kind"
+ID_KEY = "id"
 TITLE_KEY = "title"
 DESCRIPTION_KEY = "description"
 PUBLISHED_AT = "published_at"
+THUMBNAIL_URL_KEY = "thumbnail_url"
+CHANNEL_TITLE_KEY = "channel_title"
+# Index-only field of the title prefixes, not part of the stored videos
+TITLE_SUGGEST_KEY = "title_suggest"
+# Title suffixes indexed for the suggestions, the title itself included
+TITLE_SUGGEST_MAX_INPUTS = 8
+PREFIX_KEY = "prefix"
 
 LIMIT_KEY = "limit"
 OFFSET_KEY = "offset"
+SEARCH_AFTER_KEY = "search_after"
+PIT_ID_KEY = "pit_id"
+POINT_IN_TIME_KEY = "point_in_time"
+FIELDS_KEY = "fields"
+TRACK_TOTAL_HITS_KEY = "track_total_hits"
+
+# Aggregations
+CHANNELS_SIZE_KEY = "channels_size"
+INTERVAL_KEY = "interval"
+QUERIES_KEY = "queries"
 
 # Data query limiters
 DEFAULT_OFFSET = 0
 DEFAULT_PER_PAGE_LIMIT = 20
+DEFAULT_SUGGEST_LIMIT = 10
 
 INDEX_KEY = "video_index"
 VIDEO_ID_KEY = "video_id"
 
+# The stored fields of a video, which can be projected
+VIDEO_FIELDS = {
+    KIND_KEY,
+    ID_KEY,
+    PUBLISHED_AT,
+    TITLE_KEY,
+    DESCRIPTION_KEY,
+    THUMBNAIL_URL_KEY,
+    CHANNEL_TITLE_KEY,
+    CREATED_AT_KEY,
+}
+
 VIDEOS_SEARCH_QUERY_KEY = "video_search_query"
@@ -0,0 +1,78 @@
+"""Latency summaries & the per commit results files of the benchmarks"""
+import json
+import os
+import statistics
+import subprocess
+
+
+def summarize(latencies, error_count=0, elapsed=None):
+    """
+    Returns the throughput & the latency percentiles (ms) of the requests
+    """
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    summary = {"requests": len(latencies), "errors": error_count}
+    if elapsed:
+        summary["rps"] = round(len(latencies) / elapsed, 1)
+    summary.update(
+        p50_ms=round(quantiles[49], 2) if quantiles else None,
+        p95_ms=round(quantiles[94], 2) if quantiles else None,
+        p99_ms=round(quantiles[98], 2) if quantiles else None,
+    )
+    return summary
+
+
+def report(results, previous):
+    """
+    Prints the results, with the change since the previous run if any
+    """
+    for kind, result in results.items():
+        line = f"{kind:<14} " + " ".join(f"{k}={v}" for k, v in result.items())
+        before = previous and previous["results"].get(kind)
+        if before:
+            changes = []
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                if before.get(key) and result.get(key) is not None:
+                    change = (result[key] - before[key]) / before[key] * 100
+                    changes.append(f"{key}={change:+.1f}%")
+            line += f"  vs {previous['commit']}: " + " ".join(changes)
+        print(line)
+
+
+def get_commit():
+    """
+    Returns the current git commit, suffixed with '-dirty' on local changes
+    """
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+        changes = subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"], text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if changes.strip() else commit
+
+
+def load_previous_run(results_file, config, commit):
+    """
+    Returns the last stored run of the same configuration on another commit
+    """
+    if not os.path.exists(results_file):
+        return None
+    previous = None
+    with open(results_file) as file:
+        for line in file:
+            run = json.loads(line)
+            if run["config"] == config and run["commit"] != commit:
+                previous = run
+    return previous
+
+
+def store_run(results_file, run):
+    """
+    Appends a run to the results file
+    """
+    os.makedirs(os.path.dirname(results_file) or ".", exist_ok=True)
+    with open(results_file, "a") as file:
+        file.write(json.dumps(run) + "\n")
@@ -0,0 +1,352 @@
+"""
+Local stand-in for the youtube data API search & videos endpoints.
+
+Serves deterministic synthetic videos for any search query, newest first,
+paged with page tokens & carrying ETags (an unchanged page is answered with
+a 304 to 'If-None-Match'). The latency, the 5xx/429 error rates & the daily
+quota units of each API key are configurable. Some of the videos are found
+by every query, like the videos matching several topics.
+
+The ingestion benchmark runs it in-process. It can also be run on its own,
+with the service pointed at it by YOUTUBE_BASE_URL=http://127.0.0.1:8081
+
+Run with: python -m benchmarks.fake_youtube_api --port 8081
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import random
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytz
+import uvicorn
+from fastapi import FastAPI, Request
+from starlette.responses import JSONResponse, Response
+
+from app.api.client.apis_helper import ApiQuotaCosts, Apis
+from app.utils.common_utils import rfc_3339_to_epoch
+
+RFC_3339_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# The synthetic videos of a query are published within the last 25 minutes,
+# inside the 30 minutes the ingestion looks back on its first poll
+PUBLISH_WINDOW_SECONDS = 1500
+
+MAX_RESULTS_LIMIT = 50
+
+
+class FakeYoutubeApi:
+    """
+    The synthetic data, the injected failures & the call statistics
+    """
+
+    def __init__(
+        self,
+        videos_per_topic: int = 500,
+        shared_ratio: float = 0.2,
+        latency: float = 0.02,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        quota_per_key: int = None,
+        seed: int = 0,
+    ):
+        self.videos_per_topic = videos_per_topic
+        self.shared_ratio = shared_ratio
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.quota_per_key = quota_per_key
+        self.started_at = int(time.time())
+        self.stats = {
+            "search_calls": 0,
+            "videos_calls": 0,
+            "not_modified": 0,
+            "server_errors": 0,
+            "rate_limited": 0,
+            "quota_exceeded": 0,
+            "quota_units": 0,
+        }
+        self.units_by_key = {}
+        self._random = random.Random(seed)
+        self._spacing = PUBLISH_WINDOW_SECONDS / max(videos_per_topic, 1)
+        # The position of each video served by a search, for its details
+        self._positions = {}
+
+    def get_unique_video_count(self, topic_count: int) -> int:
+        """
+        Method to get the count of distinct videos found by the given count
+        of topics
+        """
+        shared_count = sum(self._is_shared(i) for i in range(self.videos_per_topic))
+        return shared_count + topic_count * (self.videos_per_topic - shared_count)
+
+    async def handle(self, request: Request, handler, cost: int) -> Response:
+        """
+        Method to serve a call, after the latency & the injected failures
+        """
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        api_key = request.query_params.get("key")
+        if not api_key:
+            return _error_response(400, "keyInvalid", "API key not valid.")
+        used_units = self.units_by_key.get(api_key, 0)
+        if self.quota_per_key is not None and used_units + cost > self.quota_per_key:
+            self.stats["quota_exceeded"] += 1
+            return _error_response(403, "quotaExceeded", "Quota exceeded.")
+        self.units_by_key[api_key] = used_units + cost
+        self.stats["quota_units"] += cost
+
+        failure = self._random.random()
+        if failure < self.error_rate:
+            self.stats["server_errors"] += 1
+            return _error_response(503, "backendError", "Backend error.")
+        if failure < self.error_rate + self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return _error_response(429, "rateLimitExceeded", "Rate limit exceeded.")
+
+        body = handler(request.query_params)
+        etag = f'"{body["etag"]}"'
+        if request.headers.get("if-none-match") == etag:
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(body, headers={"ETag": etag})
+
+    def search(self, params) -> dict:
+        """
+        Method to build a search results page
+        """
+        self.stats["search_calls"] += 1
+        query = params.get("q", "")
+        published_after = params.get("publishedAfter")
+        max_results = min(int(params.get("maxResults", 5)), MAX_RESULTS_LIMIT)
+        offset = _decode_page_token(params.get("pageToken"))
+
+        newer_count = self.videos_per_topic
+        if published_after:
+            published_after = rfc_3339_to_epoch(published_after)
+            newer_count = sum(
+                self._get_published_at(i) > published_after
+                for i in range(self.videos_per_topic)
+            )
+        positions = range(offset, min(offset + max_results, newer_count))
+        video_ids = [self._get_video_id(query, i) for i in positions]
+        for i, video_id in zip(positions, video_ids):
+            self._positions[video_id] = i
+
+        next_offset = offset + len(video_ids)
+        page = {
+            "kind": "youtube#searchListResponse",
+            "etag": _get_etag(query, offset, *video_ids),
+            "regionCode": "IN",
+            "pageInfo": {"totalResults": newer_count, "resultsPerPage": max_results},
+            "items": [
+                {
+                    "kind": "youtube#searchResult",
+                    "etag": _get_etag("result", video_id),
+                    "id": {"kind": "youtube#video", "videoId": video_id},
+                }
+                for video_id in video_ids
+            ],
+        }
+        if next_offset < newer_count:
+            page["nextPageToken"] = _encode_page_token(next_offset)
+        return page
+
+    def videos(self, params) -> dict:
+        """
+        Method to build the details of the given videos, the unknown ones
+        are left out
+        """
+        self.stats["videos_calls"] += 1
+        video_ids = [v for v in params.get("id", "").split(",") if v]
+        items = [
+            self._get_video_details(video_id, self._positions[video_id])
+            for video_id in video_ids
+            if video_id in self._positions
+        ]
+        return {
+            "kind": "youtube#videoListResponse",
+            "etag": _get_etag("videos", *video_ids),
+            "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)},
+            "items": items,
+        }
+
+    def _is_shared(self, i: int) -> bool:
+        """
+        Method to check if the i-th video of the queries is found by all of them
+        """
+        return int((i + 1) * self.shared_ratio) > int(i * self.shared_ratio)
+
+    def _get_published_at(self, i: int) -> int:
+        """
+        Method to get the publish time (epoch seconds) of the i-th newest video
+        """
+        return int(self.started_at - (i + 1) * self._spacing)
+
+    def _get_video_id(self, query: str, i: int) -> str:
+        """
+        Method to get the id of the i-th newest video of a query
+        """
+        if self._is_shared(i):
+            return f"shared{i:05d}"
+        return f"{hashlib.sha1(query.encode()).hexdigest()[:5]}{i:06d}"
+
+    def _get_video_details(self, video_id: str, i: int) -> dict:
+        """
+        Method to build the details of the i-th newest video
+        """
+        published_at = datetime.fromtimestamp(
+            self._get_published_at(i), pytz.utc
+        ).strftime(RFC_3339_DATE_FORMAT)
+        return {
+            "kind": "youtube#video",
+            "etag": _get_etag("video", video_id),
+            "id": video_id,
+            "snippet": {
+                "publishedAt": published_at,
+                "channelId": f"channel{i % 50}",
+                "title": f"Synthetic video {video_id} match highlights",
+                "description": "Match highlights & analysis. " * 10,
+                "thumbnails": {
+                    "default": {
+                        "url": f"https://i.ytimg.com/vi/{video_id}/default.jpg",
+                        "width": 120,
+                        "height": 90,
+                    }
+                },
+                "channelTitle": f"Channel {i % 50}",
+            },
+        }
+
+
+class FakeYoutubeApiServer:
+    """
+    Runs the stand-in API over HTTP in a background thread
+    """
+
+    def __init__(self, api: FakeYoutubeApi, host: str = "127.0.0.1", port: int = 0):
+        self.api = api
+        self.host = host
+        self.port = port or _get_free_port(host)
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """
+        Method to start serving, returning once the server accepts calls
+        """
+        config = uvicorn.Config(
+            create_app(self.api),
+            host=self.host,
+            port=self.port,
+            log_level="warning",
+            access_log=False,
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        """
+        Method to stop serving
+        """
+        self._server.should_exit = True
+        self._thread.join()
+
+
+def create_app(api: FakeYoutubeApi) -> FastAPI:
+    """
+    Method to create the ASGI app of the stand-in API
+    """
+    app = FastAPI(title="Fake youtube data API")
+
+    @app.get(Apis.search_api)
+    async def search(request: Request):
+        return await api.handle(request, api.search, ApiQuotaCosts.search_api)
+
+    @app.get(Apis.video_details)
+    async def videos(request: Request):
+        return await api.handle(request, api.videos, ApiQuotaCosts.video_details)
+
+    return app
+
+
+def _error_response(status_code, reason, message):
+    """
+    Method to build a google API error response
+    """
+    return JSONResponse(
+        {
+            "error": {
+                "code": status_code,
+                "message": message,
+                "errors": [{"message": message, "domain": "youtube", "reason": reason}],
+            }
+        },
+        status_code=status_code,
+    )
+
+
+def _get_etag(*parts):
+    """
+    Method to derive a stable ETag from the content of a response
+    """
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:27]
+
+
+def _encode_page_token(offset):
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def _decode_page_token(page_token):
+    if not page_token:
+        return 0
+    return int(base64.urlsafe_b64decode(page_token.encode()).decode().split(":")[1])
+
+
+def _get_free_port(host):
+    """
+    Method to get a port which is free on the host
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--videos-per-topic", type=int, default=500)
+    parser.add_argument("--shared-ratio", type=float, default=0.2)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--quota-per-key", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    api = FakeYoutubeApi(
+        videos_per_topic=args.videos_per_topic,
+        shared_ratio=args.shared_ratio,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        quota_per_key=args.quota_per_key,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(api), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+In-memory stand-in for the DAL, for the write path benchmarks.
+
+Keeps the written documents by id, like the index, so that the benchmarks
+measure the ingestion itself rather than the storage backend. Only the
+operations of the ingestion are provided: the bulk writes & the listing
+of the indexed ids warming the seen videos filter.
+"""
+from app.utils.shared_constants import ID_KEY
+
+
+class InMemoryDAL:
+    """
+    Write-only DAL keeping the documents in a dict
+    """
+
+    def __init__(self):
+        self.documents = {}
+
+    def add_records_bulk(self, data: list, execution_context: dict):
+        for doc in data:
+            self.documents[doc[ID_KEY]] = doc
+        return len(data), []
+
+    def get_all_record_ids(self, execution_context: dict):
+        return list(self.documents)
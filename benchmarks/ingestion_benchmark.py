@@ -0,0 +1,231 @@
+"""
+Benchmark of the background ingestion against a local youtube API stand-in.
+
+Drives bg_video_updater over synthetic topics served by the fake youtube
+API, polling until all of their videos are indexed (the backfill), then
+polls once more with nothing new (the steady state). Reports the videos
+indexed per second, the API calls & quota units per video and the bulk
+writes per video, into an in-memory DAL, the local elasticsearch or a
+sqlite database in a temporary directory.
+
+Run with: poetry run bench-ingestion [--backend es|sqlite]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import structlog
+
+from app.api.client import http_client
+from app.api.client.api_key_pool import api_key_pool
+from app.core.cron import bg_video_updater
+from app.core.cron.ingestion_checkpoint import IngestionCheckpoint
+from app.data_access_layer.sqlite import sqlite_connection
+from app.data_access_layer.sqlite.sqlite_dal import SqliteDAL
+from benchmarks.fake_youtube_api import FakeYoutubeApi, FakeYoutubeApiServer
+from benchmarks.in_memory_dal import InMemoryDAL
+
+BACKEND_MEMORY = "memory"
+BACKEND_ES = "es"
+BACKEND_SQLITE = "sqlite"
+
+
+class WriteCounter:
+    """
+    Counts the bulk writes made through a DAL
+    """
+
+    def __init__(self, dal):
+        self.bulk_calls = 0
+        self.documents = 0
+        self._add_records_bulk = dal.add_records_bulk
+        dal.add_records_bulk = self._count_add_records_bulk
+
+    def _count_add_records_bulk(self, data: list, execution_context: dict):
+        self.bulk_calls += 1
+        self.documents += len(data)
+        return self._add_records_bulk(data, execution_context)
+
+
+def get_dal(backend):
+    """
+    Returns the DAL the videos are written with
+    """
+    if backend == BACKEND_ES:
+        # Imported on use, the elasticsearch modules create its client
+        from app.data_access_layer.elasticsearch.elasticsearch_dal import (
+            ElasticsearchDAL,
+        )
+
+        return ElasticsearchDAL()
+    if backend == BACKEND_SQLITE:
+        return SqliteDAL()
+    return InMemoryDAL()
+
+
+async def run_polls(checkpoint, topics, dal, expected_count, max_polls):
+    """
+    Polls until the expected count of videos is indexed
+    Returns:
+        the count of polls & of indexed videos
+    """
+    polls, indexed_count = 0, 0
+    while polls < max_polls:
+        indexed_count += await bg_video_updater.insert_new_videos(
+            checkpoint, topics, dal=dal
+        )
+        polls += 1
+        if indexed_count >= expected_count:
+            break
+    return polls, indexed_count
+
+
+def snapshot(api, writes):
+    """
+    Returns the API & the write counters at this point
+    """
+    return {
+        **api.stats,
+        # The served calls along with the rejected ones
+        "api_calls": sum(
+            api.stats[key]
+            for key in (
+                "search_calls",
+                "videos_calls",
+                "server_errors",
+                "rate_limited",
+                "quota_exceeded",
+            )
+        ),
+        "bulk_calls": writes.bulk_calls,
+        "documents": writes.documents,
+    }
+
+
+def report(name, before, after, indexed_count, polls, elapsed):
+    """
+    Prints the counters of a phase, per indexed video if any were indexed
+    """
+    delta = {key: after[key] - before[key] for key in after}
+    line = (
+        f"{name:<9} videos={indexed_count} polls={polls} seconds={elapsed:.2f} "
+        f"api_calls={delta['api_calls']} quota_units={delta['quota_units']} "
+        f"bulk_writes={delta['bulk_calls']} not_modified={delta['not_modified']} "
+        f"server_errors={delta['server_errors']} "
+        f"rate_limited={delta['rate_limited']} "
+        f"quota_exceeded={delta['quota_exceeded']}"
+    )
+    if indexed_count:
+        line += (
+            f" videos_per_sec={indexed_count / elapsed:.0f}"
+            f" api_calls_per_video={delta['api_calls'] / indexed_count:.3f}"
+            f" quota_units_per_video={delta['quota_units'] / indexed_count:.2f}"
+            f" bulk_writes_per_video={delta['bulk_calls'] / indexed_count:.4f}"
+            f" docs_written_per_video={delta['documents'] / indexed_count:.3f}"
+        )
+    print(line)
+
+
+async def run(args, api, dal, work_dir):
+    topics = [f"topic {i}" for i in range(args.topics)]
+    expected_count = api.get_unique_video_count(args.topics)
+    checkpoint = IngestionCheckpoint(os.path.join(work_dir, "ingestion_state.json"))
+    writes = WriteCounter(dal)
+    try:
+        before = snapshot(api, writes)
+        start = time.perf_counter()
+        polls, indexed_count = await run_polls(
+            checkpoint, topics, dal, expected_count, args.max_polls
+        )
+        report(
+            "backfill",
+            before,
+            snapshot(api, writes),
+            indexed_count,
+            polls,
+            time.perf_counter() - start,
+        )
+        if indexed_count < expected_count:
+            print(f"backfill incomplete, expected {expected_count} videos")
+
+        # Nothing new is published: the first poll re-checks the overlap
+        # before the advanced watermarks, the next ones are answered with 304s
+        for poll in range(1, args.steady_polls + 1):
+            before = snapshot(api, writes)
+            start = time.perf_counter()
+            polls, indexed_count = await run_polls(checkpoint, topics, dal, 1, 1)
+            report(
+                f"steady#{poll}",
+                before,
+                snapshot(api, writes),
+                indexed_count,
+                polls,
+                time.perf_counter() - start,
+            )
+    finally:
+        await http_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--backend",
+        choices=[BACKEND_MEMORY, BACKEND_ES, BACKEND_SQLITE],
+        default=BACKEND_MEMORY,
+    )
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--videos-per-topic", type=int, default=500)
+    parser.add_argument("--shared-ratio", type=float, default=0.2)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--quota-per-key", type=int, default=None)
+    parser.add_argument("--keys", type=int, default=3)
+    parser.add_argument("--max-polls", type=int, default=10)
+    parser.add_argument("--steady-polls", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="error")
+    args = parser.parse_args()
+
+    log_level = getattr(logging, args.log_level.upper())
+    logging.getLogger().setLevel(log_level)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(log_level))
+    api = FakeYoutubeApi(
+        videos_per_topic=args.videos_per_topic,
+        shared_ratio=args.shared_ratio,
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        quota_per_key=args.quota_per_key,
+        seed=args.seed,
+    )
+    server = FakeYoutubeApiServer(api)
+    server.start()
+    os.environ["YOUTUBE_BASE_URL"] = server.base_url
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            keys_file_path = os.path.join(work_dir, "keys.txt")
+            with open(keys_file_path, "w") as keys_file:
+                keys_file.write("\n".join(f"key{i}" for i in range(args.keys)))
+            api_key_pool.keys_file_path = keys_file_path
+            os.environ["SQLITE_DB_PATH"] = os.path.join(work_dir, "videos.db")
+
+            print(
+                f"backend={args.backend} topics={args.topics} "
+                f"videos_per_topic={args.videos_per_topic} "
+                f"shared_ratio={args.shared_ratio} latency_ms={args.latency_ms} "
+                f"error_rate={args.error_rate} rate_limit_rate={args.rate_limit_rate}"
+            )
+            try:
+                asyncio.run(run(args, api, get_dal(args.backend), work_dir))
+            finally:
+                sqlite_connection.close_pool()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Load benchmark of the /collections & /collections/search read path.
+
+Seeds synthetic videos through the DAL of the storage backend, then drives the API with
+concurrent clients over a weighted mix of first pages, deep offsets,
+large pages & searches. Reports the throughput & the p50/p95/p99 latency
+per request kind, and appends the results along with the git commit to a
+results file, comparing them with the last run of the same configuration
+on another commit.
+
+The app is served in-process (over its ASGI interface, the clients & the
+app share the event loop) unless --base-url points at a running service.
+The response cache is disabled unless --cache is given, so that the
+backend itself is measured.
+
+Run with: poetry run bench-read-path [--videos 20000 --concurrency 32]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from datetime import datetime
+
+import httpx
+import pytz
+import structlog
+
+from app.data_access_layer import dal_factory
+from app.main import app
+from benchmarks.bench_results import (
+    get_commit,
+    load_previous_run,
+    report,
+    store_run,
+    summarize,
+)
+from benchmarks.synthetic_videos import WORDS, seed_videos
+
+API_PREFIX = "/videos-registry/v1"
+COLLECTIONS_PATH = f"{API_PREFIX}/collections"
+SEARCH_PATH = f"{API_PREFIX}/collections/search"
+
+DEFAULT_RESULTS_FILE = "benchmarks/results/read_path_benchmark.jsonl"
+
+# Request kinds & their default weight in the mix
+REQUEST_MIX = {
+    "list": 0.4,
+    "deep_offset": 0.2,
+    "large_page": 0.1,
+    "search": 0.3,
+}
+
+
+def get_request(kind: str, rand: random.Random, args):
+    """
+    Returns the path & the params of a request of the given kind
+    """
+    if kind == "list":
+        return COLLECTIONS_PATH, {
+            "limit": args.limit,
+            "offset": rand.randrange(0, 500),
+        }
+    if kind == "deep_offset":
+        max_offset = max(min(args.videos, 10000) - args.limit, 1)
+        return COLLECTIONS_PATH, {
+            "limit": args.limit,
+            "offset": rand.randrange(max_offset // 2, max_offset),
+        }
+    if kind == "large_page":
+        return COLLECTIONS_PATH, {"limit": args.large_limit, "offset": 0}
+    return SEARCH_PATH, {
+        "limit": args.limit,
+        "offset": rand.randrange(0, 200),
+        "query": rand.choice(WORDS),
+    }
+
+
+async def run_client(client, mix, latencies, errors, deadline, args, seed):
+    """
+    A client issuing requests one after another until the deadline
+    """
+    rand = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        kind = rand.choices(kinds, weights)[0]
+        path, params = get_request(kind, rand, args)
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path, params=params)
+            is_error = resp.status_code != 200
+        except httpx.HTTPError:
+            is_error = True
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+        if is_error:
+            errors[kind] += 1
+
+
+async def run_load(args, mix):
+    """
+    Runs the concurrent clients
+    Returns:
+        the results per request kind & in total
+    """
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        )
+    latencies = {kind: [] for kind in mix}
+    errors = {kind: 0 for kind in mix}
+    async with client:
+        # Warming up the connections & the code paths
+        await run_client(
+            client,
+            mix,
+            {kind: [] for kind in mix},
+            {kind: 0 for kind in mix},
+            time.perf_counter() + 1,
+            args,
+            seed=-1,
+        )
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                run_client(client, mix, latencies, errors, deadline, args, seed=i)
+                for i in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    results = {
+        kind: summarize(latencies[kind], errors[kind], elapsed)
+        for kind in mix
+        if latencies[kind]
+    }
+    results["total"] = summarize(
+        [latency for kind in mix for latency in latencies[kind]],
+        sum(errors.values()),
+        elapsed,
+    )
+    return results
+
+
+def parse_mix(value):
+    """
+    Parses the request mix, i.e., 'list=0.5,search=0.5'
+    """
+    mix = {}
+    for part in value.split(","):
+        kind, weight = part.split("=")
+        if kind not in REQUEST_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request kind: {kind}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--backend",
+        choices=[
+            dal_factory.STORAGE_BACKEND_ELASTICSEARCH,
+            dal_factory.STORAGE_BACKEND_SQLITE,
+        ],
+        default=dal_factory.STORAGE_BACKEND_ELASTICSEARCH,
+    )
+    parser.add_argument("--videos", type=int, default=10000)
+    parser.add_argument("--seed-batch-size", type=int, default=1000)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--large-limit", type=int, default=1000)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=REQUEST_MIX,
+        help="Weighted request kinds, i.e., list=0.4,deep_offset=0.2,"
+        "large_page=0.1,search=0.3",
+    )
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-file", default=DEFAULT_RESULTS_FILE)
+    parser.add_argument("--no-store", action="store_true")
+    parser.add_argument("--log-level", default="error")
+    args = parser.parse_args()
+
+    log_level = getattr(logging, args.log_level.upper())
+    logging.getLogger().setLevel(log_level)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(log_level))
+
+    os.environ["RESPONSE_CACHE_ENABLED"] = str(args.cache).lower()
+    os.environ["IN_API_INGESTION_ENABLED"] = "false"
+    os.environ["STORAGE_BACKEND"] = args.backend
+    if not args.skip_seed:
+        rate = seed_videos(
+            dal_factory.get_dal(), args.videos, args.seed_batch_size, args.seed
+        )
+        print(f"seeded videos={args.videos} videos_per_sec={rate:.0f}")
+
+    config = {
+        "backend": args.backend,
+        "videos": args.videos,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "limit": args.limit,
+        "large_limit": args.large_limit,
+        "mix": args.mix,
+        "cache": args.cache,
+        "in_process": args.base_url is None,
+    }
+    results = asyncio.run(run_load(args, args.mix))
+    commit = get_commit()
+    previous = load_previous_run(args.results_file, config, commit)
+    print(f"commit={commit} " + " ".join(f"{k}={v}" for k, v in config.items()))
+    report(results, previous)
+    if not args.no_store:
+        store_run(
+            args.results_file,
+            {
+                "commit": commit,
+                "timestamp": datetime.now(pytz.utc).isoformat(),
+                "config": config,
+                "results": results,
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
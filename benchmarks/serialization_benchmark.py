@@ -0,0 +1,137 @@
+"""
+Benchmark of the collection/search response serialization for large pages.
+
+Compares the legacy path (elasticsearch_dsl hits -> to_dict() copies ->
+VideosDetails validation -> jsonable_encoder -> json) with the raw hits
+path (_build_response over the raw '_source' -> json_utils.dumps), with
+and without the fast JSON serialization enabled.
+
+Run with: poetry run bench-serialization
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.video_management import video_manager
+from app.models.generic.paginate import Paginate
+from app.models.video_registry.video_details import VideosDetails
+from app.utils import json_utils, shared_constants
+
+
+def build_raw_response(page_size: int) -> dict:
+    """
+    Returns a synthetic ES search response with page_size hits
+    """
+    hits = []
+    for i in range(page_size):
+        video_id = f"video{i:07d}"
+        hits.append(
+            {
+                "_index": "youtube_videos_2021_6",
+                "_id": video_id,
+                "_score": None,
+                "_source": {
+                    "kind": "youtube#video",
+                    "id": video_id,
+                    "published_at": "2021-06-27T10:15:30Z",
+                    "title": f"Football highlights {i}",
+                    "description": "Match highlights & analysis. " * 40,
+                    "thumbnail_url": f"https://i.ytimg.com/vi/{video_id}/default.jpg",
+                    "channel_title": f"Channel {i % 100}",
+                    "created_at": 1624788930000,
+                },
+                "sort": [1624788930000, video_id],
+            }
+        )
+    return {"hits": {"total": {"value": 100000, "relation": "eq"}, "hits": hits}}
+
+
+def legacy_serialize(raw_response: dict, page_size: int) -> bytes:
+    """
+    The serialization path used before the raw hits response path
+    """
+    videos = []
+    for video_details in Response(Search(), raw_response):
+        entry = {
+            shared_constants.INDEX_KEY: video_details.meta.index,
+            shared_constants.VIDEO_ID_KEY: video_details.meta.id,
+        }
+        for field, value in video_details.to_dict().items():
+            entry[field] = value
+        videos.append(entry)
+    pagination = Paginate(offset=0, count_per_page=len(videos), total_count=100000)
+    content = {"details": videos, "pagination": pagination.dict()}
+    # FastAPI validated the content against the response_model before encoding it
+    validated = VideosDetails(**content)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def raw_hits_serialize(raw_response: dict, page_size: int) -> bytes:
+    """
+    The current serialization path
+    """
+    content = video_manager._build_response(
+        result=raw_response, count=100000, offset=0, limit=page_size
+    )
+    return json_utils.dumps(content)
+
+
+def measure(func, raw_response, page_size, iterations):
+    """
+    Returns the latency percentiles (ms) & the peak allocation (KiB) of func
+    """
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(raw_response, page_size)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    func(raw_response, page_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50_ms": round(quantiles[49], 2),
+        "p99_ms": round(quantiles[98], 2),
+        "peak_alloc_kib": round(peak / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    raw_response = build_raw_response(args.page_size)
+    results = {
+        "legacy": measure(
+            legacy_serialize, raw_response, args.page_size, args.iterations
+        )
+    }
+
+    os.environ["FAST_JSON_ENABLED"] = "false"
+    results["raw_hits"] = measure(
+        raw_hits_serialize, raw_response, args.page_size, args.iterations
+    )
+    os.environ["FAST_JSON_ENABLED"] = "true"
+    results["raw_hits_fast_json"] = measure(
+        raw_hits_serialize, raw_response, args.page_size, args.iterations
+    )
+
+    print(f"page_size={args.page_size} iterations={args.iterations}")
+    for name, result in results.items():
+        print(f"{name:<20} " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
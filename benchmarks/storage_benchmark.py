@@ -0,0 +1,328 @@
+"""
+Benchmark of the storage backends at growing collection sizes.
+
+Seeds synthetic videos through the DAL of the storage backend up to each of
+the given sizes, then measures the DAL operations the API is served with:
+first pages, deep offsets, keyset pages deep in the collection, searches
+of a common & of a rare word, exact counts, title suggestions & facets.
+Reports the seeding throughput, the latency percentiles per operation and
+the memory & disk footprint, appending the results along with the git
+commit to a results file, comparing them with the last run of the same
+configuration on another commit.
+
+The sqlite database is created in a temporary directory unless --db-path
+is given, elasticsearch is the configured one.
+
+Run with: poetry run bench-storage [--backend sqlite --sizes 100000,1000000]
+"""
+import argparse
+import logging
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytz
+import structlog
+
+from app.core.config import settings
+from app.data_access_layer import dal_factory, get_es_conn
+from app.data_access_layer.elasticsearch import elasticsearch_constants
+from app.data_access_layer.sqlite import sqlite_connection
+from app.utils import shared_constants
+from benchmarks.bench_results import (
+    get_commit,
+    load_previous_run,
+    report,
+    store_run,
+    summarize,
+)
+from benchmarks.synthetic_videos import TAG_COUNT, WORDS, seed_videos
+
+DEFAULT_RESULTS_FILE = "benchmarks/results/storage_benchmark.jsonl"
+
+# The deepest offset the API serves, a page before the ES max result window
+DEEP_OFFSET = 9950
+
+# Page size of the keyset walk collecting the cursors of the deep keyset pages
+KEYSET_WALK_LIMIT = 1000
+
+
+def get_operations(args, cursors):
+    """
+    Returns the measured DAL operations, each taking the DAL & a random generator
+    """
+    limit = args.limit
+
+    def first_page(dal, rand):
+        return dal.get_all_records({"limit": limit, "offset": 0}, {})
+
+    def deep_offset(dal, rand):
+        return dal.get_all_records(
+            {"limit": limit, "offset": rand.randrange(DEEP_OFFSET - 1000, DEEP_OFFSET)},
+            {},
+        )
+
+    def keyset_deep(dal, rand):
+        return dal.get_all_records(
+            {
+                "limit": limit,
+                shared_constants.SEARCH_AFTER_KEY: rand.choice(cursors),
+            },
+            {},
+        )
+
+    def search_common(dal, rand):
+        return dal.search_all_records(
+            {
+                "limit": limit,
+                "offset": 0,
+                shared_constants.VIDEOS_SEARCH_QUERY_KEY: rand.choice(WORDS),
+            },
+            {},
+        )
+
+    def search_rare(dal, rand):
+        return dal.search_all_records(
+            {
+                "limit": limit,
+                "offset": 0,
+                shared_constants.VIDEOS_SEARCH_QUERY_KEY: (
+                    f"tag{rand.randrange(TAG_COUNT)}"
+                ),
+            },
+            {},
+        )
+
+    def exact_count(dal, rand):
+        return dal.get_all_records(
+            {"limit": 1, "offset": 0, shared_constants.TRACK_TOTAL_HITS_KEY: True},
+            {},
+        )
+
+    def suggest(dal, rand):
+        return dal.suggest_records(
+            {
+                shared_constants.PREFIX_KEY: rand.choice(WORDS)[:3],
+                shared_constants.LIMIT_KEY: shared_constants.DEFAULT_SUGGEST_LIMIT,
+            },
+            {},
+        )
+
+    def aggregate(dal, rand):
+        return dal.aggregate_records(
+            {
+                shared_constants.VIDEOS_SEARCH_QUERY_KEY: None,
+                shared_constants.QUERIES_KEY: rand.sample(WORDS, 2),
+                shared_constants.INTERVAL_KEY: "week",
+                shared_constants.CHANNELS_SIZE_KEY: 10,
+            },
+            {},
+        )
+
+    operations = {
+        "first_page": first_page,
+        "deep_offset": deep_offset,
+        "keyset_deep": keyset_deep,
+        "search_common": search_common,
+        "search_rare": search_rare,
+        "exact_count": exact_count,
+        "suggest": suggest,
+        "aggregate": aggregate,
+    }
+    if not cursors:
+        del operations["keyset_deep"]
+    return operations
+
+
+def collect_cursors(dal, depth):
+    """
+    Walks the collection with keyset pages down to the given depth
+    Returns:
+        the search_after cursors of the walked pages, the first one excluded
+    """
+    cursors, search_after = [], None
+    for _ in range(depth // KEYSET_WALK_LIMIT):
+        data = {"limit": KEYSET_WALK_LIMIT}
+        if search_after:
+            data[shared_constants.SEARCH_AFTER_KEY] = search_after
+        else:
+            data["offset"] = 0
+        result, _ = dal.get_all_records(data, {})
+        hits = result["hits"]["hits"]
+        if not hits:
+            break
+        search_after = hits[-1]["sort"]
+        cursors.append(search_after)
+    return cursors
+
+
+def measure(dal, operation, iterations, concurrency, seed):
+    """
+    Calls the operation from concurrent threads
+    Returns:
+        the throughput & the latency percentiles of the calls
+    """
+    latencies, errors = [], []
+
+    def call(i):
+        rand = random.Random(seed + i)
+        start = time.perf_counter()
+        try:
+            operation(dal, rand)
+        except Exception:
+            errors.append(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Warming up the caches & the code path
+    for i in range(min(iterations, 10)):
+        call(-i - 1)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(iterations)))
+    return summarize(latencies, len(errors), time.perf_counter() - start)
+
+
+def get_footprint(backend):
+    """
+    Returns the memory & disk footprint of the storage
+    """
+    footprint = {
+        # On linux, in KiB
+        "peak_rss_mib": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        )
+    }
+    if os.path.exists("/proc/self/status"):
+        # The pages of the memory mapped database files count in the RSS of
+        # each of the connections mapping them, unlike the process heap
+        with open("/proc/self/status") as status:
+            for line in status:
+                key, _, value = line.partition(":")
+                if key in ("RssAnon", "RssFile"):
+                    footprint[f"{key.lower()}_mib"] = round(
+                        int(value.split()[0]) / 1024, 1
+                    )
+    if backend == dal_factory.STORAGE_BACKEND_SQLITE:
+        footprint["disk_mib"] = round(
+            sum(
+                os.path.getsize(path) / 2**20
+                for path in (settings.sqlite_db_path, f"{settings.sqlite_db_path}-wal")
+                if os.path.exists(path)
+            ),
+            1,
+        )
+        return footprint
+    es_conn = get_es_conn()
+    stats = es_conn.indices.stats(
+        index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS, metric="store"
+    )
+    footprint["disk_mib"] = round(
+        stats["_all"]["total"]["store"]["size_in_bytes"] / 2**20, 1
+    )
+    nodes = es_conn.nodes.stats(metric="jvm")["nodes"].values()
+    footprint["es_heap_used_mib"] = round(
+        sum(node["jvm"]["mem"]["heap_used_in_bytes"] for node in nodes) / 2**20, 1
+    )
+    return footprint
+
+
+def run(args, sizes):
+    """
+    Seeds up to each size & measures the operations at it
+    """
+    dal = dal_factory.get_dal()
+    commit = get_commit()
+    seeded = 0
+    for size in sizes:
+        rate = seed_videos(
+            dal, size - seeded, args.seed_batch_size, args.seed, start=seeded
+        )
+        seeded = size
+        cursors = collect_cursors(dal, min(args.keyset_depth, size))
+        operations = get_operations(args, cursors[len(cursors) // 2 :])
+        results = {
+            name: measure(dal, operation, args.iterations, args.concurrency, args.seed)
+            for name, operation in operations.items()
+        }
+        footprint = get_footprint(args.backend)
+
+        config = {
+            "backend": args.backend,
+            "videos": size,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "limit": args.limit,
+            "keyset_depth": args.keyset_depth,
+        }
+        previous = load_previous_run(args.results_file, config, commit)
+        print(
+            f"commit={commit} "
+            + " ".join(f"{k}={v}" for k, v in config.items())
+            + f" seed_videos_per_sec={rate:.0f} "
+            + " ".join(f"{k}={v}" for k, v in footprint.items())
+        )
+        report(results, previous)
+        if not args.no_store:
+            store_run(
+                args.results_file,
+                {
+                    "commit": commit,
+                    "timestamp": datetime.now(pytz.utc).isoformat(),
+                    "config": config,
+                    "seed_videos_per_sec": round(rate),
+                    "footprint": footprint,
+                    "results": results,
+                },
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--backend",
+        choices=[
+            dal_factory.STORAGE_BACKEND_ELASTICSEARCH,
+            dal_factory.STORAGE_BACKEND_SQLITE,
+        ],
+        default=dal_factory.STORAGE_BACKEND_SQLITE,
+    )
+    parser.add_argument(
+        "--sizes",
+        default="100000,1000000",
+        help="Growing collection sizes to measure at, i.e., 100000,1000000,3000000",
+    )
+    parser.add_argument("--seed-batch-size", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--keyset-depth", type=int, default=100000)
+    parser.add_argument("--db-path", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-file", default=DEFAULT_RESULTS_FILE)
+    parser.add_argument("--no-store", action="store_true")
+    parser.add_argument("--log-level", default="error")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    log_level = getattr(logging, args.log_level.upper())
+    logging.getLogger().setLevel(log_level)
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(log_level))
+
+    os.environ["STORAGE_BACKEND"] = args.backend
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["SQLITE_DB_PATH"] = args.db_path or os.path.join(
+            work_dir, "videos.db"
+        )
+        try:
+            run(args, sizes)
+        finally:
+            sqlite_connection.close_pool()
+
+
+if __name__ == "__main__":
+    main()
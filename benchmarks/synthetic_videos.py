@@ -0,0 +1,78 @@
+"""Synthetic youtube videos for seeding the storage in the benchmarks"""
+import random
+import time
+from datetime import datetime
+
+import pytz
+
+from app.core.config import settings
+from app.core.cron import bg_video_updater
+from app.data_access_layer import dal_factory, get_es_conn
+from app.data_access_layer.elasticsearch import elasticsearch_constants
+from app.data_access_layer.generic.video_registry_db_interface import (
+    VideoRegistryDBInterface,
+)
+from app.models.youtube.youtube_records import VideoRecord
+from app.utils.common_utils import RFC_339_DATE_FORMAT
+
+WORDS = (
+    "football goal highlights champions league derby penalty transfer "
+    "interview training final keeper striker tactics analysis stadium "
+    "fans skills save cup"
+).split()
+
+# Each tag is in the title of one video in TAG_COUNT, for the selective searches
+TAG_COUNT = 1000
+
+
+def build_videos(count: int, seed: int, start: int = 0):
+    """
+    Returns count synthetic video documents from the start-th one on,
+    a minute apart, the newest first
+    """
+    rand = random.Random(seed + start)
+    newest = int(time.time())
+    for i in range(start, start + count):
+        video_id = f"bench{i:08d}"
+        # Built like the ingestion does, the title suggestions included
+        yield bg_video_updater._get_only_relevant_data(
+            VideoRecord(
+                "youtube#video",
+                video_id,
+                datetime.fromtimestamp(newest - i * 60, pytz.utc).strftime(
+                    RFC_339_DATE_FORMAT
+                ),
+                " ".join(rand.choices(WORDS, k=5)) + f" tag{i % TAG_COUNT}",
+                " ".join(rand.choices(WORDS, k=40)),
+                f"https://i.ytimg.com/vi/{video_id}/default.jpg",
+                f"Channel {i % 200}",
+            )
+        )
+
+
+def seed_videos(
+    dal: VideoRegistryDBInterface,
+    count: int,
+    batch_size: int,
+    seed: int,
+    start: int = 0,
+):
+    """
+    Writes the synthetic videos through the DAL & makes them searchable
+    Returns:
+        the seeding throughput, in videos per second
+    """
+    started_at = time.perf_counter()
+    batch = []
+    for video in build_videos(count, seed, start):
+        batch.append(video)
+        if len(batch) == batch_size:
+            dal.add_records_bulk(batch, {})
+            batch = []
+    if batch:
+        dal.add_records_bulk(batch, {})
+    if settings.storage_backend == dal_factory.STORAGE_BACKEND_ELASTICSEARCH:
+        get_es_conn().indices.refresh(
+            index=elasticsearch_constants.YOUTUBE_VIDEOS_ALIAS
+        )
+    return count / (time.perf_counter() - started_at)
@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Benchmark the background ingestion against a local youtube API stand-in.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m benchmarks.ingestion_benchmark "$@"
@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Load test the collections & search read path, storing the results per commit.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m benchmarks.read_path_benchmark "$@"
@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Benchmark the response serialization of large video pages.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m benchmarks.serialization_benchmark "$@"
@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Benchmark the storage backends at growing collection sizes, storing the results per commit.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m benchmarks.storage_benchmark "$@"
@@ -0,0 +1,13 @@
+#!/bin/bash -ex
+
+#
+# Start the ingestion worker, which keeps adding the newly published videos to the DB.
+# Run the API with IN_API_INGESTION_ENABLED=false when using this worker.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m app.core.cron.ingestion_worker
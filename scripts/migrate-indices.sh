@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Reindex the youtube-videos indices created before the index template into templated ones.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m app.data_access_layer.elasticsearch.index_migration
@@ -0,0 +1,12 @@
+#!/bin/bash -ex
+
+#
+# Run the unit tests.
+#
+
+export PYTHONPATH=$PYTHONPATH:$(pwd)
+
+# Activate the python venv.
+source "$(poetry env info --path)/bin/activate"
+
+python -m pytest tests/unit_test "$@"
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from app.api.client.api_key_pool import ApiKeyPool
+
+
+@pytest.fixture
+def keys_file(tmp_path):
+    path = tmp_path / "keys.txt"
+    path.write_text("key-1\nkey-2\n\n")
+    return path
+
+
+def test_acquire_spreads_the_calls_across_the_keys(keys_file):
+    pool = ApiKeyPool(str(keys_file), daily_quota_units=250)
+
+    keys = [pool.acquire(100) for _ in range(5)]
+
+    assert keys == ["key-1", "key-2", "key-1", "key-2", None]
+    assert pool.get_used_units() == 400
+    assert pool.get_remaining_units() == 100
+
+
+def test_report_failure_puts_the_exhausted_key_into_cooldown(keys_file):
+    pool = ApiKeyPool(str(keys_file), daily_quota_units=10000)
+    pool.acquire(100)
+
+    assert pool.report_failure("key-1", 403, "quotaExceeded")
+
+    assert [state.api_key for state in pool.get_healthy_keys()] == ["key-2"]
+    assert pool.get_remaining_units() == 10000
+
+
+def test_report_failure_ignores_the_request_errors(keys_file):
+    pool = ApiKeyPool(str(keys_file), daily_quota_units=10000)
+    pool.acquire(100)
+
+    assert not pool.report_failure("key-1", 400, "badRequest")
+    assert not pool.report_failure("unknown-key", 403, "quotaExceeded")
+    assert len(pool.get_healthy_keys()) == 2
+
+
+def test_the_keys_file_is_reloaded_when_modified(keys_file):
+    pool = ApiKeyPool(str(keys_file), daily_quota_units=10000)
+    pool.acquire(100)
+
+    keys_file.write_text("key-1\nkey-3\n")
+    mtime = os.stat(keys_file).st_mtime + 10
+    os.utime(keys_file, (mtime, mtime))
+
+    assert [state.api_key for state in pool.get_healthy_keys()] == ["key-1", "key-3"]
+    assert [(key["api_key"], key["used_units"]) for key in pool.snapshot()] == [
+        ("****ey-1", 100),
+        ("****ey-3", 0),
+    ]
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.client import base_api_caller
+from app.api.client.base_api_caller import BaseApiCaller
+from app.api.client.circuit_breaker import CircuitBreaker
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+
+
+class FakeClient:
+    """
+    Stands in for the shared http client, answering with the given
+    responses, or raising the given transport errors, in turn
+    """
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.call_count = 0
+
+    async def get(self, url, params=None, headers=None):
+        self.call_count += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def api_caller(monkeypatch):
+    def install(outcomes):
+        client = FakeClient(outcomes)
+        monkeypatch.setattr(base_api_caller.http_client, "get_client", lambda: client)
+        caller = BaseApiCaller("https://api.test", "/videos")
+        caller.circuit_breaker = CircuitBreaker("test", 2, 60)
+        return caller, client
+
+    async def no_backoff(self, attempt, resp, reason):
+        pass
+
+    monkeypatch.setattr(BaseApiCaller, "_backoff", no_backoff)
+    return install
+
+
+def _response(status_code, content=b"{}"):
+    return httpx.Response(status_code, content=content)
+
+
+def test_get_retries_the_server_errors(api_caller):
+    caller, client = api_caller([_response(503), _response(200, b'{"items": []}')])
+
+    assert asyncio.run(caller.get()) == {"items": []}
+    assert client.call_count == 2
+
+
+def test_get_records_a_single_failure_per_exhausted_call(api_caller):
+    caller, client = api_caller([_response(500)] * 4)
+
+    with pytest.raises(VideoRegistryException) as exc_info:
+        asyncio.run(caller.get())
+
+    assert exc_info.value.error_code == 500
+    assert client.call_count == 4
+    assert caller.circuit_breaker._failure_count == 1
+    assert caller.circuit_breaker.state == "closed"
+
+
+def test_get_raises_a_timeout_on_exhausted_transport_errors(api_caller):
+    caller, client = api_caller([httpx.ReadTimeout("timeout")] * 4)
+
+    with pytest.raises(VideoRegistryException) as exc_info:
+        asyncio.run(caller.get())
+
+    assert exc_info.value.error_code == 408
+    assert client.call_count == 4
+
+
+def test_get_returns_nothing_on_a_client_error(api_caller):
+    caller, client = api_caller(
+        [_response(403, b'{"error": {"errors": [{"reason": "quotaExceeded"}]}}')]
+    )
+
+    assert asyncio.run(caller.get()) is None
+    assert caller.error_reason == "quotaExceeded"
+    assert client.call_count == 1
+
+
+def test_get_skips_the_call_while_the_circuit_is_open(api_caller):
+    caller, client = api_caller([])
+    caller.circuit_breaker.record_failure()
+    caller.circuit_breaker.record_failure()
+
+    with pytest.raises(VideoRegistryException) as exc_info:
+        asyncio.run(caller.get())
+
+    assert exc_info.value.error_code == 503
+    assert client.call_count == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from app.api.client import circuit_breaker
+from app.api.client.circuit_breaker import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_the_circuit_opens_after_the_consecutive_failures(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+
+
+def test_a_single_trial_call_is_let_through_after_the_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+
+    clock[0] += 60
+
+    assert breaker.allow_request()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_a_successful_trial_call_closes_the_circuit(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock[0] += 60
+    breaker.allow_request()
+
+    breaker.record_success()
+
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow_request()
+
+
+def test_a_failed_trial_call_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=60)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 60
+    breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+
+
+def test_a_lost_trial_call_is_replaced_after_the_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock[0] += 60
+    breaker.allow_request()
+
+    clock[0] += 60
+
+    assert breaker.allow_request()
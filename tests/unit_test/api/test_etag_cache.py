@@ -0,0 +1,24 @@
+from app.api.client.etag_cache import EtagCache
+
+
+def test_get_returns_the_cached_etag():
+    cache = EtagCache(max_entries=10)
+    cache.set("a", '"etag-a"')
+    cache.set("a", '"etag-b"')
+
+    assert cache.get("a") == '"etag-b"'
+    assert cache.get("b") is None
+    assert len(cache) == 1
+
+
+def test_set_evicts_the_least_recently_used_etags():
+    cache = EtagCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
@@ -0,0 +1,45 @@
+import asyncio
+
+from app.api.client import fetch_youtube_videos
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+
+
+def test_get_video_details_many_returns_none_for_the_failed_batches(monkeypatch):
+    async def get_video_details(video_ids):
+        if "fail" in video_ids:
+            raise VideoRegistryException(503, "Service unavailable")
+        return {"items": video_ids}
+
+    monkeypatch.setattr(fetch_youtube_videos, "get_video_details", get_video_details)
+    video_ids = [f"v{i}" for i in range(60)] + ["fail"]
+
+    details = asyncio.run(fetch_youtube_videos.get_video_details_many(video_ids))
+
+    assert details == [{"items": video_ids[:50]}, None]
+
+
+def test_remember_search_sends_the_etag_of_the_first_page(monkeypatch):
+    calls = []
+
+    async def call_with_api_key(path, params, cost, headers=None):
+        calls.append((params.get("pageToken"), headers))
+        return None
+
+    monkeypatch.setattr(fetch_youtube_videos, "_call_with_api_key", call_with_api_key)
+    monkeypatch.setattr(
+        fetch_youtube_videos, "search_etags", fetch_youtube_videos.EtagCache(10)
+    )
+    published_after = "2021-06-01T00:00:00Z"
+
+    fetch_youtube_videos.remember_search("cats", published_after, "etag")
+    asyncio.run(
+        fetch_youtube_videos.search_newly_added_videos("cats", published_after, None)
+    )
+    asyncio.run(
+        fetch_youtube_videos.search_newly_added_videos("cats", published_after, "p2")
+    )
+    asyncio.run(
+        fetch_youtube_videos.search_newly_added_videos("dogs", published_after, None)
+    )
+
+    assert calls == [(None, {"If-None-Match": '"etag"'}), ("p2", None), (None, None)]
@@ -0,0 +1,64 @@
+from app.core.cache import response_cache as response_cache_module
+from app.core.cache.response_cache import ResponseCache
+
+
+def test_make_key_ignores_the_params_order():
+    assert ResponseCache.make_key("collections", limit=10, offset=0) == (
+        ResponseCache.make_key("collections", offset=0, limit=10)
+    )
+
+
+def test_get_returns_the_cached_body():
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    cache.set(("a",), b"body", cache.generation)
+
+    assert cache.get(("a",)) == b"body"
+    assert cache.get(("b",)) is None
+
+
+def test_get_drops_the_expired_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    cache.set(("a",), b"body", cache.generation)
+
+    now[0] += 60
+
+    assert cache.get(("a",)) is None
+    assert cache._size == 0
+
+
+def test_set_evicts_the_least_recently_used_entries():
+    cache = ResponseCache(max_entries=2, max_bytes=100, ttl=60)
+    cache.set(("a",), b"a", cache.generation)
+    cache.set(("b",), b"b", cache.generation)
+    cache.get(("a",))
+
+    cache.set(("c",), b"c", cache.generation)
+
+    assert cache.get(("a",)) == b"a"
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) == b"c"
+
+
+def test_set_evicts_the_entries_beyond_the_bytes_cap():
+    cache = ResponseCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.set(("a",), b"a" * 6, cache.generation)
+    cache.set(("b",), b"b" * 6, cache.generation)
+    cache.set(("c",), b"c" * 11, cache.generation)
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) == b"b" * 6
+    assert cache.get(("c",)) is None
+
+
+def test_set_skips_the_responses_of_an_older_generation():
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl=60)
+    generation = cache.generation
+    cache.set(("a",), b"a", generation)
+
+    cache.invalidate()
+    cache.set(("b",), b"b", generation)
+
+    assert cache.get(("a",)) is None
+    assert cache.get(("b",)) is None
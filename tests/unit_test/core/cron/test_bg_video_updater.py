@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+
+from app.core.cron import bg_video_updater
+from app.core.cron.ingestion_checkpoint import IngestionCheckpoint
+from app.core.cron.seen_video_filter import SeenVideoFilter
+from app.utils.common_utils import rfc_3339_to_epoch
+
+
+class FakeDAL:
+    def __init__(self, failed_ids=()):
+        self.documents = []
+        self.failed_ids = set(failed_ids)
+
+    def add_records_bulk(self, documents, execution_context):
+        indexed = [d for d in documents if d["id"] not in self.failed_ids]
+        self.documents.extend(indexed)
+        errors = [{"id": d["id"]} for d in documents if d["id"] in self.failed_ids]
+        return len(indexed), errors
+
+
+def _search_page(etag, video_ids, next_page_token=None):
+    return {
+        "etag": etag,
+        "nextPageToken": next_page_token,
+        "items": [{"id": {"videoId": video_id}} for video_id in video_ids],
+    }
+
+
+def _video_details(*video_ids, published_at_by_id=None):
+    published_at_by_id = published_at_by_id or {}
+    return {
+        "items": [
+            {
+                "kind": "youtube#video",
+                "id": video_id,
+                "snippet": {
+                    "publishedAt": published_at_by_id.get(
+                        video_id, "2021-06-01T00:00:00Z"
+                    ),
+                    "title": f"Title {video_id}",
+                    "description": "",
+                    "thumbnails": {"default": {"url": ""}},
+                    "channelTitle": "channel",
+                },
+            }
+            for video_id in video_ids
+        ]
+    }
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    return IngestionCheckpoint(str(tmp_path / "checkpoint.json"))
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    """
+    Stands in for the youtube API, serving the search pages of each topic
+    by page token
+    """
+    remembered_searches = []
+
+    def install(pages_by_topic):
+        async def search_newly_added_videos(query, next_page_token, **kwargs):
+            return pages_by_topic[query][next_page_token]
+
+        async def get_video_details_many(video_ids):
+            return [_video_details(*video_ids)]
+
+        monkeypatch.setattr(
+            bg_video_updater.fetch_youtube_videos,
+            "search_newly_added_videos",
+            search_newly_added_videos,
+        )
+        monkeypatch.setattr(
+            bg_video_updater.fetch_youtube_videos,
+            "get_video_details_many",
+            get_video_details_many,
+        )
+        return remembered_searches
+
+    monkeypatch.setattr(bg_video_updater, "seen_videos", SeenVideoFilter())
+    monkeypatch.setattr(
+        bg_video_updater.fetch_youtube_videos,
+        "remember_search",
+        lambda topic, published_after, etag, *args: remembered_searches.append(
+            (topic, etag)
+        ),
+    )
+    return install
+
+
+def test_insert_new_videos_indexes_each_video_once(checkpoint, youtube):
+    remembered_searches = youtube(
+        {
+            "cats": {
+                None: _search_page("cats-1", ["a", "b"], "cats-2"),
+                "cats-2": _search_page("cats-2", ["c"]),
+            },
+            "dogs": {None: _search_page("dogs-1", ["b", "d"])},
+        }
+    )
+    dal = FakeDAL()
+
+    indexed_count = asyncio.run(
+        bg_video_updater.insert_new_videos(checkpoint, ["cats", "dogs"], dal=dal)
+    )
+
+    assert indexed_count == 4
+    assert [document["id"] for document in dal.documents] == ["a", "b", "d", "c"]
+    assert remembered_searches == [("dogs", "dogs-1"), ("cats", "cats-1")]
+    assert checkpoint.get_page_state("cats") is None
+    assert checkpoint.get_watermark("cats") is not None
+
+
+def test_insert_new_videos_keeps_the_paging_when_the_details_fail(
+    checkpoint, youtube, monkeypatch
+):
+    youtube({"cats": {None: _search_page("cats-1", ["a"], "cats-2")}})
+
+    async def get_video_details_many(video_ids):
+        return [None]
+
+    monkeypatch.setattr(
+        bg_video_updater.fetch_youtube_videos,
+        "get_video_details_many",
+        get_video_details_many,
+    )
+
+    indexed_count = asyncio.run(
+        bg_video_updater.insert_new_videos(checkpoint, ["cats"], dal=FakeDAL())
+    )
+
+    assert indexed_count == 0
+    assert checkpoint.get_watermark("cats") is None
+
+
+def test_insert_new_videos_keeps_the_watermark_below_the_failed_videos(
+    checkpoint, youtube, monkeypatch
+):
+    youtube(
+        {
+            "cats": {
+                None: _search_page("cats-1", ["a", "b"], "cats-2"),
+                "cats-2": _search_page("cats-2", ["c"]),
+            }
+        }
+    )
+    published_at_by_id = {
+        "a": "2021-06-03T00:00:00Z",
+        "b": "2021-06-01T00:00:00Z",
+        "c": "2021-06-02T00:00:00Z",
+    }
+
+    async def get_video_details_many(video_ids):
+        return [_video_details(*video_ids, published_at_by_id=published_at_by_id)]
+
+    monkeypatch.setattr(
+        bg_video_updater.fetch_youtube_videos,
+        "get_video_details_many",
+        get_video_details_many,
+    )
+    dal = FakeDAL(failed_ids=["b"])
+
+    indexed_count = asyncio.run(
+        bg_video_updater.insert_new_videos(checkpoint, ["cats"], dal=dal)
+    )
+
+    assert indexed_count == 2
+    assert [document["id"] for document in dal.documents] == ["a", "c"]
+    # Newer videos were indexed, yet the failed one is searched again
+    assert (
+        checkpoint.get_watermark("cats")
+        == rfc_3339_to_epoch(published_at_by_id["b"]) - 1
+    )
+    assert bg_video_updater.seen_videos.filter_unseen(["a", "b", "c"]) == ["b"]
@@ -0,0 +1,48 @@
+from app.core.cron.ingestion_checkpoint import IngestionCheckpoint
+
+
+def test_advance_never_moves_the_watermark_backwards(tmp_path):
+    checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.json"))
+
+    checkpoint.advance("cats", 200)
+    checkpoint.advance("cats", 100)
+
+    assert checkpoint.get_watermark("cats") == 200
+    assert checkpoint.get_watermark("dogs") is None
+
+
+def test_complete_clears_the_paging_and_advances_the_watermark(tmp_path):
+    checkpoint = IngestionCheckpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.set_page_state("cats", "2021-06-01T00:00:00Z", "token", 150)
+
+    checkpoint.complete("cats", 150)
+
+    assert checkpoint.get_page_state("cats") is None
+    assert checkpoint.get_watermark("cats") == 150
+
+
+def test_save_persists_the_state_across_restarts(tmp_path):
+    file_path = str(tmp_path / "state" / "checkpoint.json")
+    checkpoint = IngestionCheckpoint(file_path)
+    checkpoint.advance("cats", 200)
+    checkpoint.set_page_state("dogs", "2021-06-01T00:00:00Z", "token", None)
+    checkpoint.save()
+
+    restarted = IngestionCheckpoint(file_path)
+
+    assert restarted.get_watermark("cats") == 200
+    assert restarted.get_page_state("dogs") == {
+        "published_after": "2021-06-01T00:00:00Z",
+        "page_token": "token",
+        "newest_published_at": None,
+    }
+
+
+def test_a_corrupt_state_file_starts_afresh(tmp_path):
+    file_path = tmp_path / "checkpoint.json"
+    file_path.write_text("{not json")
+
+    checkpoint = IngestionCheckpoint(str(file_path))
+
+    assert checkpoint.get_watermark("cats") is None
+    assert checkpoint.get_page_state("cats") is None
@@ -0,0 +1,71 @@
+from app.core.cron import poll_scheduler
+from app.core.cron.poll_scheduler import PollScheduler
+
+
+class FakeKeyPool:
+    """
+    Stands in for the API key pool, with a fixed quota usage
+    """
+
+    def __init__(self, remaining_units, seconds_to_reset=86400):
+        self.used_units = 0
+        self.remaining_units = remaining_units
+        self.seconds_to_reset = seconds_to_reset
+
+    def get_used_units(self):
+        return self.used_units
+
+    def get_remaining_units(self):
+        return self.remaining_units
+
+    def get_seconds_to_quota_reset(self):
+        return self.seconds_to_reset
+
+
+def test_the_interval_backs_off_on_empty_polls_up_to_the_max():
+    scheduler = PollScheduler(FakeKeyPool(10**9), topic_count=1)
+
+    intervals = [scheduler.plan_next_poll(0).interval for _ in range(8)]
+
+    assert intervals == [20, 40, 80, 160, 320, 640, 900, 900]
+
+
+def test_the_interval_shrinks_on_high_yield_polls_down_to_the_min():
+    scheduler = PollScheduler(FakeKeyPool(10**9), topic_count=1)
+    scheduler.plan_next_poll(0)
+    scheduler.plan_next_poll(0)
+
+    decisions = [scheduler.plan_next_poll(25) for _ in range(3)]
+
+    assert [decision.interval for decision in decisions] == [20, 10, 10]
+    assert decisions[0].reason == poll_scheduler.POLL_REASON_HIGH_YIELD
+
+
+def test_the_interval_is_spread_over_the_remaining_quota():
+    # 10 polls of 2 topics affordable until the reset in 1000 seconds
+    scheduler = PollScheduler(FakeKeyPool(2000, 1000), topic_count=2)
+
+    decision = scheduler.plan_next_poll(5)
+
+    assert decision.interval == 100
+    assert decision.reason == poll_scheduler.POLL_REASON_QUOTA_BUDGET
+
+
+def test_the_polls_wait_for_the_reset_once_the_quota_is_exhausted():
+    scheduler = PollScheduler(FakeKeyPool(50, 3600), topic_count=1)
+
+    decision = scheduler.plan_next_poll(5)
+
+    assert decision.interval == 900
+    assert decision.reason == poll_scheduler.POLL_REASON_QUOTA_EXHAUSTED
+
+
+def test_the_units_per_poll_follow_the_used_units():
+    key_pool = FakeKeyPool(10**9)
+    scheduler = PollScheduler(key_pool, topic_count=1)
+
+    scheduler.start_poll()
+    key_pool.used_units += 1100
+    decision = scheduler.plan_next_poll(5)
+
+    assert decision.estimated_units_per_poll == 100 + 0.3 * 1000
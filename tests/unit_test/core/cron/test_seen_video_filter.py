@@ -0,0 +1,19 @@
+from app.core.cron.seen_video_filter import SeenVideoFilter
+
+
+def test_filter_unseen_keeps_the_unseen_videos_in_order():
+    seen_videos = SeenVideoFilter()
+    seen_videos.add_many(["b", "d"])
+
+    assert seen_videos.filter_unseen(["a", "b", "c", "d"]) == ["a", "c"]
+
+
+def test_warm_loads_the_indexed_videos():
+    seen_videos = SeenVideoFilter()
+
+    seen_videos.warm(iter(["a", "b", "a"]))
+
+    assert seen_videos.is_warm
+    assert len(seen_videos) == 2
+    assert "a" in seen_videos
+    assert "c" not in seen_videos
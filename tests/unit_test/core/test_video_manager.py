@@ -0,0 +1,128 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from app.core.video_management import video_manager
+from app.utils import cursor_utils
+
+
+def test_build_response_drops_the_keys_outside_the_video_fields():
+    result = {
+        "hits": {
+            "total": {"value": 1, "relation": "eq"},
+            "hits": [
+                {
+                    "_index": "youtube_videos_2021_6",
+                    "_id": "a",
+                    "_source": {
+                        "id": "a",
+                        "title": "Title",
+                        "title_suggest": {"input": ["Title"]},
+                    },
+                    "sort": [1, "a"],
+                }
+            ],
+        }
+    }
+
+    response = video_manager._build_response(result, 1, 0, 10)
+
+    assert response["details"] == [
+        {
+            "video_index": "youtube_videos_2021_6",
+            "video_id": "a",
+            "id": "a",
+            "title": "Title",
+        }
+    ]
+
+
+def test_normalize_queries_drops_the_blank_and_duplicate_queries():
+    assert video_manager._normalize_queries(["Foo  Bar", " ", "foo bar", "Baz"]) == [
+        "foo bar",
+        "baz",
+    ]
+    assert video_manager._normalize_queries(None) == []
+
+
+def test_build_aggregations_response_counts_the_missing_queries_as_zero():
+    facets = {
+        "total_count": 3,
+        "channels": [("channel", 3)],
+        "published_at_histogram": [("2021-06-01T00:00:00Z", 3)],
+        "query_counts": {"foo": 2},
+    }
+
+    response = video_manager._build_aggregations_response(facets, ["foo", "bar"])
+
+    assert response["total_count"] == 3
+    assert response["channels"] == [{"channel_title": "channel", "count": 3}]
+    assert response["query_counts"] == [
+        {"query": "foo", "count": 2},
+        {"query": "bar", "count": 0},
+    ]
+
+
+class FakeDAL:
+    """
+    Stands in for the DAL, recording the search params
+    """
+
+    def __init__(self):
+        self.search_params = []
+
+    async def get_all_records_async(self, data, execution_context):
+        self.search_params.append(dict(data))
+        return None, None
+
+
+@pytest.fixture
+def dal(monkeypatch):
+    fake = FakeDAL()
+    monkeypatch.setattr(video_manager.dal_factory, "get_dal", lambda: fake)
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    return fake
+
+
+def test_a_crafted_cursor_cannot_override_the_request(dal):
+    cursor = cursor_utils.encode_cursor([1622505600000, "a"])
+    position = cursor_utils.decode_cursor(cursor)
+    crafted = {
+        **position,
+        "limit": 100000,
+        "offset": 5,
+        "sort": "published_at",
+        "fields": ["title_suggest"],
+        "video_search_query": "cats",
+    }
+    crafted_cursor = (
+        base64.urlsafe_b64encode(json.dumps(crafted).encode()).decode().rstrip("=")
+    )
+
+    asyncio.run(video_manager.get_youtube_videos(10, 0, crafted_cursor))
+
+    (search_params,) = dal.search_params
+    assert search_params["limit"] == 10
+    assert search_params["offset"] == 0
+    assert search_params["search_after"] == [1622505600000, "a"]
+    for key in ("sort", "fields", "video_search_query"):
+        assert key not in search_params
+
+
+def test_a_malformed_cursor_is_a_bad_request(dal):
+    cursor = base64.urlsafe_b64encode(b'{"search_after": [1]}').decode()
+
+    response = asyncio.run(video_manager.get_youtube_videos(10, 0, cursor))
+
+    assert response.status_code == 400
+    assert dal.search_params == []
+
+
+def test_an_unknown_field_is_a_bad_request(dal):
+    response = asyncio.run(
+        video_manager.get_youtube_videos(10, 0, fields="title,title_suggest")
+    )
+
+    assert response.status_code == 400
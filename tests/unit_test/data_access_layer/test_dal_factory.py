@@ -0,0 +1,32 @@
+import sys
+
+import pytest
+
+from app import data_access_layer
+from app.data_access_layer import dal_factory
+from app.data_access_layer.sqlite.sqlite_dal import SqliteDAL
+
+ELASTICSEARCH_DAL_MODULE = "app.data_access_layer.elasticsearch.elasticsearch_dal"
+
+
+def test_get_dal_creates_no_elasticsearch_client_with_sqlite(monkeypatch):
+    def create_connection(**kwargs):
+        raise AssertionError("The elasticsearch client was created")
+
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(data_access_layer, "_es_conn", None)
+    monkeypatch.setattr(
+        data_access_layer.connections, "create_connection", create_connection
+    )
+    monkeypatch.delitem(sys.modules, ELASTICSEARCH_DAL_MODULE, raising=False)
+
+    assert isinstance(dal_factory.get_dal(), SqliteDAL)
+    assert ELASTICSEARCH_DAL_MODULE not in sys.modules
+    assert data_access_layer._es_conn is None
+
+
+def test_get_dal_rejects_an_unknown_storage_backend(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "mongodb")
+
+    with pytest.raises(ValueError):
+        dal_factory.get_dal()
@@ -0,0 +1,100 @@
+import pytest
+from elasticsearch import exceptions
+
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.data_access_layer.elasticsearch import elasticsearch_dal
+from app.data_access_layer.elasticsearch.elasticsearch_dal import ElasticsearchDAL
+
+
+class FakeStreamingBulk:
+    """
+    Stands in for the ES streaming bulk helper, failing the documents with
+    the given statuses on their first attempts
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = []
+
+    def __call__(self, client, actions, **kwargs):
+        actions = list(actions)
+        self.attempts.append([action["_id"] for action in actions])
+        for action in actions:
+            statuses = self.failures.get(action["_id"], [])
+            if statuses:
+                status = statuses.pop(0)
+                yield False, {
+                    "index": {"_id": action["_id"], "status": status, "error": "x"}
+                }
+            else:
+                yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+
+@pytest.fixture
+def streaming_bulk(monkeypatch):
+    def install(failures):
+        fake = FakeStreamingBulk(failures)
+        monkeypatch.setattr(elasticsearch_dal.helpers, "streaming_bulk", fake)
+        return fake
+
+    monkeypatch.setattr(
+        elasticsearch_dal.index_manager, "get_write_index", lambda: "videos"
+    )
+    monkeypatch.setattr(elasticsearch_dal.time, "sleep", lambda seconds: None)
+    return install
+
+
+def _get_docs(*ids):
+    return [{"id": video_id, "title": video_id} for video_id in ids]
+
+
+def test_add_records_bulk_indexes_all_the_documents(streaming_bulk):
+    fake = streaming_bulk({})
+
+    indexed_count, errors = ElasticsearchDAL().add_records_bulk(
+        _get_docs("a", "b", "c"), {}
+    )
+
+    assert (indexed_count, errors) == (3, [])
+    assert fake.attempts == [["a", "b", "c"]]
+
+
+def test_add_records_bulk_retries_only_the_retryable_failures(streaming_bulk):
+    fake = streaming_bulk({"a": [429], "b": [400], "c": [503, 503]})
+
+    indexed_count, errors = ElasticsearchDAL().add_records_bulk(
+        _get_docs("a", "b", "c"), {}
+    )
+
+    assert indexed_count == 2
+    assert [(error["id"], error["status"]) for error in errors] == [("b", 400)]
+    assert fake.attempts == [["a", "b", "c"], ["a", "c"], ["c"]]
+
+
+def test_add_records_bulk_reports_the_failures_left_after_the_retries(
+    streaming_bulk,
+):
+    fake = streaming_bulk({"a": [503, 503, 503]})
+
+    indexed_count, errors = ElasticsearchDAL().add_records_bulk(
+        _get_docs("a", "b"), {"max_retries": 2}
+    )
+
+    assert indexed_count == 1
+    assert [(error["id"], error["status"]) for error in errors] == [("a", 503)]
+    assert len(fake.attempts) == 3
+
+
+def test_handle_query_exception_asks_to_restart_on_an_expired_point_in_time():
+    not_found = exceptions.NotFoundError(404, "search_context_missing_exception", {})
+
+    with pytest.raises(VideoRegistryException) as exc_info:
+        ElasticsearchDAL()._handle_query_exception(not_found, {"pit_id": "pit"})
+
+    assert exc_info.value.error_code == 410
+
+
+def test_handle_query_exception_returns_nothing_on_a_missing_index():
+    not_found = exceptions.NotFoundError(404, "index_not_found_exception", {})
+
+    assert ElasticsearchDAL()._handle_query_exception(not_found, {}) == (None, None)
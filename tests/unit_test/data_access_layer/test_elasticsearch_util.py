@@ -0,0 +1,56 @@
+from elasticsearch import exceptions
+
+from app.data_access_layer.elasticsearch import elasticsearch_util
+
+
+class FakeIndices:
+    """
+    Stands in for the ES indices client, failing the mapping updates of the
+    given indices
+    """
+
+    def __init__(self, mappings, conflicting_indices=()):
+        self.mappings = mappings
+        self.conflicting_indices = conflicting_indices
+        self.updated_indices = []
+
+    def get_mapping(self, index):
+        return self.mappings
+
+    def put_mapping(self, index, body, **kwargs):
+        if index in self.conflicting_indices:
+            raise exceptions.RequestError(400, "illegal_argument_exception", {})
+        self.updated_indices.append(index)
+
+
+class FakeConnection:
+    def __init__(self, indices):
+        self.indices = indices
+
+
+def _get_mapping(**properties):
+    return {"mappings": {"properties": properties}}
+
+
+def test_put_title_suggest_mapping_updates_the_indices_without_it(monkeypatch):
+    indices = FakeIndices(
+        {
+            "youtube_videos_2021_6": _get_mapping(title={"type": "text"}),
+            "youtube_videos_2021_7": _get_mapping(title_suggest={"type": "object"}),
+            "youtube_videos_2021_8": _get_mapping(title_suggest={"type": "completion"}),
+        },
+        conflicting_indices={"youtube_videos_2021_7"},
+    )
+    monkeypatch.setattr(elasticsearch_util, "es_conn", FakeConnection(indices))
+
+    elasticsearch_util.put_title_suggest_mapping()
+
+    assert indices.updated_indices == ["youtube_videos_2021_6"]
+
+
+def test_has_title_suggest_mapping():
+    assert elasticsearch_util.has_title_suggest_mapping(
+        _get_mapping(title_suggest={"type": "completion"})
+    )
+    assert not elasticsearch_util.has_title_suggest_mapping(_get_mapping())
+    assert not elasticsearch_util.has_title_suggest_mapping({"mappings": {}})
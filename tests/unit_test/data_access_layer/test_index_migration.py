@@ -0,0 +1,110 @@
+from app.core.cron import bg_video_updater
+from app.data_access_layer.elasticsearch import index_migration
+
+
+class FakeIndices:
+    """
+    Stands in for the ES indices client, holding the mappings & the aliases
+    """
+
+    def __init__(self, id_types, aliases):
+        self.id_types = id_types
+        self.aliases = aliases
+        self.alias_actions = []
+
+    def get_mapping(self, index):
+        return {
+            name: {
+                "mappings": {
+                    "properties": {
+                        "id": {"type": id_type},
+                        "title_suggest": {"type": "completion"},
+                    }
+                }
+            }
+            for name, id_type in self.id_types.items()
+        }
+
+    def get_alias(self, index):
+        return {index: {"aliases": self.aliases.get(index, {})}}
+
+    def update_aliases(self, body, **kwargs):
+        self.alias_actions.append(body["actions"])
+
+
+class FakeConnection:
+    def __init__(self, indices):
+        self.indices = indices
+        self.reindexed = []
+        self.scripts = []
+
+    def reindex(self, body, **kwargs):
+        self.reindexed.append((body["source"]["index"], body["dest"]["index"]))
+        self.scripts.append(body.get("script"))
+
+
+def _install(monkeypatch, id_types, aliases):
+    connection = FakeConnection(FakeIndices(id_types, aliases))
+    created = []
+    monkeypatch.setattr(index_migration, "es_conn", connection)
+    monkeypatch.setattr(
+        index_migration.elasticsearch_util, "put_index_template", lambda: None
+    )
+    monkeypatch.setattr(
+        index_migration.elasticsearch_util,
+        "create_index_with_properties",
+        lambda name, **kwargs: created.append(name),
+    )
+    return connection, created
+
+
+def test_get_legacy_indices_returns_the_indices_without_a_keyword_id(monkeypatch):
+    _install(
+        monkeypatch,
+        {"youtube_videos_2021_7": "keyword", "youtube_videos_2021_6": "text"},
+        {},
+    )
+
+    assert index_migration.get_legacy_indices() == ["youtube_videos_2021_6"]
+
+
+def test_migrate_legacy_indices_moves_the_aliases_back_to_the_same_name(
+    monkeypatch,
+):
+    index = "youtube_videos_2021_6"
+    temporary_index = f"{index}_migrating"
+    aliases = {"youtube_videos_alias": {}, "write_alias": {"is_write_index": True}}
+    connection, created = _install(
+        monkeypatch,
+        {index: "text"},
+        {index: aliases, temporary_index: aliases},
+    )
+
+    assert index_migration.migrate_legacy_indices() == [index]
+
+    assert created == [temporary_index, index]
+    assert connection.reindexed == [(index, temporary_index), (temporary_index, index)]
+    assert connection.indices.alias_actions[-1] == [
+        {"add": {"index": index, "alias": "youtube_videos_alias"}},
+        {"add": {"index": index, "alias": "write_alias", "is_write_index": True}},
+        {"remove_index": {"index": temporary_index}},
+    ]
+
+
+def test_migrate_legacy_indices_rebuilds_the_title_suggestions(monkeypatch):
+    index = "youtube_videos_2021_6"
+    connection, _ = _install(monkeypatch, {index: "text"}, {})
+
+    index_migration.migrate_legacy_indices()
+
+    # Neither the legacy source nor the templated one carries the inputs,
+    # both hops rebuild them
+    assert len(connection.scripts) == 2
+    for script in connection.scripts:
+        assert script["source"] == index_migration.TITLE_SUGGEST_SCRIPT
+        assert script["params"] == {
+            "title_key": "title",
+            "published_at_key": "published_at",
+            "title_suggest_key": "title_suggest",
+            "max_inputs": bg_video_updater.TITLE_SUGGEST_MAX_INPUTS,
+        }
@@ -0,0 +1,90 @@
+import pytest
+
+from app.data_access_layer.sqlite import sqlite_connection
+from app.data_access_layer.sqlite.sqlite_dal import SqliteDAL
+
+
+@pytest.fixture
+def dal(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "videos.db"))
+    sqlite_connection.close_pool()
+    dal = SqliteDAL()
+    dal.add_records_bulk(
+        [
+            {
+                "kind": "youtube#video",
+                "id": video_id,
+                "published_at": published_at,
+                "title": title,
+                "description": "",
+                "thumbnail_url": "",
+                "channel_title": "channel",
+            }
+            for video_id, published_at, title in (
+                ("a", "2021-06-01T00:00:00Z", "cats playing"),
+                ("b", "2021-06-02T00:00:00Z", "dogs playing"),
+                ("c", "2021-06-02T00:00:00Z", "cats sleeping"),
+                ("d", "2021-06-03T00:00:00Z", "birds singing"),
+            )
+        ],
+        {},
+    )
+    yield dal
+    sqlite_connection.close_pool()
+
+
+def _get_ids(resp):
+    return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+
+def test_get_all_records_pages_by_offset_newest_first(dal):
+    resp, count = dal.get_all_records({"limit": 2, "offset": 1}, {})
+
+    assert _get_ids(resp) == ["c", "b"]
+    assert count == 4
+    assert resp["hits"]["total"] == {"value": 4, "relation": "eq"}
+
+
+def test_get_all_records_pages_by_keyset(dal):
+    first_page, _ = dal.get_all_records({"limit": 2, "offset": 0}, {})
+    search_after = first_page["hits"]["hits"][-1]["sort"]
+
+    resp, _ = dal.get_all_records({"limit": 2, "search_after": search_after}, {})
+
+    assert _get_ids(first_page) + _get_ids(resp) == ["d", "c", "b", "a"]
+
+
+def test_get_all_records_pages_by_keyset_oldest_first(dal):
+    first_page, _ = dal.get_all_records(
+        {"limit": 2, "offset": 0, "sort": "published_at"}, {}
+    )
+    search_after = first_page["hits"]["hits"][-1]["sort"]
+
+    resp, _ = dal.get_all_records(
+        {"limit": 2, "search_after": search_after, "sort": "published_at"}, {}
+    )
+
+    assert _get_ids(first_page) + _get_ids(resp) == ["a", "c", "b", "d"]
+
+
+def test_get_all_records_projects_the_fields(dal):
+    resp, count = dal.get_all_records(
+        {"limit": 1, "offset": 0, "fields": ["title"], "track_total_hits": False},
+        {},
+    )
+
+    assert resp["hits"]["hits"][0]["_source"] == {"title": "birds singing"}
+    assert count is None
+
+
+def test_search_all_records_matches_any_word(dal):
+    resp, count = dal.search_all_records(
+        {"limit": 10, "offset": 0, "video_search_query": "cats birds"}, {}
+    )
+
+    assert _get_ids(resp) == ["d", "c", "a"]
+    assert count == 3
+
+
+def test_get_all_record_ids(dal):
+    assert sorted(dal.get_all_record_ids({})) == ["a", "b", "c", "d"]
@@ -0,0 +1,52 @@
+import pydantic
+import pytest
+
+from app.models.youtube import youtube_records
+
+
+def _video(**snippet):
+    return {
+        "kind": "youtube#video",
+        "etag": "etag",
+        "id": "a",
+        "snippet": {
+            "publishedAt": "2021-06-01T00:00:00Z",
+            "title": "Title",
+            "description": "Description",
+            "thumbnails": {"default": {"url": "https://i.ytimg.com/a.jpg"}},
+            "channelTitle": "channel",
+            **snippet,
+        },
+    }
+
+
+def test_parse_search_page_keeps_the_video_results():
+    page = youtube_records.parse_search_page(
+        {
+            "etag": "etag",
+            "nextPageToken": "p2",
+            "items": [{"id": {"videoId": "a"}}, {"id": {"channelId": "c"}}],
+        }
+    )
+
+    assert (page.etag, page.next_page_token, page.video_ids) == ("etag", "p2", ["a"])
+
+
+def test_parse_videos_projects_the_stored_fields():
+    (video,) = youtube_records.parse_videos({"items": [_video()]})
+
+    assert (video.id, video.title, video.thumbnail_url, video.channel_title) == (
+        "a",
+        "Title",
+        "https://i.ytimg.com/a.jpg",
+        "channel",
+    )
+    assert youtube_records.parse_videos({}) == []
+
+
+def test_parse_videos_validates_the_videos_in_the_strict_mode():
+    data = {"items": [_video(title=None)]}
+
+    assert youtube_records.parse_videos(data)[0].title is None
+    with pytest.raises(pydantic.ValidationError):
+        youtube_records.parse_videos(data, strict=True)
@@ -0,0 +1,62 @@
+import base64
+import json
+
+import pytest
+
+from app.core.exception_handler.video_registry_exception import VideoRegistryException
+from app.utils import cursor_utils
+
+
+def _encode(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def test_decode_cursor_round_trips_the_position():
+    cursor = cursor_utils.encode_cursor([1622505600000, "a"], "pit")
+
+    assert "=" not in cursor
+    assert cursor_utils.decode_cursor(cursor) == {
+        "search_after": [1622505600000, "a"],
+        "pit_id": "pit",
+    }
+
+
+def test_encode_cursor_leaves_out_a_missing_point_in_time():
+    cursor = cursor_utils.encode_cursor([1622505600000, "a"])
+
+    assert cursor_utils.decode_cursor(cursor) == {"search_after": [1622505600000, "a"]}
+
+
+def test_decode_cursor_leaves_out_the_other_keys():
+    cursor = _encode(
+        {
+            "search_after": [1622505600000, "a"],
+            "limit": 100000,
+            "sort": "published_at",
+            "fields": ["title_suggest"],
+            "track_total_hits": True,
+        }
+    )
+
+    assert cursor_utils.decode_cursor(cursor) == {"search_after": [1622505600000, "a"]}
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        _encode([1, 2]),
+        _encode({"search_after": "a"}),
+        _encode({"search_after": [1]}),
+        _encode({"search_after": [1, "a", "b"]}),
+        _encode({"search_after": ["a", 1]}),
+        _encode({"search_after": [True, "a"]}),
+        _encode({"search_after": [1, "a"], "pit_id": 1}),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_decode_cursor_rejects_the_malformed_cursors(cursor):
+    with pytest.raises(VideoRegistryException) as exc_info:
+        cursor_utils.decode_cursor(cursor)
+
+    assert exc_info.value.error_code == 400